@@ -0,0 +1,72 @@
+"""Measure CSV expense import throughput through an in-process client.
+
+run:
+  cd Household_Budget/server
+  python benchmarks/bench_bulk_import.py --rows 100000
+"""
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+
+def build_csv(rows: int) -> bytes:
+    out = io.StringIO()
+    out.write(
+        "estimated_date,name,estimated_amount,actual_amount,responsible,frequency,shared\n"
+    )
+    for i in range(rows):
+        out.write(
+            f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d},Expense {i},{i % 500}.25,,"
+            f"{'Alex' if i % 2 else 'Sam'},Monthly,{i % 2}\n"
+        )
+    return out.getvalue().encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # read when the first request opens the database, not on import
+        os.environ["DBFILE"] = os.path.join(tmp, "budget.sqlite")
+
+        from fastapi.testclient import TestClient
+
+        from householdbudget.database.pool import close_pools
+        from householdbudget.main import app
+
+        client = TestClient(app)
+        user = {
+            "username": "bench",
+            "first_name": "Bench",
+            "last_name": "User",
+            "email": "bench@example.com",
+            "password": "benchmark-password",
+        }
+        token = client.post("/register", json=user).json()["access_token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+        body = build_csv(args.rows)
+        start = time.perf_counter()
+        response = client.post(
+            "/expenses/import", files={"file": ("expenses.csv", body, "text/csv")}
+        )
+        elapsed = time.perf_counter() - start
+        response.raise_for_status()
+        result = response.json()
+        close_pools()
+
+    print(f"inserted: {result['inserted']}  errors: {len(result['errors'])}")
+    print(f"elapsed:  {elapsed:.2f} s")
+    print(f"rows/sec: {result['inserted'] / elapsed:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
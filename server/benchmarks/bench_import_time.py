@@ -0,0 +1,53 @@
+"""Measure how long a fresh interpreter takes to import the application.
+
+run:
+  cd Household_Budget/server
+  python benchmarks/bench_import_time.py --runs 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def import_once(module: str, env: dict) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], check=True, env=env)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--module", default="householdbudget.main")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "budget.sqlite")
+        env = {**os.environ, "PYTHONPATH": str(SRC), "DBFILE": db_file}
+        baseline = [import_once("sys", env) for _ in range(args.runs)]
+        samples = [import_once(args.module, env) for _ in range(args.runs)]
+        touched = os.path.exists(db_file)
+
+    startup = statistics.median(baseline)
+    print(f"interpreter startup: {startup:.1f} ms")
+    print(f"import {args.module}:")
+    print(f"  p50: {percentile(samples, 50) - startup:.1f} ms")
+    print(f"  max: {max(samples) - startup:.1f} ms")
+    print(f"database file created at import: {'yes' if touched else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Compare password verifications (logins) per second for each scheme.
+
+run:
+  cd Household_Budget/server
+  python benchmarks/bench_password_schemes.py --logins 20
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from householdbudget.auth.password_schemes import (  # noqa: E402
+    available_schemes,
+    get_scheme,
+)
+
+
+def bench_scheme(scheme, logins: int) -> float:
+    password_encryptor = scheme.hash("benchmark-password")
+    start = time.perf_counter()
+    for _ in range(logins):
+        if not scheme.verify("benchmark-password", password_encryptor):
+            raise RuntimeError(f"{scheme.name} failed to verify")
+    return logins / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'scheme':<16}{'logins/sec':>12}")
+    for name in available_schemes():
+        print(f"{name:<16}{bench_scheme(get_scheme(name), args.logins):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Measure how long a multi-year projection takes for many recurring items.
+
+run:
+  cd Household_Budget/server
+  python benchmarks/bench_projection.py --items 5000 --years 10
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from householdbudget.budget.projection import project  # noqa: E402
+
+FREQUENCIES = ["Daily", "Weekly", "Bi-weekly", "Semi-Monthly", "Monthly", "Yearly"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--years", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    start = date(2025, 1, 1)
+    end = start + timedelta(days=365 * args.years)
+    expenses = [
+        (
+            i,
+            (start + timedelta(days=rng.randrange(365))).isoformat(),
+            rng.uniform(5, 500),
+            None,
+            rng.choice(FREQUENCIES),
+        )
+        for i in range(args.items)
+    ]
+    income = [
+        (i, rng.uniform(500, 3000), rng.choice(FREQUENCIES[1:5]), rng.choice([1, 2]))
+        for i in range(args.items // 10)
+    ]
+
+    began = time.perf_counter()
+    projection = project(expenses, income, start, end)
+    elapsed = time.perf_counter() - began
+
+    print(f"items: {len(expenses) + len(income)}  days: {len(projection.dates)}")
+    print(f"closing balance: {projection.balance[-1]:,.2f}")
+    print(f"elapsed: {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Measure /register latency through an in-process client.
+
+With --keypair-pool N the Kyber keypairs come from a pool of N pre-generated
+pairs (filled before timing starts); --compare runs once without and once
+with it. The pool only matters for the kyber-fernet scheme. Between
+registrations, --interval leaves time for the pool to refill, as real
+signups would.
+
+run:
+  cd Household_Budget/server
+  python benchmarks/bench_register.py --users 50
+  python benchmarks/bench_register.py --scheme kyber-fernet --keypair-pool 32 --compare
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def register(client, prefix: str, users: int, interval: float) -> list:
+    samples = []
+    for i in range(users):
+        user = {
+            "username": f"{prefix}{i}",
+            "first_name": "Bench",
+            "last_name": "User",
+            "email": f"{prefix}{i}@example.com",
+            "password": "benchmark-password",
+        }
+        start = time.perf_counter()
+        response = client.post("/register", json=user)
+        samples.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+        time.sleep(interval)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument(
+        "--scheme", default=None, help="PASSWORD_SCHEME to register with"
+    )
+    parser.add_argument(
+        "--keypair-pool", type=int, default=0, help="pre-generated Kyber keypairs"
+    )
+    parser.add_argument(
+        "--compare", action="store_true", help="also run without the keypair pool"
+    )
+    parser.add_argument(
+        "--interval", type=float, default=0.0, help="ms to wait between requests"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=3, help="untimed registrations per run"
+    )
+    args = parser.parse_args()
+    if args.scheme:
+        os.environ["PASSWORD_SCHEME"] = args.scheme
+
+    runs = [args.keypair_pool]
+    if args.compare and args.keypair_pool:
+        runs.insert(0, 0)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # read when the first request opens the database, not on import
+        os.environ["DBFILE"] = os.path.join(tmp, "budget.sqlite")
+
+        from fastapi.testclient import TestClient
+
+        from householdbudget.database.pool import close_pools
+        from householdbudget.main import app
+        from householdbudget.utils.keypair_pool import (
+            close_keypair_pool,
+            get_keypair_pool,
+        )
+
+        client = TestClient(app)
+        for size in runs:
+            os.environ["KEYPAIR_POOL_SIZE"] = str(size)
+            pool = get_keypair_pool()
+            # start the crypto worker processes before timing
+            register(client, f"warmup{size}-", args.warmup, 0)
+            if pool is not None:
+                pool.wait_full()
+            samples = register(client, f"pool{size}-", args.users, args.interval / 1000)
+            results.append((size, samples, pool.stats() if pool else None))
+            close_keypair_pool()
+        close_pools()
+
+    for size, samples, stats in results:
+        print(f"keypair pool: {size or 'off'}")
+        print(f"  registrations: {len(samples)}")
+        print(f"  mean: {statistics.mean(samples):.1f} ms")
+        print(f"  p50:  {percentile(samples, 50):.1f} ms")
+        print(f"  p99:  {percentile(samples, 99):.1f} ms")
+        if stats:
+            print(
+                f"  taken from pool: {stats['taken']}, inline: {stats['inline']}, "
+                f"refill rate: {stats['refill_rate']:.0f} keys/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
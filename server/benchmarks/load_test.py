@@ -0,0 +1,148 @@
+"""Measure requests/sec against a real server as the worker count grows.
+
+Each round starts `python -m householdbudget.main --workers N` on a fresh
+database, seeds it, then keeps --concurrency requests in flight for
+--duration seconds against an authenticated read endpoint.
+
+run:
+  cd Household_Budget/server
+  python benchmarks/load_test.py --workers 1 2 4 --duration 10
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{url}/openapi.json", timeout=1.0).raise_for_status()
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not start")
+
+
+def seed(url: str, rows: int) -> dict:
+    user = {
+        "username": "loadtest",
+        "first_name": "Load",
+        "last_name": "Test",
+        "email": "loadtest@example.com",
+        "password": "load-test-password",
+    }
+    response = httpx.post(f"{url}/register", json=user, timeout=30.0)
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    lines = [
+        "estimated_date,name,estimated_amount,actual_amount,responsible,frequency,shared"
+    ]
+    lines += [
+        f"2024-{i % 12 + 1:02d}-01,Expense {i},{i % 300},,Alex,Monthly,1"
+        for i in range(rows)
+    ]
+    files = {"file": ("expenses.csv", "\n".join(lines), "text/csv")}
+    httpx.post(
+        f"{url}/expenses/import", files=files, headers=headers, timeout=60.0
+    ).raise_for_status()
+    return headers
+
+
+async def hammer(url: str, path: str, headers: dict, concurrency: int, duration: float):
+    completed = 0
+    failed = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(
+        base_url=url, headers=headers, limits=limits, timeout=30.0
+    ) as client:
+
+        async def worker():
+            nonlocal completed, failed
+            while time.monotonic() < deadline:
+                response = await client.get(path)
+                if response.status_code == 200:
+                    completed += 1
+                else:
+                    failed += 1
+
+        start = time.monotonic()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.monotonic() - start
+    return completed / elapsed, failed
+
+
+def run_round(workers: int, args) -> tuple:
+    with tempfile.TemporaryDirectory() as tmp:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        env = {
+            **os.environ,
+            "PYTHONPATH": str(SRC),
+            "DBFILE": os.path.join(tmp, "budget.sqlite"),
+        }
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "householdbudget.main",
+                "--workers",
+                str(workers),
+                "--port",
+                str(port),
+            ],
+            env=env,
+            cwd=tmp,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_until_ready(url)
+            headers = seed(url, args.rows)
+            return asyncio.run(
+                hammer(url, args.path, headers, args.concurrency, args.duration)
+            )
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--path", default="/expenses?limit=50")
+    args = parser.parse_args()
+
+    baseline = None
+    print(f"{'workers':>7} {'req/s':>10} {'speedup':>8} {'errors':>7}")
+    for workers in args.workers:
+        rate, failed = run_round(workers, args)
+        baseline = baseline or rate
+        print(f"{workers:>7} {rate:>10.0f} {rate / baseline:>7.2f}x {failed:>7}")
+
+
+if __name__ == "__main__":
+    main()
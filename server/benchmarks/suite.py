@@ -0,0 +1,361 @@
+"""Run the hot-path benchmark suite and compare it with a stored baseline.
+
+Cases cover the crypto primitives, user and expense repository calls at
+several table sizes, and /token and /register through an in-process ASGI
+client. Results are written as JSON; with --baseline, any case whose median
+is more than --threshold slower than the baseline's fails the run.
+
+run:
+  cd Household_Budget/server
+  python benchmarks/suite.py --output results.json
+  python benchmarks/suite.py --save-baseline benchmarks/baseline.json
+  python benchmarks/suite.py --baseline benchmarks/baseline.json --threshold 0.25
+  python benchmarks/suite.py --quick --filter repository
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+CASES = []
+
+
+def case(name: str, rounds: int = 20, scaled: bool = False):
+    """Register ``setup(context[, scale]) -> callable`` as a benchmark case.
+
+    The callable returned by the setup function is what gets timed; scaled
+    cases run once per table size.
+    """
+
+    def decorator(setup):
+        CASES.append((name, rounds, scaled, setup))
+        return setup
+
+    return decorator
+
+
+def measure(func, rounds: int, warmup: int = 2) -> dict:
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    ordered = sorted(samples)
+    median = statistics.median(samples)
+    return {
+        "rounds": rounds,
+        "min": ordered[0],
+        "median": median,
+        "mean": statistics.mean(samples),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "ops_per_sec": 1 / median if median else float("inf"),
+    }
+
+
+class Context:
+    """A scratch database per table size, seeded on first use."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._databases = {}
+
+    def database(self, name: str, seed=None) -> str:
+        from householdbudget.database.connection import create_tables
+        from householdbudget.utils.db_utils import validate_db_file
+
+        if name not in self._databases:
+            db_file = os.path.join(self.root, f"{name}.sqlite")
+            validate_db_file(db_file)
+            create_tables(db_file)
+            if seed is not None:
+                seed(db_file)
+            self._databases[name] = db_file
+        return self._databases[name]
+
+
+def seed_users(count: int):
+    def seed(db_file: str):
+        from householdbudget.auth.password_schemes import Pbkdf2Scheme
+        from householdbudget.database.connection import DatabaseConnection
+
+        # one hash for everyone: seeding measures nothing, so keep it cheap
+        encryptor = Pbkdf2Scheme(1000).hash("benchmark-password")
+        with DatabaseConnection(db_file) as db_conn:
+            connection = db_conn.connection
+            connection.executemany(
+                "INSERT INTO users (id, username, first_name, last_name, email, disabled) VALUES (?, ?, 'Bench', 'User', ?, 0)",
+                ((i, f"user{i}", f"user{i}@example.com") for i in range(1, count + 1)),
+            )
+            connection.executemany(
+                "INSERT INTO encryption_data (user_id, encrypted_password, private_key, cyphertext, salt, scheme) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        i,
+                        encryptor.encrypted_password,
+                        encryptor.private_key,
+                        encryptor.cyphertext,
+                        encryptor.salt,
+                        encryptor.scheme,
+                    )
+                    for i in range(1, count + 1)
+                ),
+            )
+
+    return seed
+
+
+def expense(i: int) -> dict:
+    return {
+        "estimated_date": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+        "name": f"Expense {i}",
+        "estimated_amount": i % 500,
+        "actual_amount": None,
+        "responsible": "Alex" if i % 2 else "Sam",
+        "frequency": "Monthly",
+        "shared": i % 2,
+    }
+
+
+def seed_expenses(count: int):
+    def seed(db_file: str):
+        from householdbudget.database.repositories import ExpenseRepository
+
+        ExpenseRepository(db_file).add_expenses_bulk(expense(i) for i in range(count))
+
+    return seed
+
+
+# crypto primitives
+
+
+@case("crypto.generate_keys")
+def bench_generate_keys(context):
+    from householdbudget.utils.crypto_utils import generate_keys
+
+    return generate_keys
+
+
+@case("crypto.encrypt")
+def bench_encrypt(context):
+    from householdbudget.utils.crypto_utils import encrypt, generate_keys
+
+    public_key, _ = generate_keys()
+    return lambda: encrypt("benchmark-password", public_key)
+
+
+@case("crypto.decrypt")
+def bench_decrypt(context):
+    from householdbudget.utils.crypto_utils import decrypt, encrypt, generate_keys
+
+    public_key, private_key = generate_keys()
+    c, salt, encrypted_text = encrypt("benchmark-password", public_key)
+    return lambda: decrypt(c, salt, encrypted_text, private_key)
+
+
+# repositories
+
+
+def user_repository(context, scale: int, cached: bool):
+    from householdbudget.database.pool import ConnectionPool
+    from householdbudget.database.repositories import UserRepository
+    from householdbudget.utils.cache import TTLCache
+
+    db_file = context.database(f"users-{scale}", seed_users(scale))
+    cache = None if cached else TTLCache(maxsize=0)
+    return UserRepository(db_file, pool=ConnectionPool(db_file), cache=cache)
+
+
+@case("repository.get_user_by_username", rounds=200, scaled=True)
+def bench_get_user_by_username(context, scale):
+    repository = user_repository(context, scale, cached=False)
+    usernames = [f"user{i}" for i in range(1, scale + 1, max(scale // 100, 1))]
+    index = iter(range(10**9))
+    return lambda: repository.get_user_by_username(
+        usernames[next(index) % len(usernames)]
+    )
+
+
+@case("repository.get_user_by_username.cached", rounds=200, scaled=True)
+def bench_get_user_by_username_cached(context, scale):
+    repository = user_repository(context, scale, cached=True)
+    return lambda: repository.get_user_by_username("user1")
+
+
+@case("repository.get_users", rounds=5, scaled=True)
+def bench_get_users(context, scale):
+    repository = user_repository(context, scale, cached=False)
+    return repository.get_users
+
+
+@case("repository.get_users.columns", rounds=5, scaled=True)
+def bench_get_user_columns(context, scale):
+    repository = user_repository(context, scale, cached=False)
+    return lambda: repository.get_users(columns=["username"])
+
+
+@case("repository.add_expense", rounds=200, scaled=True)
+def bench_add_expense(context, scale):
+    from householdbudget.database.pool import ConnectionPool
+    from householdbudget.database.repositories import ExpenseRepository
+
+    db_file = context.database(f"expenses-add-{scale}", seed_expenses(scale))
+    repository = ExpenseRepository(db_file, pool=ConnectionPool(db_file))
+    return lambda: repository.add_expense(expense(7))
+
+
+@case("repository.get_expenses", rounds=5, scaled=True)
+def bench_get_expenses(context, scale):
+    from householdbudget.database.pool import ConnectionPool
+    from householdbudget.database.repositories import ExpenseRepository
+
+    db_file = context.database(f"expenses-{scale}", seed_expenses(scale))
+    repository = ExpenseRepository(db_file, pool=ConnectionPool(db_file))
+    return repository.get_expenses
+
+
+@case("repository.get_expenses.columns", rounds=5, scaled=True)
+def bench_get_expense_columns(context, scale):
+    from householdbudget.database.pool import ConnectionPool
+    from householdbudget.database.repositories import ExpenseRepository
+
+    db_file = context.database(f"expenses-{scale}", seed_expenses(scale))
+    repository = ExpenseRepository(db_file, pool=ConnectionPool(db_file))
+    return lambda: repository.get_expenses(columns=["estimated_amount"])
+
+
+# end to end
+
+
+def app_client(context):
+    from fastapi.testclient import TestClient
+
+    from householdbudget import database
+    from householdbudget.main import app
+
+    database.close_repository_selector()
+    database.init_repository_selector(context.database("app"))
+    return TestClient(app)
+
+
+@case("api.register", rounds=20)
+def bench_register(context):
+    client = app_client(context)
+    index = iter(range(10**9))
+
+    def register():
+        i = next(index)
+        response = client.post(
+            "/register",
+            json={
+                "username": f"register{i}",
+                "first_name": "Bench",
+                "last_name": "User",
+                "email": f"register{i}@example.com",
+                "password": "benchmark-password",
+            },
+        )
+        response.raise_for_status()
+
+    return register
+
+
+@case("api.token", rounds=20)
+def bench_token(context):
+    client = app_client(context)
+    user = {
+        "username": "token",
+        "first_name": "Bench",
+        "last_name": "User",
+        "email": "token@example.com",
+        "password": "benchmark-password",
+    }
+    client.post("/register", json=user).raise_for_status()
+
+    def token():
+        client.post("/token", data=user).raise_for_status()
+
+    return token
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Return a line for every case slower than the baseline by > threshold."""
+    regressions = []
+    for name, result in results["cases"].items():
+        previous = baseline["cases"].get(name)
+        if previous is None:
+            continue
+        ratio = result["median"] / previous["median"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{name}: median {result['median'] * 1000:.3f} ms vs "
+                f"{previous['median'] * 1000:.3f} ms ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--quick", action="store_true", help="only the smallest scale")
+    parser.add_argument("--filter", default="", help="run cases containing this")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare with this results file")
+    parser.add_argument("--save-baseline", help="also write results here")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+    scales = sorted(args.scales)[:1] if args.quick else sorted(args.scales)
+
+    results = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cases": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DBFILE"] = os.path.join(tmp, "app.sqlite")
+        context = Context(tmp)
+        for name, rounds, scaled, setup in CASES:
+            for scale in scales if scaled else [None]:
+                label = name if scale is None else f"{name}[{scale}]"
+                if args.filter not in label:
+                    continue
+                func = setup(context) if scale is None else setup(context, scale)
+                result = measure(func, rounds)
+                results["cases"][label] = result
+                print(
+                    f"{label:<50} median {result['median'] * 1000:>10.3f} ms"
+                    f"  p95 {result['p95'] * 1000:>10.3f} ms"
+                )
+
+        from householdbudget import database
+        from householdbudget.database.pool import close_pools
+
+        database.close_repository_selector()
+        close_pools()
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+import os
+import time
+
+import jwt
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+
+from ..database import get_user_repository
+from ..database.async_repositories import AsyncRepository
+from ..database.exceptions import RecordNotFoundError
+from ..database.schemas import User
+from ..utils.cache import TTLCache
+from .tokens import read_subject, verify_token
+
+TOKEN_CACHE_SIZE = 4096
+TOKEN_CACHE_TTL = 60.0
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+
+# recently verified tokens and their users; a token stays accepted until it
+# expires or drops out of here, so a disabled user's tokens keep working for
+# at most TOKEN_CACHE_TTL seconds
+verified_tokens = TTLCache(
+    maxsize=int(os.getenv("TOKEN_CACHE_SIZE", TOKEN_CACHE_SIZE)),
+    ttl=float(os.getenv("TOKEN_CACHE_TTL", TOKEN_CACHE_TTL)),
+)
+
+
+def credentials_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    userrepository: AsyncRepository = Depends(get_user_repository),
+) -> User:
+    cached = verified_tokens.get(token)
+    if cached is not None:
+        user, expires = cached
+        if expires > time.time():
+            return user.model_copy(deep=True)
+        verified_tokens.invalidate(token)
+        raise credentials_error()
+
+    try:
+        # the signing key comes from the user cache, not from disk
+        user: User = await userrepository.get_user_by_username(read_subject(token))
+        claims = verify_token(token, user.password_encryptor.private_key)
+    except (jwt.InvalidTokenError, RecordNotFoundError) as e:
+        raise credentials_error() from e
+    if claims["sub"] != user.username:
+        raise credentials_error()
+
+    verified_tokens.set(token, (user, claims["exp"]))
+    return user.model_copy(deep=True)
@@ -0,0 +1,188 @@
+import base64
+import hashlib
+import hmac
+import os
+from abc import ABC, abstractmethod
+
+from ..metrics.registry import timed
+from ..utils.crypto_executor import CryptoExecutor, get_crypto_executor
+from .schemas import PasswordEncryptor
+
+DEFAULT_SCHEME = "pbkdf2-sha256"
+SIGNING_KEY_BYTES = 32
+
+
+class PasswordScheme(ABC):
+    """Base class for the ways a password can be stored in encryption_data.
+
+    ``private_key`` always holds the per-user key that access tokens are
+    signed with, whatever the scheme does with the other columns.
+    """
+
+    name: str = None
+
+    @abstractmethod
+    def hash(self, password: str, signing_key: bytes = None) -> PasswordEncryptor: ...
+
+    async def hash_async(
+        self,
+        password: str,
+        signing_key: bytes = None,
+        executor: CryptoExecutor = None,
+    ) -> PasswordEncryptor:
+        executor = executor or get_crypto_executor()
+        return await executor.run_thread(self.hash, password, signing_key)
+
+    @abstractmethod
+    def verify(self, password: str, password_encryptor: PasswordEncryptor) -> bool: ...
+
+    async def verify_async(
+        self,
+        password: str,
+        password_encryptor: PasswordEncryptor,
+        executor: CryptoExecutor = None,
+    ) -> bool:
+        executor = executor or get_crypto_executor()
+        return await executor.run_thread(self.verify, password, password_encryptor)
+
+    def needs_rehash(self, password_encryptor: PasswordEncryptor) -> bool:
+        return password_encryptor.scheme != self.name
+
+
+class KyberFernetScheme(PasswordScheme):
+    """The original reversible format: Kyber1024 + PBKDF2 + Fernet."""
+
+    name = "kyber-fernet"
+
+    def hash(self, password: str, signing_key: bytes = None) -> PasswordEncryptor:
+        # the Kyber private key doubles as the signing key for this scheme
+        password_encryptor = PasswordEncryptor(scheme=self.name)
+        password_encryptor.encrypt_password(password)
+        return password_encryptor
+
+    async def hash_async(
+        self,
+        password: str,
+        signing_key: bytes = None,
+        executor: CryptoExecutor = None,
+    ) -> PasswordEncryptor:
+        password_encryptor = PasswordEncryptor(scheme=self.name)
+        await password_encryptor.encrypt_password_async(password, executor)
+        return password_encryptor
+
+    def verify(self, password: str, password_encryptor: PasswordEncryptor) -> bool:
+        decrypted = password_encryptor.decrypt_password()
+        return hmac.compare_digest(decrypted.encode(), password.encode())
+
+    async def verify_async(
+        self,
+        password: str,
+        password_encryptor: PasswordEncryptor,
+        executor: CryptoExecutor = None,
+    ) -> bool:
+        decrypted = await password_encryptor.decrypt_password_async(executor)
+        return hmac.compare_digest(decrypted.encode(), password.encode())
+
+
+class DigestScheme(PasswordScheme):
+    """A verify-only scheme that stores ``<params>$<base64 digest>``.
+
+    The work-factor parameters are stored per row, so tuning them only
+    affects new hashes; older rows are flagged by ``needs_rehash``.
+    """
+
+    @abstractmethod
+    def params(self) -> str: ...
+
+    @abstractmethod
+    def digest(self, password: str, salt: bytes, params: str) -> bytes: ...
+
+    def hash(self, password: str, signing_key: bytes = None) -> PasswordEncryptor:
+        salt = os.urandom(16)
+        params = self.params()
+        with timed("crypto", self.name):
+            digest = self.digest(password, salt, params)
+        return PasswordEncryptor(
+            scheme=self.name,
+            encrypted_password=f"{params}$".encode() + base64.urlsafe_b64encode(digest),
+            private_key=signing_key or os.urandom(SIGNING_KEY_BYTES),
+            cyphertext=b"",
+            salt=salt,
+        )
+
+    def verify(self, password: str, password_encryptor: PasswordEncryptor) -> bool:
+        params, expected = self._split(password_encryptor.encrypted_password)
+        with timed("crypto", self.name):
+            digest = self.digest(password, password_encryptor.salt, params)
+        return hmac.compare_digest(base64.urlsafe_b64encode(digest), expected)
+
+    def needs_rehash(self, password_encryptor: PasswordEncryptor) -> bool:
+        if super().needs_rehash(password_encryptor):
+            return True
+        params, _ = self._split(password_encryptor.encrypted_password)
+        return params != self.params()
+
+    @staticmethod
+    def _split(encrypted_password: bytes):
+        params, _, digest = encrypted_password.partition(b"$")
+        return params.decode(), digest
+
+
+class Pbkdf2Scheme(DigestScheme):
+    """PBKDF2-HMAC-SHA256; iterations default to PASSWORD_PBKDF2_ITERATIONS."""
+
+    name = "pbkdf2-sha256"
+
+    def __init__(self, iterations: int = None):
+        self.iterations = iterations
+
+    def params(self) -> str:
+        return str(
+            self.iterations or int(os.getenv("PASSWORD_PBKDF2_ITERATIONS", 100000))
+        )
+
+    def digest(self, password: str, salt: bytes, params: str) -> bytes:
+        return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, int(params))
+
+
+class ScryptScheme(DigestScheme):
+    """scrypt; the cost factor defaults to PASSWORD_SCRYPT_N (r=8, p=1)."""
+
+    name = "scrypt"
+
+    def __init__(self, n: int = None):
+        self.n = n
+
+    def params(self) -> str:
+        return str(self.n or int(os.getenv("PASSWORD_SCRYPT_N", 16384)))
+
+    def digest(self, password: str, salt: bytes, params: str) -> bytes:
+        n = int(params)
+        return hashlib.scrypt(
+            password.encode(), salt=salt, n=n, r=8, p=1, maxmem=256 * n * 8
+        )
+
+
+_schemes = {}
+
+
+def register_scheme(scheme: PasswordScheme):
+    _schemes[scheme.name] = scheme
+
+
+def available_schemes() -> list:
+    return list(_schemes)
+
+
+def get_scheme(name: str = None) -> PasswordScheme:
+    """Return a registered scheme, or the configured default (PASSWORD_SCHEME)."""
+    name = name or os.getenv("PASSWORD_SCHEME", DEFAULT_SCHEME)
+    try:
+        return _schemes[name]
+    except KeyError:
+        raise ValueError(f"Unknown password scheme: {name}") from None
+
+
+register_scheme(KyberFernetScheme())
+register_scheme(Pbkdf2Scheme())
+register_scheme(ScryptScheme())
@@ -1,28 +1,53 @@
-import jwt
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+import logging
 
-from ..database import repository_selector
-from ..database.exceptions import RecordNotFoundError
-from ..database.repositories import UserRepository
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+
+from ..database import get_user_repository
+from ..database.exceptions import (
+    DatabaseError,
+    DuplicateUserError,
+    RecordNotFoundError,
+)
+from ..database.async_repositories import AsyncRepository
 from ..database.schemas import User
-from ..utils.crypto_utils import JWT_ALGORITHM
-from .schemas import PasswordEncryptor, Token
+from ..utils.crypto_executor import CryptoExecutorBusyError
+from .dependencies import get_current_user
+from .password_schemes import get_scheme
+from .schemas import CurrentUser, Token
+from .tokens import create_access_token
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
-@router.post("/token", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    userrepository: UserRepository = repository_selector.get_repository("user")
+def crypto_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent authentication requests",
+        headers={"Retry-After": "1"},
+    )
 
+
+async def rehash_if_needed(userrepository: AsyncRepository, user: User, password: str):
+    """Move a verified user onto the configured password scheme."""
+    if not user.needs_rehash():
+        return
     try:
-        user: User = userrepository.get_user_by_username(form_data.username)
-        encryption_data = userrepository.get_encryption_data(user.id)
-        user.password_encryptor = PasswordEncryptor(**encryption_data)
+        await user.rehash_password_async(password)
+        await userrepository.update_encryption_data(user.id, user.password_encryptor)
+    except (CryptoExecutorBusyError, DatabaseError):
+        # the stored hash still verifies, so retry on a later login
+        logger.warning("Could not rehash password for user %s", user.id)
+
 
-        if not user or not user.verify_password(form_data.password):
+async def issue_token(
+    form_data: OAuth2PasswordRequestForm, userrepository: AsyncRepository
+) -> Token:
+    try:
+        # the user comes back with its credentials, usually from the cache
+        user: User = await userrepository.get_user_by_username(form_data.username)
+        if not await user.verify_password_async(form_data.password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid username or password",
@@ -34,70 +59,58 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
             detail="Invalid username or password",
             headers={"WWW-Authenticate": "Bearer"},
         ) from e
+    except CryptoExecutorBusyError as e:
+        raise crypto_busy() from e
 
-    token_data = jwt.encode(
-        {"sub": user.username},
-        user.password_encryptor.private_key,
-        algorithm=JWT_ALGORITHM,
-    )
-    return Token(access_token=token_data, token_type="bearer")
+    await rehash_if_needed(userrepository, user, form_data.password)
 
+    return create_access_token(user)
 
-@router.post("/login", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    userrepository: UserRepository = repository_selector.get_repository("user")
 
-    try:
-        user: User = userrepository.get_user_by_username(form_data.username)
-        encryption_data = userrepository.get_encryption_data(user.id)
-        user.password_encryptor = PasswordEncryptor(**encryption_data)
-        isverified = user.verify_password(form_data.password)
+@router.post("/token", response_model=Token)
+async def login(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    userrepository: AsyncRepository = Depends(get_user_repository),
+):
+    return await issue_token(form_data, userrepository)
 
-        if not user or not isverified:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid username or password",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-    except RecordNotFoundError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid username or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        ) from e
 
-    token_data = jwt.encode(
-        {"sub": user.username},
-        user.password_encryptor.private_key,
-        algorithm=JWT_ALGORITHM,
-    )
-    return Token(access_token=token_data, token_type="bearer")
+@router.post("/login", response_model=Token)
+async def login(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    userrepository: AsyncRepository = Depends(get_user_repository),
+):
+    return await issue_token(form_data, userrepository)
 
 
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-async def register(user: User):
-    # Encrypt the user's password
-    user.set_password(user.password)
+async def register(
+    user: User, userrepository: AsyncRepository = Depends(get_user_repository)
+):
+    try:
+        # Encrypt the user's password, once, away from the event loop
+        password_encryptor = await get_scheme().hash_async(user.password)
+    except CryptoExecutorBusyError as e:
+        raise crypto_busy() from e
 
     user_data = {
         "username": user.username,
         "first_name": user.first_name,
         "last_name": user.last_name,
         "email": user.email,
-        "password": user.password,
     }
 
-    userrepository: UserRepository = repository_selector.get_repository("user")
-    userrepository.add_user(user_data)
+    try:
+        user = await userrepository.add_user(user_data, password_encryptor)
+    except DuplicateUserError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Username or email is already registered",
+        ) from e
 
-    # Retrieve the user to get the assigned ID
-    user = userrepository.get_user_by_username(user.username)
+    return create_access_token(user)
 
-    token_data = jwt.encode(
-        {"sub": user.username},
-        user.password_encryptor.private_key,
-        algorithm=JWT_ALGORITHM,
-    )
-    token: Token = Token(access_token=token_data, token_type="bearer")
 
-    return token
+@router.get("/users/me", response_model=CurrentUser)
+async def read_current_user(user: User = Depends(get_current_user)):
+    return CurrentUser(**user.model_dump(include=set(CurrentUser.model_fields)))
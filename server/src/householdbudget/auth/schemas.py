@@ -2,7 +2,9 @@ import base64
 
 from pydantic import BaseModel
 
+from ..utils.crypto_executor import CryptoExecutor, get_crypto_executor
 from ..utils.crypto_utils import decrypt, encrypt, generate_keys
+from ..utils.keypair_pool import get_keypair_pool
 
 
 class Token(BaseModel):
@@ -10,23 +12,57 @@ class Token(BaseModel):
     token_type: str
 
 
+class CurrentUser(BaseModel):
+    id: int
+    username: str
+    email: str
+    first_name: str
+    last_name: str
+
+
 class PasswordEncryptor(BaseModel):
+    scheme: str = "kyber-fernet"
+    # set when loaded for a stored user; keys the derived-key cache
+    user_id: int = None
     encrypted_password: bytes = None
     private_key: bytes = None
     cyphertext: bytes = None
     salt: bytes = None
 
     def encrypt_password(self, password: str):
-        public_key, self.private_key = generate_keys()
+        pool = get_keypair_pool()
+        keys = pool.take() if pool is not None else generate_keys()
+        public_key, self.private_key = keys
         c, self.salt, encrypted_text = encrypt(password, public_key)
         self.cyphertext = base64.urlsafe_b64encode(c)
         self.encrypted_password = base64.urlsafe_b64encode(encrypted_text)
 
+    async def encrypt_password_async(
+        self, password: str, executor: CryptoExecutor = None
+    ):
+        executor = executor or get_crypto_executor()
+        public_key, self.private_key = await executor.generate_keys()
+        c, self.salt, encrypted_text = await executor.encrypt(password, public_key)
+        self.cyphertext = base64.urlsafe_b64encode(c)
+        self.encrypted_password = base64.urlsafe_b64encode(encrypted_text)
+
     def decrypt_password(self):
         if self.private_key is None:
             raise ValueError("Private key is not available for decryption.")
         # Decode the values
         c = base64.urlsafe_b64decode(self.cyphertext)
         encrypted_text = base64.urlsafe_b64decode(self.encrypted_password)
-        decrypted = decrypt(c, self.salt, encrypted_text, self.private_key)
+        decrypted = decrypt(
+            c, self.salt, encrypted_text, self.private_key, self.user_id
+        )
         return decrypted
+
+    async def decrypt_password_async(self, executor: CryptoExecutor = None):
+        if self.private_key is None:
+            raise ValueError("Private key is not available for decryption.")
+        executor = executor or get_crypto_executor()
+        c = base64.urlsafe_b64decode(self.cyphertext)
+        encrypted_text = base64.urlsafe_b64decode(self.encrypted_password)
+        return await executor.decrypt(
+            c, self.salt, encrypted_text, self.private_key, self.user_id
+        )
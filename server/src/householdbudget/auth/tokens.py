@@ -0,0 +1,44 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import jwt
+
+from ..database.schemas import User
+from ..utils.crypto_utils import JWT_ALGORITHM
+from .schemas import Token
+
+ACCESS_TOKEN_EXPIRE_MINUTES = 30
+
+
+def create_access_token(user: User, expires_delta: timedelta = None) -> Token:
+    """Issue a bearer token signed with the user's own signing key."""
+    if expires_delta is None:
+        expires_delta = timedelta(
+            minutes=float(
+                os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", ACCESS_TOKEN_EXPIRE_MINUTES)
+            )
+        )
+    issued_at = datetime.now(timezone.utc)
+    token_data = jwt.encode(
+        {"sub": user.username, "iat": issued_at, "exp": issued_at + expires_delta},
+        user.password_encryptor.private_key,
+        algorithm=JWT_ALGORITHM,
+    )
+    return Token(access_token=token_data, token_type="bearer")
+
+
+def read_subject(token: str) -> str:
+    """Return the unverified ``sub`` claim, to find the key to verify with."""
+    subject = jwt.decode(token, options={"verify_signature": False}).get("sub")
+    if not isinstance(subject, str):
+        raise jwt.InvalidTokenError("Token has no subject")
+    return subject
+
+
+def verify_token(token: str, signing_key: bytes) -> dict:
+    return jwt.decode(
+        token,
+        signing_key,
+        algorithms=[JWT_ALGORITHM],
+        options={"require": ["exp", "sub"]},
+    )
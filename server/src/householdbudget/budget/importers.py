@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+from typing import BinaryIO, Iterator
+
+from ..database.exceptions import InvalidDataError
+
+IMPORT_FORMATS = {
+    "csv": ("text/csv", "application/csv", "application/vnd.ms-excel"),
+    "ndjson": ("application/x-ndjson", "application/ndjson", "application/jsonl"),
+    "json": ("application/json",),
+}
+_EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".json": "json"}
+
+
+def detect_format(filename: str = None, content_type: str = None) -> str:
+    """Pick an import format from the upload's file extension or media type."""
+    for extension, fmt in _EXTENSIONS.items():
+        if filename and filename.lower().endswith(extension):
+            return fmt
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    for fmt, media_types in IMPORT_FORMATS.items():
+        if media_type in media_types:
+            return fmt
+    raise InvalidDataError(f"Unsupported import format: {filename or content_type}")
+
+
+def iter_records(file: BinaryIO, fmt: str) -> Iterator[dict]:
+    """Yield one dict per record without reading the whole file into memory.
+
+    A record that cannot be parsed is yielded as an InvalidDataError so the
+    caller can report it and carry on; a file that cannot be read any
+    further (bad UTF-8, malformed CSV) raises InvalidDataError. A JSON array
+    has to be parsed in one go; use NDJSON for large imports.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            yield from csv.DictReader(text)
+        elif fmt == "ndjson":
+            for line in text:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield InvalidDataError(f"Invalid JSON: {e}")
+        elif fmt == "json":
+            try:
+                records = json.load(text)
+            except json.JSONDecodeError as e:
+                raise InvalidDataError(f"Invalid JSON: {e}") from e
+            if not isinstance(records, list):
+                raise InvalidDataError("A JSON import must be an array of objects.")
+            yield from records
+        else:
+            raise InvalidDataError(f"Unsupported import format: {fmt}")
+    except UnicodeDecodeError as e:
+        raise InvalidDataError("Import files must be UTF-8 encoded") from e
+    except csv.Error as e:
+        raise InvalidDataError(f"Invalid CSV: {e}") from e
+    finally:
+        # leave the underlying upload for its owner to close
+        text.detach()
@@ -0,0 +1,196 @@
+from datetime import date
+from typing import Iterable, NamedTuple
+
+import numpy as np
+
+# steps in days, or in calendar months for the month-based frequencies;
+# frequencies are matched case-insensitively, and an expense with any other
+# frequency is projected once, on its estimated date
+DAY_STEPS = {"daily": 1, "weekly": 7, "bi-weekly": 14}
+MONTH_STEPS = {
+    "monthly": 1,
+    "semi-monthly": 1,
+    "quarterly": 3,
+    "yearly": 12,
+    "annually": 12,
+}
+
+# income has no date of its own: it is paid on Fridays (1970-01-02 was one,
+# and starts week 1 of the bi-weekly cycle) or on the 1st / 15th of the month
+PAYDAY_EPOCH = np.datetime64("1970-01-02", "D")
+MONTH_EPOCH = np.datetime64("1970-01-01", "D")
+SEMI_MONTHLY_OFFSET = 14
+
+
+class Projection(NamedTuple):
+    """A day-by-day cash-flow timeline; every field is a NumPy array."""
+
+    dates: np.ndarray
+    income: np.ndarray
+    expenses: np.ndarray
+    balance: np.ndarray
+
+    def active(self) -> "Projection":
+        """Only the days on which money came in or went out."""
+        mask = (self.income != 0) | (self.expenses != 0)
+        return Projection(*(field[mask] for field in self))
+
+
+def parse_day(value) -> np.datetime64:
+    """The day of a ``YYYY-MM-DD`` value, or NaT if it is not a date."""
+    try:
+        return np.datetime64(value, "D")
+    except (TypeError, ValueError):
+        return np.datetime64("NaT", "D")
+
+
+def parse_days(values: list) -> np.ndarray:
+    """``parse_day`` over a list, as a ``datetime64[D]`` array."""
+    try:
+        return np.array(values, dtype="datetime64[D]")
+    except (TypeError, ValueError):
+        # legacy rows may hold malformed dates; parse one at a time
+        return np.array([parse_day(value) for value in values], "datetime64[D]")
+
+
+class _Series:
+    """Recurring items grouped by how they repeat, to be expanded together."""
+
+    def __init__(self):
+        self._groups = {}
+
+    def add(self, unit: str, step: int, anchor, amount: float, first_amount=None):
+        group = self._groups.setdefault((unit, step), ([], [], []))
+        group[0].append(anchor)
+        group[1].append(amount)
+        group[2].append(np.nan if first_amount is None else first_amount)
+
+    def expand(self, start: np.datetime64, end: np.datetime64):
+        """Return the dates and amounts of every occurrence in [start, end]."""
+        dates, amounts = [np.empty(0, "datetime64[D]")], [np.empty(0)]
+        for (unit, step), (anchors, amount, first_amount) in self._groups.items():
+            anchors = parse_days(anchors)
+            amount = np.asarray(amount, dtype=float)
+            first_amount = np.asarray(first_amount, dtype=float)
+            dated = ~np.isnat(anchors)
+            if not dated.all():
+                # an item whose date does not parse never occurs
+                anchors = anchors[dated]
+                amount = amount[dated]
+                first_amount = first_amount[dated]
+            if unit == "D":
+                item, k, when = _expand_days(anchors, step, start, end)
+            else:
+                item, k, when = _expand_months(anchors, step, start, end)
+            value = amount[item]
+            # the first occurrence is charged at its actual amount, if known
+            first = first_amount[item]
+            override = (k == 0) & ~np.isnan(first)
+            value[override] = first[override]
+            dates.append(when)
+            amounts.append(value)
+        return np.concatenate(dates), np.concatenate(amounts)
+
+
+def _ranges(first: np.ndarray, counts: np.ndarray):
+    """Flatten ``range(first[i], first[i] + counts[i])`` for every item i."""
+    item = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return item, first[item] + offsets
+
+
+def _expand_days(anchors, step, start, end):
+    if step == 0:
+        # one-off: its anchor is its only occurrence
+        item = np.flatnonzero((anchors >= start) & (anchors <= end))
+        return item, np.zeros(len(item), np.int64), anchors[item]
+    # occurrence k of an item falls on anchor + k * step, k >= 0
+    first = np.maximum(-((anchors - start).astype(np.int64) // step), 0)
+    last = (end - anchors).astype(np.int64) // step
+    item, k = _ranges(first, np.maximum(last - first + 1, 0))
+    return item, k, anchors[item] + k * step
+
+
+def _expand_months(anchors, step, start, end):
+    # occurrence k falls in month anchor + k * step, on the anchor's day of
+    # the month or the month's last day if that is earlier
+    months = anchors.astype("datetime64[M]")
+    day = (anchors - months.astype("datetime64[D]")).astype(np.int64)
+    first = np.maximum(
+        -((months - start.astype("datetime64[M]")).astype(np.int64) // step), 0
+    )
+    last = (end.astype("datetime64[M]") - months).astype(np.int64) // step
+    item, k = _ranges(first, np.maximum(last - first + 1, 0))
+
+    month = months[item] + k * step
+    month_start = month.astype("datetime64[D]")
+    length = ((month + 1).astype("datetime64[D]") - month_start).astype(np.int64)
+    when = month_start + np.minimum(day[item], length - 1)
+    keep = (when >= start) & (when <= end)
+    return item[keep], k[keep], when[keep]
+
+
+def _add_recurring(series: _Series, frequency: str, anchor, amount, first_amount):
+    frequency = (frequency or "").strip().lower()
+    if frequency in DAY_STEPS:
+        series.add("D", DAY_STEPS[frequency], anchor, amount, first_amount)
+    elif frequency in MONTH_STEPS:
+        series.add("M", MONTH_STEPS[frequency], anchor, amount, first_amount)
+        if frequency == "semi-monthly":
+            second = parse_day(anchor) + SEMI_MONTHLY_OFFSET
+            series.add("M", 1, second, amount)
+    else:
+        series.add("D", 0, anchor, amount, first_amount)
+
+
+def income_series(income: Iterable[tuple]) -> _Series:
+    """Schedule ``(id, amount, frequency, bi_weekly_week)`` income rows."""
+    series = _Series()
+    for _, amount, frequency, bi_weekly_week in income:
+        anchor = MONTH_EPOCH
+        if frequency.lower() in ("weekly", "bi-weekly"):
+            anchor = PAYDAY_EPOCH
+            if bi_weekly_week == 2:
+                anchor = anchor + 7
+        _add_recurring(series, frequency, anchor, amount, None)
+    return series
+
+
+def expense_series(expenses: Iterable[tuple]) -> _Series:
+    """Schedule ``(id, estimated_date, estimated_amount, actual_amount,
+    frequency)`` expense rows, each anchored on its estimated date."""
+    series = _Series()
+    for _, estimated_date, estimated_amount, actual_amount, frequency in expenses:
+        _add_recurring(
+            series, frequency, estimated_date, estimated_amount, actual_amount
+        )
+    return series
+
+
+def project(
+    expenses: Iterable[tuple],
+    income: Iterable[tuple],
+    start: date,
+    end: date,
+    opening_balance: float = 0.0,
+) -> Projection:
+    """Expand recurring expenses and income into a daily running balance."""
+    start = np.datetime64(start, "D")
+    end = np.datetime64(end, "D")
+    if end < start:
+        raise ValueError("The projection must end on or after its start.")
+    days = int((end - start).astype(np.int64)) + 1
+
+    def daily_totals(series: _Series) -> np.ndarray:
+        when, amount = series.expand(start, end)
+        index = (when - start).astype(np.int64)
+        return np.bincount(index, weights=amount, minlength=days)
+
+    inflow = daily_totals(income_series(income))
+    outflow = daily_totals(expense_series(expenses))
+    return Projection(
+        dates=start + np.arange(days),
+        income=inflow,
+        expenses=outflow,
+        balance=opening_balance + np.cumsum(inflow - outflow),
+    )
@@ -0,0 +1,144 @@
+"""Projections kept up to date one item at a time.
+
+A projection is the sum of each recurring item's occurrences, so the daily
+totals of a date range can be kept and patched: when an expense or income
+row is added, changed or disabled, only that item's old occurrences are
+subtracted and its new ones added, which costs its number of occurrences
+in the range rather than a rebuild over every item.
+
+The schedule row of every active item is kept per database, which is what
+an item's contribution is computed from, and change_log says which items
+changed since the last read.
+"""
+
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+
+from ..database.change_log import FeedReader, FeedRegistry, rows_by_id
+from ..database.repositories import ExpenseRepository, IncomeRepository, Repository
+from .projection import Projection, expense_series, income_series, parse_day
+
+# date ranges kept per database, least recently used dropped first
+MAX_RANGES = 16
+
+SCHEDULES = {
+    "expenses": (ExpenseRepository.SCHEDULE_COLUMNS, expense_series),
+    "income": (IncomeRepository.SCHEDULE_COLUMNS, income_series),
+}
+
+
+def _schedulable(table: str, row: tuple) -> bool:
+    # an expense whose estimated_date does not parse never occurs, so legacy
+    # rows like that are not kept
+    return table != "expenses" or not np.isnat(parse_day(row[1]))
+
+
+class _Range:
+    """Daily income and expense totals over [start, end]."""
+
+    def __init__(self, start: date, end: date):
+        self.start = np.datetime64(start, "D")
+        self.end = np.datetime64(end, "D")
+        days = int((self.end - self.start).astype(np.int64)) + 1
+        self.totals = {"income": np.zeros(days), "expenses": np.zeros(days)}
+
+    def apply(self, table: str, rows: list, sign: float = 1.0):
+        """Add the occurrences of ``rows``, or subtract them with ``sign``
+        -1."""
+        if not rows:
+            return
+        when, amount = SCHEDULES[table][1](rows).expand(self.start, self.end)
+        index = (when - self.start).astype(np.int64)
+        totals = self.totals[table]
+        np.add.at(totals, index, sign * amount)
+        if sign < 0:
+            # rounding residue would make an emptied day look active
+            emptied = index[np.abs(totals[index]) < 1e-9]
+            totals[emptied] = 0.0
+
+
+class ProjectionCache(FeedReader):
+    """Projections of one database, by date range."""
+
+    def __init__(self, repository: Repository, max_ranges: int = MAX_RANGES):
+        super().__init__(repository)
+        self.max_ranges = max_ranges
+        self._ranges = OrderedDict()
+        self.reset()
+        self.builds = 0
+        self.patched = 0
+
+    def reset(self):
+        self._ranges.clear()
+        # id -> schedule row of each active item
+        self._items = {table: {} for table in SCHEDULES}
+        self._last_ids = dict.fromkeys(SCHEDULES, 0)
+
+    def catch_up(self, cursor):
+        for table, (columns, _) in SCHEDULES.items():
+            self._refresh_table(cursor, table, ", ".join(columns))
+
+    def _refresh_table(self, cursor, table: str, select: str):
+        items = self._items[table]
+        last_id = self._last_ids[table]
+        select += ", disabled"
+        added = cursor.execute(
+            f"SELECT {select} FROM {table} WHERE id > ? ORDER BY id", [last_id]
+        ).fetchall()
+        if added:
+            self._last_ids[table] = added[-1][0]
+        changed = self.feed.changed_ids(cursor, table, last_id)
+        removed = [items.pop(item_id) for item_id in changed if item_id in items]
+        current = [
+            row[:-1]
+            for row in added + rows_by_id(cursor, table, select, changed)
+            if not row[-1] and _schedulable(table, row)
+        ]
+        items.update((row[0], row) for row in current)
+        for projection in self._ranges.values():
+            projection.apply(table, removed, -1.0)
+            projection.apply(table, current, 1.0)
+        if self._ranges:
+            self.patched += len(removed) + len(current)
+
+    def _range(self, start: date, end: date) -> _Range:
+        key = (start, end)
+        projection = self._ranges.get(key)
+        if projection is None:
+            projection = self._ranges[key] = _Range(start, end)
+            for table, items in self._items.items():
+                projection.apply(table, list(items.values()))
+            self.builds += 1
+            if len(self._ranges) > self.max_ranges:
+                self._ranges.popitem(last=False)
+        self._ranges.move_to_end(key)
+        return projection
+
+    def project(
+        self, start: date, end: date, opening_balance: float = 0.0
+    ) -> Projection:
+        """The same projection as ``projection.project`` over the active
+        expenses and income."""
+        if end < start:
+            raise ValueError("The projection must end on or after its start.")
+        with self.lock:
+            self.refresh()
+            projection = self._range(start, end)
+            inflow = projection.totals["income"].copy()
+            outflow = projection.totals["expenses"].copy()
+        return Projection(
+            dates=projection.start + np.arange(len(inflow)),
+            income=inflow,
+            expenses=outflow,
+            balance=opening_balance + np.cumsum(inflow - outflow),
+        )
+
+
+_caches = FeedRegistry(ProjectionCache)
+
+
+def get_cache(repository: Repository) -> ProjectionCache:
+    """The shared cache for ``repository``'s database file."""
+    return _caches.get(repository)
@@ -0,0 +1,413 @@
+"""Columnar, NumPy-backed reports over expenses and income.
+
+Both tables are held in memory as one array per column, disabled rows
+included, and brought up to date before each report: rows with an id above
+the last one loaded are appended (ids only grow) and rows named in
+change_log since the last refresh are re-read in place. Reports then reduce
+the arrays with bincount and masks rather than looping over rows.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from ..database.change_log import ChangeFeed, FeedReader, FeedRegistry, rows_by_id
+from ..database.repositories import Repository
+from .projection import parse_days
+
+GROUP_KEYS = ("month", "responsible", "shared", "frequency")
+
+# periods per month, for income recorded per pay period
+MONTHLY_FACTORS = {
+    "Daily": 365 / 12,
+    "Weekly": 52 / 12,
+    "Bi-weekly": 26 / 12,
+    "Semi-Monthly": 2.0,
+    "Monthly": 1.0,
+}
+
+# bincount over every combination of group keys up to this many; sparser
+# combinations are grouped with np.unique instead
+DENSE_GROUPS = 1 << 22
+
+# the month of a date that does not parse (NaT as int64); such rows are left
+# out of every report
+UNKNOWN_MONTH = np.iinfo(np.int64).min
+
+
+class _Labels:
+    """Dictionary-encodes strings as int32 codes that stay stable as new
+    values arrive."""
+
+    def __init__(self):
+        self._codes = {}
+        self.values = []
+
+    def encode(self, values: List[str]) -> np.ndarray:
+        codes = self._codes
+        encoded = [codes.setdefault(value, len(codes)) for value in values]
+        self.values = list(codes)
+        return np.array(encoded, dtype=np.int32)
+
+
+def _months(dates: List[str]) -> np.ndarray:
+    """Months since 1970-01 of ``YYYY-MM-DD`` strings, or UNKNOWN_MONTH for
+    those that are not dates."""
+    return parse_days(dates).astype("datetime64[M]").astype(np.int64)
+
+
+def month_label(month: int) -> str:
+    return str(np.datetime64(int(month), "M"))
+
+
+def parse_month(value: str) -> int:
+    return int(np.datetime64(value, "M").astype(np.int64))
+
+
+class ColumnTable:
+    """One table's columns, in id order.
+
+    ``columns`` maps a column name to how it is stored: ``month`` (int64
+    months from a date), ``float`` (NULL becomes NaN), ``flag`` (bool) or
+    ``label`` (int32 codes into ``labels[name].values``).
+    """
+
+    def __init__(self, table: str, columns: Dict[str, str]):
+        self.table = table
+        self.columns = columns
+        self.select = "id, disabled, " + ", ".join(columns)
+        self.reset()
+
+    def reset(self):
+        self.ids = np.empty(0, np.int64)
+        self.active = np.empty(0, bool)
+        self.labels = {
+            name: _Labels() for name, kind in self.columns.items() if kind == "label"
+        }
+        self.data = {
+            name: self._convert(name, []) for name, kind in self.columns.items()
+        }
+
+    def _convert(self, name: str, values: list) -> np.ndarray:
+        kind = self.columns[name]
+        if kind == "month":
+            return _months(values) if values else np.empty(0, np.int64)
+        if kind == "float":
+            return np.array(values, dtype=float)
+        if kind == "flag":
+            return np.array(values, dtype=bool)
+        return self.labels[name].encode(values)
+
+    def _split(self, rows: list):
+        columns = list(zip(*rows))
+        ids = np.array(columns[0], dtype=np.int64)
+        active = ~np.array(columns[1], dtype=bool)
+        data = {
+            name: self._convert(name, list(values))
+            for name, values in zip(self.columns, columns[2:])
+        }
+        return ids, active, data
+
+    @property
+    def max_id(self) -> int:
+        return int(self.ids[-1]) if len(self.ids) else 0
+
+    def append(self, rows: list):
+        if not rows:
+            return
+        ids, active, data = self._split(rows)
+        self.ids = np.concatenate([self.ids, ids])
+        self.active = np.concatenate([self.active, active])
+        for name, values in data.items():
+            self.data[name] = np.concatenate([self.data[name], values])
+
+    def update(self, changed_ids: Iterable[int], rows: list):
+        """Overwrite re-read rows; changed ids with no row were deleted."""
+        changed_ids = np.fromiter(changed_ids, dtype=np.int64)
+        position = np.searchsorted(self.ids, changed_ids)
+        known = position < len(self.ids)
+        known[known] = self.ids[position[known]] == changed_ids[known]
+        self.active[position[known]] = False
+        if not rows:
+            return
+        ids, active, data = self._split(rows)
+        position = np.searchsorted(self.ids, ids)
+        self.active[position] = active
+        for name, values in data.items():
+            self.data[name][position] = values
+
+    def refresh(self, cursor, feed: ChangeFeed):
+        """Load rows added after ``max_id`` and re-read those changed since
+        the feed's last read."""
+        last_id = self.max_id
+        self.append(
+            cursor.execute(
+                f"SELECT {self.select} FROM {self.table} WHERE id > ? ORDER BY id",
+                [last_id],
+            ).fetchall()
+        )
+        changed = feed.changed_ids(cursor, self.table, last_id)
+        if changed:
+            self.update(changed, rows_by_id(cursor, self.table, self.select, changed))
+
+
+class ReportStore(FeedReader):
+    """The expense and income columns of one database."""
+
+    def __init__(self, repository: Repository):
+        super().__init__(repository)
+        self.expenses = ColumnTable(
+            "expenses",
+            {
+                "estimated_date": "month",
+                "estimated_amount": "float",
+                "actual_amount": "float",
+                "responsible": "label",
+                "shared": "flag",
+                "frequency": "label",
+            },
+        )
+        self.income = ColumnTable("income", {"amount": "float", "frequency": "label"})
+
+    def reset(self):
+        for table in (self.expenses, self.income):
+            table.reset()
+
+    def catch_up(self, cursor):
+        for table in (self.expenses, self.income):
+            table.refresh(cursor, self.feed)
+
+
+_stores = FeedRegistry(ReportStore)
+
+
+def get_store(repository: Repository) -> ReportStore:
+    """The shared store for ``repository``'s database file."""
+    return _stores.get(repository)
+
+
+def _month_mask(months: np.ndarray, start: str = None, end: str = None):
+    mask = months != UNKNOWN_MONTH
+    if start:
+        mask &= months >= parse_month(start)
+    if end:
+        mask &= months <= parse_month(end)
+    return mask
+
+
+def _groups(table: ColumnTable, mask: np.ndarray, group_by: List[str]):
+    """Return each selected row's group index and a function naming a
+    group's keys."""
+    codes, sizes, namers = [], [], []
+    for key in group_by:
+        if key == "month":
+            months = table.data["estimated_date"][mask]
+            first = int(months.min()) if len(months) else 0
+            codes.append(months - first)
+            sizes.append(int(months.max()) - first + 1 if len(months) else 1)
+            namers.append(lambda code, first=first: month_label(first + code))
+        elif key == "shared":
+            codes.append(table.data["shared"][mask].astype(np.int64))
+            sizes.append(2)
+            namers.append(bool)
+        else:
+            values = table.labels[key].values
+            codes.append(table.data[key][mask].astype(np.int64))
+            sizes.append(max(len(values), 1))
+            namers.append(lambda code, values=values: values[code])
+
+    if not group_by:
+        index = np.zeros(int(mask.sum()), np.int64)
+        return index, 1, lambda group: {}
+    flat = np.ravel_multi_index(codes, sizes) if codes[0].size else codes[0]
+    dims = int(np.prod(sizes))
+    unique = None
+    if dims > DENSE_GROUPS:
+        unique, flat = np.unique(flat, return_inverse=True)
+        dims = len(unique)
+
+    def name(group: int) -> dict:
+        if unique is not None:
+            group = unique[group]
+        keys = np.unravel_index(int(group), sizes)
+        return {
+            key: namer(int(code)) for key, namer, code in zip(group_by, namers, keys)
+        }
+
+    return flat, dims, name
+
+
+def _effective(table: ColumnTable) -> np.ndarray:
+    # what an expense cost: its actual amount once known, else the estimate
+    actual = table.data["actual_amount"]
+    return np.where(np.isnan(actual), table.data["estimated_amount"], actual)
+
+
+def _validate_group_by(group_by: List[str]):
+    unknown = [key for key in group_by if key not in GROUP_KEYS]
+    if unknown:
+        raise ValueError(f"Unknown group keys: {', '.join(unknown)}")
+
+
+def expense_totals(
+    store: ReportStore, group_by: List[str], start: str = None, end: str = None
+) -> List[dict]:
+    """Counts and sums of estimated and actual amounts per group."""
+    _validate_group_by(group_by)
+    table = store.expenses
+    mask = table.active & _month_mask(table.data["estimated_date"], start, end)
+    index, dims, name = _groups(table, mask, group_by)
+    estimated = table.data["estimated_amount"][mask]
+    actual = table.data["actual_amount"][mask]
+    settled = ~np.isnan(actual)
+
+    count = np.bincount(index, minlength=dims)
+    estimated_total = np.bincount(index, weights=estimated, minlength=dims)
+    actual_count = np.bincount(index, weights=settled, minlength=dims)
+    actual_total = np.bincount(
+        index, weights=np.where(settled, actual, 0.0), minlength=dims
+    )
+    return [
+        {
+            **name(group),
+            "expense_count": int(count[group]),
+            "estimated_total": float(estimated_total[group]),
+            "actual_count": int(actual_count[group]),
+            "actual_total": float(actual_total[group]),
+        }
+        for group in np.flatnonzero(count)
+    ]
+
+
+def expense_variance(
+    store: ReportStore, group_by: List[str], start: str = None, end: str = None
+) -> List[dict]:
+    """Actual against estimated amounts per group, over the expenses whose
+    actual amount is known."""
+    _validate_group_by(group_by)
+    table = store.expenses
+    actual = table.data["actual_amount"]
+    mask = (
+        table.active
+        & ~np.isnan(actual)
+        & _month_mask(table.data["estimated_date"], start, end)
+    )
+    index, dims, name = _groups(table, mask, group_by)
+    count = np.bincount(index, minlength=dims)
+    estimated = np.bincount(
+        index, weights=table.data["estimated_amount"][mask], minlength=dims
+    )
+    spent = np.bincount(index, weights=actual[mask], minlength=dims)
+    difference = spent - estimated
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent = np.where(estimated != 0, difference / estimated * 100, np.nan)
+    return [
+        {
+            **name(group),
+            "settled_count": int(count[group]),
+            "estimated_total": float(estimated[group]),
+            "actual_total": float(spent[group]),
+            "difference": float(difference[group]),
+            "percent": None if np.isnan(percent[group]) else float(percent[group]),
+        }
+        for group in np.flatnonzero(count)
+    ]
+
+
+def shared_split(store: ReportStore, start: str = None, end: str = None) -> List[dict]:
+    """What each responsible person paid against their fair share, where
+    shared expenses are split evenly among everyone responsible for an
+    expense in the period."""
+    table = store.expenses
+    mask = table.active & _month_mask(table.data["estimated_date"], start, end)
+    responsible = table.data["responsible"][mask]
+    shared = table.data["shared"][mask]
+    amount = _effective(table)[mask]
+    people = len(table.labels["responsible"].values)
+
+    paid = np.bincount(responsible, weights=amount, minlength=people)
+    count = np.bincount(responsible, minlength=people)
+    shared_paid = np.bincount(
+        responsible, weights=np.where(shared, amount, 0.0), minlength=people
+    )
+    members = np.flatnonzero(count)
+    shared_share = shared_paid.sum() / len(members) if len(members) else 0.0
+    names = table.labels["responsible"].values
+    return [
+        {
+            "responsible": names[person],
+            "paid": float(paid[person]),
+            "personal": float(paid[person] - shared_paid[person]),
+            "shared_paid": float(shared_paid[person]),
+            "shared_share": float(shared_share),
+            "balance": float(shared_paid[person] - shared_share),
+        }
+        for person in members
+    ]
+
+
+def monthly_deltas(
+    store: ReportStore,
+    start: str = None,
+    end: str = None,
+    responsible: Optional[str] = None,
+) -> List[dict]:
+    """Spending per month, every month in range, with the change from the
+    month before."""
+    table = store.expenses
+    months = table.data["estimated_date"]
+    mask = table.active & _month_mask(months, start, end)
+    if responsible is not None:
+        labels = table.labels["responsible"].values
+        code = labels.index(responsible) if responsible in labels else -1
+        mask &= table.data["responsible"] == code
+    months = months[mask]
+    if not len(months):
+        return []
+    first = int(months.min())
+    totals = np.bincount(months - first, weights=_effective(table)[mask])
+    delta = np.diff(totals, prepend=np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent = delta / totals[np.r_[0, : len(totals) - 1]] * 100
+    percent[0] = np.nan
+    return [
+        {
+            "month": month_label(first + i),
+            "total": float(totals[i]),
+            "delta": None if np.isnan(delta[i]) else float(delta[i]),
+            "percent": None if not np.isfinite(percent[i]) else float(percent[i]),
+        }
+        for i in range(len(totals))
+    ]
+
+
+def income_totals(store: ReportStore) -> List[dict]:
+    """Active income per frequency, with its monthly equivalent."""
+    table = store.income
+    mask = table.active
+    frequency = table.data["frequency"][mask]
+    amount = table.data["amount"][mask]
+    labels = table.labels["frequency"].values
+    factors = np.array([MONTHLY_FACTORS.get(label, 0.0) for label in labels])
+    size = max(len(labels), 1)
+    count = np.bincount(frequency, minlength=size)
+    total = np.bincount(frequency, weights=amount, minlength=size)
+    monthly = np.bincount(
+        frequency, weights=amount * factors[frequency], minlength=size
+    )
+    return [
+        {
+            "frequency": labels[code],
+            "income_count": int(count[code]),
+            "total": float(total[code]),
+            "monthly_equivalent": float(monthly[code]),
+        }
+        for code in np.flatnonzero(count)
+    ]
+
+
+def run(store: ReportStore, report, *args):
+    """Refresh ``store`` and compute ``report`` from it."""
+    with store.lock:
+        store.refresh()
+        return report(store, *args)
@@ -0,0 +1,343 @@
+import importlib
+from datetime import date, timedelta
+from typing import List, Literal, Optional
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from ..auth.dependencies import get_current_user
+from ..database import (
+    get_expense_repository,
+    get_income_repository,
+    get_write_batcher,
+)
+from ..database.async_repositories import AsyncRepository
+from ..database.exceptions import ImportAbortedError, InvalidDataError
+from ..database.repositories import (
+    MAX_PAGE_SIZE,
+    PAGE_SIZE,
+    ExpenseRepository,
+    IncomeRepository,
+)
+from ..database.write_batcher import WriteBatcher, statement
+from .importers import detect_format, iter_records
+from .schemas import (
+    Expense,
+    ExpensePage,
+    ExpenseTotal,
+    ExpenseVariance,
+    ImportResult,
+    Income,
+    IncomePage,
+    IncomeTotal,
+    MonthlyDelta,
+    NewExpense,
+    NewIncome,
+    MonthlyTotal,
+    ProjectionPoint,
+    ProjectionResult,
+    SharedSplit,
+)
+
+router = APIRouter(dependencies=[Depends(get_current_user)])
+
+NDJSON = "application/x-ndjson"
+ListFormat = Literal["json", "ndjson"]
+GroupKey = Literal["month", "responsible", "shared", "frequency"]
+
+MONTH_PATTERN = r"^\d{4}-\d{2}$"
+PROJECTION_DAYS = 365
+MAX_PROJECTION_DAYS = 30 * 366
+
+
+def stream_ndjson(repository: AsyncRepository, method: str, model, after: int):
+    async def lines():
+        rows = repository.iterate(method, after=after, columns=model.model_fields)
+        async for row in rows:
+            yield model.from_row(row).model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type=NDJSON)
+
+
+async def list_page(
+    repository: AsyncRepository, method: str, model, page, after: int, limit: int
+):
+    # only the columns the model shows
+    rows = await getattr(repository, method)(
+        after=after, limit=limit, columns=model.model_fields
+    )
+    items = [model.from_row(row) for row in rows]
+    # a full page means there may be more; the client resumes after the last id
+    next_after = items[-1].id if len(items) == limit else None
+    return page(items=items, next_after=next_after)
+
+
+async def import_file(file: UploadFile, add_bulk) -> ImportResult:
+    try:
+        fmt = detect_format(file.filename, file.content_type)
+    except InvalidDataError as e:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=e.message
+        ) from e
+
+    try:
+        # parsing and inserting both run on the DB thread, chunk by chunk
+        result = await add_bulk(iter_records(file.file, fmt))
+    except ImportAbortedError as e:
+        # the chunks before the unreadable part stay committed, so say what
+        # got in and what did not
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": e.message, **ImportResult(**e.result).model_dump()},
+        ) from e
+    except InvalidDataError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=e.message
+        ) from e
+    return ImportResult(**result)
+
+
+@router.post("/expenses/import", response_model=ImportResult)
+async def import_expenses(
+    file: UploadFile,
+    expenserepository: AsyncRepository = Depends(get_expense_repository),
+):
+    return await import_file(file, expenserepository.add_expenses_bulk)
+
+
+@router.post("/income/import", response_model=ImportResult)
+async def import_income(
+    file: UploadFile,
+    incomerepository: AsyncRepository = Depends(get_income_repository),
+):
+    return await import_file(file, incomerepository.add_income_bulk)
+
+
+def validated(to_params, data: dict) -> list:
+    try:
+        return to_params(data)
+    except InvalidDataError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=e.message
+        ) from e
+
+
+async def disable(writer: WriteBatcher, query: str, record_id: int, record_type: str):
+    if not await writer.run(statement(query, [record_id])):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{record_type} {record_id} not found",
+        )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+# single-row writes go through the write batcher, which commits those from
+# concurrent requests together
+
+
+@router.post("/expenses", response_model=Expense, status_code=status.HTTP_201_CREATED)
+async def create_expense(
+    expense: NewExpense,
+    expenserepository: AsyncRepository = Depends(get_expense_repository),
+    writer: WriteBatcher = Depends(get_write_batcher),
+):
+    params = validated(
+        expenserepository.repository.expense_params, expense.model_dump()
+    )
+    expense_id = await writer.run(statement(ExpenseRepository.INSERT_EXPENSE, params))
+    return Expense(id=expense_id, **dict(zip(NewExpense.model_fields, params)))
+
+
+@router.delete("/expenses/{expense_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_expense(
+    expense_id: int, writer: WriteBatcher = Depends(get_write_batcher)
+):
+    return await disable(
+        writer, ExpenseRepository.DISABLE_EXPENSE, expense_id, "Expense"
+    )
+
+
+@router.post("/income", response_model=Income, status_code=status.HTTP_201_CREATED)
+async def create_income(
+    income: NewIncome,
+    incomerepository: AsyncRepository = Depends(get_income_repository),
+    writer: WriteBatcher = Depends(get_write_batcher),
+):
+    params = validated(incomerepository.repository.income_params, income.model_dump())
+    income_id = await writer.run(statement(IncomeRepository.INSERT_INCOME, params))
+    return Income(id=income_id, **dict(zip(NewIncome.model_fields, params)))
+
+
+@router.delete("/income/{income_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_income(
+    income_id: int, writer: WriteBatcher = Depends(get_write_batcher)
+):
+    return await disable(writer, IncomeRepository.DISABLE_INCOME, income_id, "Income")
+
+
+@router.get("/expenses/summary", response_model=List[MonthlyTotal])
+async def expense_summary(
+    start: str = Query("0000-00", pattern=MONTH_PATTERN),
+    end: str = Query("9999-99", pattern=MONTH_PATTERN),
+    responsible: Optional[str] = None,
+    expenserepository: AsyncRepository = Depends(get_expense_repository),
+):
+    rows = await expenserepository.get_monthly_totals(start, end, responsible)
+    return [MonthlyTotal.from_row(row) for row in rows]
+
+
+def numpy_module(name: str):
+    """Import one of this package's NumPy-backed modules.
+
+    They are imported on first use rather than at startup, so serving the
+    other endpoints never loads NumPy.
+    """
+    return importlib.import_module(f".{name}", __package__)
+
+
+async def run_report(repository: AsyncRepository, name: str, *args):
+    reports = numpy_module("reports")
+    store = reports.get_store(repository.repository)
+    return await run_in_threadpool(reports.run, store, getattr(reports, name), *args)
+
+
+@router.get(
+    "/reports/expenses/totals",
+    response_model=List[ExpenseTotal],
+    response_model_exclude_unset=True,
+)
+async def expense_totals_report(
+    group_by: List[GroupKey] = Query(["month"]),
+    start: Optional[str] = Query(None, pattern=MONTH_PATTERN),
+    end: Optional[str] = Query(None, pattern=MONTH_PATTERN),
+    expenserepository: AsyncRepository = Depends(get_expense_repository),
+):
+    return await run_report(expenserepository, "expense_totals", group_by, start, end)
+
+
+@router.get(
+    "/reports/expenses/variance",
+    response_model=List[ExpenseVariance],
+    response_model_exclude_unset=True,
+)
+async def expense_variance_report(
+    group_by: List[GroupKey] = Query(["month"]),
+    start: Optional[str] = Query(None, pattern=MONTH_PATTERN),
+    end: Optional[str] = Query(None, pattern=MONTH_PATTERN),
+    expenserepository: AsyncRepository = Depends(get_expense_repository),
+):
+    return await run_report(expenserepository, "expense_variance", group_by, start, end)
+
+
+@router.get("/reports/expenses/shared", response_model=List[SharedSplit])
+async def shared_split_report(
+    start: Optional[str] = Query(None, pattern=MONTH_PATTERN),
+    end: Optional[str] = Query(None, pattern=MONTH_PATTERN),
+    expenserepository: AsyncRepository = Depends(get_expense_repository),
+):
+    return await run_report(expenserepository, "shared_split", start, end)
+
+
+@router.get("/reports/expenses/monthly", response_model=List[MonthlyDelta])
+async def monthly_deltas_report(
+    start: Optional[str] = Query(None, pattern=MONTH_PATTERN),
+    end: Optional[str] = Query(None, pattern=MONTH_PATTERN),
+    responsible: Optional[str] = None,
+    expenserepository: AsyncRepository = Depends(get_expense_repository),
+):
+    return await run_report(
+        expenserepository, "monthly_deltas", start, end, responsible
+    )
+
+
+@router.get("/reports/income/totals", response_model=List[IncomeTotal])
+async def income_totals_report(
+    incomerepository: AsyncRepository = Depends(get_income_repository),
+):
+    return await run_report(incomerepository, "income_totals")
+
+
+@router.get(
+    "/expenses",
+    response_model=ExpensePage,
+    responses={200: {"content": {NDJSON: {}}}},
+)
+async def list_expenses(
+    after: int = Query(0, ge=0),
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    format: ListFormat = "json",
+    expenserepository: AsyncRepository = Depends(get_expense_repository),
+):
+    if format == "ndjson":
+        return stream_ndjson(expenserepository, "iter_expenses", Expense, after)
+    return await list_page(
+        expenserepository, "get_expenses_page", Expense, ExpensePage, after, limit
+    )
+
+
+@router.get(
+    "/income",
+    response_model=IncomePage,
+    responses={200: {"content": {NDJSON: {}}}},
+)
+async def list_income(
+    after: int = Query(0, ge=0),
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    format: ListFormat = "json",
+    incomerepository: AsyncRepository = Depends(get_income_repository),
+):
+    if format == "ndjson":
+        return stream_ndjson(incomerepository, "iter_income", Income, after)
+    return await list_page(
+        incomerepository, "get_income_page", Income, IncomePage, after, limit
+    )
+
+
+@router.get("/projection", response_model=ProjectionResult)
+async def get_projection(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    opening_balance: float = 0.0,
+    changes_only: bool = True,
+    expenserepository: AsyncRepository = Depends(get_expense_repository),
+):
+    start = start or date.today()
+    end = end or start + timedelta(days=PROJECTION_DAYS)
+    if end < start or (end - start).days > MAX_PROJECTION_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The projection must end within {MAX_PROJECTION_DAYS} days after it starts",
+        )
+
+    # the cache reads income from the same database as expenses
+    cache = numpy_module("projection_cache").get_cache(expenserepository.repository)
+    # the expansion is CPU-bound, so keep it off the event loop
+    projection = await run_in_threadpool(cache.project, start, end, opening_balance)
+    closing_balance = float(projection.balance[-1])
+    if changes_only:
+        projection = projection.active()
+    points = [
+        ProjectionPoint(date=day, income=inflow, expenses=outflow, balance=balance)
+        for day, inflow, outflow, balance in zip(
+            projection.dates.tolist(),
+            projection.income.tolist(),
+            projection.expenses.tolist(),
+            projection.balance.tolist(),
+        )
+    ]
+    return ProjectionResult(
+        start=start,
+        end=end,
+        opening_balance=opening_balance,
+        closing_balance=closing_balance,
+        points=points,
+    )
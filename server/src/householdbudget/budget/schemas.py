@@ -0,0 +1,152 @@
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class RowError(BaseModel):
+    row: int
+    error: str
+
+
+class ImportResult(BaseModel):
+    inserted: int
+    errors: List[RowError] = []
+
+
+# fields in INSERT parameter order
+class NewExpense(BaseModel):
+    estimated_date: str
+    name: str
+    estimated_amount: float
+    actual_amount: Optional[float] = None
+    responsible: str
+    frequency: str
+    shared: bool
+
+
+class Expense(BaseModel):
+    id: int
+    estimated_date: str
+    name: str
+    estimated_amount: float
+    actual_amount: Optional[float] = None
+    responsible: str
+    frequency: str
+    shared: bool
+
+    @classmethod
+    def from_row(cls, row) -> "Expense":
+        """Build from an ExpenseRow; columns the model lacks are ignored."""
+        return cls(**row._asdict())
+
+
+class NewIncome(BaseModel):
+    amount: float
+    frequency: str
+    bi_weekly_week: Optional[int] = None
+
+
+class Income(BaseModel):
+    id: int
+    amount: float
+    frequency: str
+    bi_weekly_week: Optional[int] = None
+
+    @classmethod
+    def from_row(cls, row) -> "Income":
+        """Build from an IncomeRow; columns the model lacks are ignored."""
+        return cls(**row._asdict())
+
+
+class ExpensePage(BaseModel):
+    items: List[Expense]
+    next_after: Optional[int] = None
+
+
+class IncomePage(BaseModel):
+    items: List[Income]
+    next_after: Optional[int] = None
+
+
+class ProjectionPoint(BaseModel):
+    date: date
+    income: float
+    expenses: float
+    balance: float
+
+
+class ProjectionResult(BaseModel):
+    start: date
+    end: date
+    opening_balance: float
+    closing_balance: float
+    points: List[ProjectionPoint]
+
+
+class MonthlyTotal(BaseModel):
+    month: str
+    responsible: str
+    shared: bool
+    expense_count: int
+    estimated_total: float
+    actual_count: int
+    actual_total: float
+
+    @classmethod
+    def from_row(cls, row) -> "MonthlyTotal":
+        return cls(
+            month=row[0],
+            responsible=row[1],
+            shared=row[2],
+            expense_count=row[3],
+            estimated_total=row[4],
+            actual_count=row[5],
+            actual_total=row[6],
+        )
+
+
+# report rows carry only the keys they were grouped by
+class GroupKeys(BaseModel):
+    month: Optional[str] = None
+    responsible: Optional[str] = None
+    shared: Optional[bool] = None
+    frequency: Optional[str] = None
+
+
+class ExpenseTotal(GroupKeys):
+    expense_count: int
+    estimated_total: float
+    actual_count: int
+    actual_total: float
+
+
+class ExpenseVariance(GroupKeys):
+    settled_count: int
+    estimated_total: float
+    actual_total: float
+    difference: float
+    percent: Optional[float] = None
+
+
+class SharedSplit(BaseModel):
+    responsible: str
+    paid: float
+    personal: float
+    shared_paid: float
+    shared_share: float
+    balance: float
+
+
+class MonthlyDelta(BaseModel):
+    month: str
+    total: float
+    delta: Optional[float] = None
+    percent: Optional[float] = None
+
+
+class IncomeTotal(BaseModel):
+    frequency: str
+    income_count: int
+    total: float
+    monthly_equivalent: float
@@ -1,34 +1,90 @@
 # Initialize the database package
 
 import os
+import threading
 
 from dotenv import load_dotenv
 
 from ..utils.db_utils import validate_db_file
+from .async_repositories import AsyncRepository, create_db_executor
 from .connection import create_tables
 from .factory import RepositoryFactory
+from .write_batcher import WriteBatcher
 
 
 class RepositorySelector:
     def __init__(self, dbfile):
         validate_db_file(dbfile)
-        # check if the sqlite file is empty
-        if os.stat(dbfile).st_size == 0:
-            # if its empty, populate the tables
-            create_tables(dbfile)
+        # apply any pending migrations; a no-op when the schema is current
+        create_tables(dbfile)
 
+        self.dbfile = dbfile
         self._repository_factory: RepositoryFactory = RepositoryFactory(dbfile)
         self._repositories = {
             "user": self._repository_factory.get_user_repository(),
             "expense": self._repository_factory.get_expense_repository(),
             "income": self._repository_factory.get_income_repository(),
         }
+        # the async facades share the repositories above
+        self._executor = create_db_executor()
+        self._async_repositories = {
+            name: AsyncRepository(repository, self._executor)
+            for name, repository in self._repositories.items()
+        }
+        # single-row mutations from the routes are group-committed
+        self.writer = WriteBatcher(dbfile)
 
     def get_repository(self, name):
         return self._repositories.get(name)
 
+    def get_async_repository(self, name) -> AsyncRepository:
+        return self._async_repositories.get(name)
+
+    def shutdown(self):
+        self.writer.close()
+        self._executor.shutdown(wait=True)
+
+
+# created on first use rather than at import, so importing the package
+# never touches the file system
+_selector: RepositorySelector = None
+_selector_lock = threading.Lock()
+
+
+def init_repository_selector(dbfile: str = None) -> RepositorySelector:
+    """Create the shared selector, migrating the database; a no-op once done."""
+    global _selector
+    with _selector_lock:
+        if _selector is None:
+            load_dotenv()
+            _selector = RepositorySelector(dbfile or os.getenv("DBFILE"))
+        return _selector
+
+
+def get_repository_selector() -> RepositorySelector:
+    return _selector or init_repository_selector()
+
+
+def close_repository_selector():
+    global _selector
+    with _selector_lock:
+        selector, _selector = _selector, None
+    if selector is not None:
+        selector.shutdown()
+
+
+# route dependencies, e.g. ``repository: AsyncRepository = Depends(get_user_repository)``
+def get_user_repository() -> AsyncRepository:
+    return get_repository_selector().get_async_repository("user")
+
+
+def get_expense_repository() -> AsyncRepository:
+    return get_repository_selector().get_async_repository("expense")
+
+
+def get_income_repository() -> AsyncRepository:
+    return get_repository_selector().get_async_repository("income")
 
-load_dotenv()
-dbfile = os.getenv("DBFILE")
 
-repository_selector = RepositorySelector(dbfile)
+def get_write_batcher() -> WriteBatcher:
+    return get_repository_selector().writer
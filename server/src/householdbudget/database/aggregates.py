@@ -0,0 +1,141 @@
+"""Rebuild and check the aggregate tables that triggers keep up to date.
+
+run:
+  python -m householdbudget.database.aggregates check
+  python -m householdbudget.database.aggregates rebuild
+"""
+
+import argparse
+import math
+import os
+import sqlite3
+import sys
+from contextlib import contextmanager
+from typing import NamedTuple
+
+from dotenv import load_dotenv
+
+from .connection import DatabaseConnection, create_tables
+from .migrations import valid_date
+
+
+class Aggregate(NamedTuple):
+    table: str
+    key: tuple
+    source: str
+
+
+AGGREGATES = {
+    "expense_monthly_totals": Aggregate(
+        table="expense_monthly_totals",
+        key=("month", "responsible", "shared"),
+        source=f"""
+            SELECT substr(estimated_date, 1, 7), responsible, shared,
+                   count(*), total(estimated_amount),
+                   count(actual_amount), total(actual_amount)
+            FROM expenses WHERE disabled = 0 AND {valid_date("estimated_date")}
+            GROUP BY 1, 2, 3
+        """,
+    ),
+}
+
+
+def _get(name: str) -> Aggregate:
+    try:
+        return AGGREGATES[name]
+    except KeyError:
+        raise ValueError(f"Unknown aggregate table: {name}") from None
+
+
+def rebuild(connection: sqlite3.Connection, name: str) -> int:
+    """Recompute an aggregate table from its source; returns its row count."""
+    aggregate = _get(name)
+    with connection:
+        connection.execute(f"DELETE FROM {aggregate.table}")
+        cursor = connection.execute(f"INSERT INTO {aggregate.table} {aggregate.source}")
+    return cursor.rowcount
+
+
+@contextmanager
+def suspended(connection: sqlite3.Connection, name: str):
+    """Drop the triggers that maintain an aggregate table for the duration of
+    a bulk load, then rebuild the table and restore them.
+
+    Meant for offline loads: writes from other connections in the meantime
+    are only counted because of the rebuild.
+    """
+    aggregate = _get(name)
+    triggers = connection.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND sql LIKE ?",
+        [f"%{aggregate.table}%"],
+    ).fetchall()
+    with connection:
+        for trigger, _ in triggers:
+            connection.execute(f"DROP TRIGGER {trigger}")
+    try:
+        yield
+    finally:
+        with connection:
+            for _, sql in triggers:
+                connection.execute(sql)
+        rebuild(connection, name)
+
+
+def check(connection: sqlite3.Connection, name: str) -> list:
+    """Compare an aggregate table with its source.
+
+    Returns ``(key, stored, expected)`` for every group that differs, where
+    a missing group is ``None``. Totals are compared with a tolerance since
+    incremental sums round differently from a fresh one.
+    """
+    aggregate = _get(name)
+    width = len(aggregate.key)
+
+    def load(query):
+        return {row[:width]: row[width:] for row in connection.execute(query)}
+
+    stored = load(f"SELECT * FROM {aggregate.table}")
+    expected = load(aggregate.source)
+    mismatches = []
+    for key in sorted(stored.keys() | expected.keys()):
+        have, want = stored.get(key), expected.get(key)
+        if (
+            have is None
+            or want is None
+            or not all(
+                math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6)
+                for a, b in zip(have, want)
+            )
+        ):
+            mismatches.append((key, have, want))
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["check", "rebuild"])
+    parser.add_argument("tables", nargs="*", default=list(AGGREGATES))
+    parser.add_argument("--dbfile", default=None)
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    db_file = args.dbfile or os.getenv("DBFILE")
+    create_tables(db_file)
+
+    status = 0
+    with DatabaseConnection(db_file) as db_conn:
+        for name in args.tables:
+            if args.command == "rebuild":
+                rows = rebuild(db_conn.connection, name)
+                print(f"{name}: rebuilt {rows} rows")
+                continue
+            mismatches = check(db_conn.connection, name)
+            print(f"{name}: {len(mismatches)} mismatched groups")
+            for key, have, want in mismatches:
+                print(f"  {key}: stored {have}, expected {want}")
+            status = status or int(bool(mismatches))
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .factory import RepositoryFactory
+from .pool import DEFAULT_POOL_SIZE, ConnectionPool
+
+_DONE = object()
+
+
+class AsyncRepository:
+    """Awaitable facade over a blocking repository.
+
+    Every public method of the wrapped repository is exposed under the same
+    name as a coroutine that runs the call on a dedicated DB thread pool, so
+    route handlers can ``await`` it without blocking the event loop.
+    """
+
+    def __init__(self, repository, executor: ThreadPoolExecutor):
+        self._repository = repository
+        self._executor = executor
+
+    @property
+    def repository(self):
+        return self._repository
+
+    def __getattr__(self, name):
+        attr = getattr(self._repository, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            return await self._run(attr, *args, **kwargs)
+
+        return call
+
+    async def iterate(self, method: str, *args, **kwargs):
+        """Drive a generator method (e.g. ``iter_users``) on the DB threads."""
+        iterator = await self._run(getattr(self._repository, method), *args, **kwargs)
+        while True:
+            item = await self._run(next, iterator, _DONE)
+            if item is _DONE:
+                return
+            yield item
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # a copy of the caller's context, so per-request timings are kept
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._executor, context.run, functools.partial(func, *args, **kwargs)
+        )
+
+
+def create_db_executor(max_workers: int = None) -> ThreadPoolExecutor:
+    # one thread per pooled connection keeps threads from queueing on it
+    max_workers = max_workers or int(
+        os.getenv("DB_EXECUTOR_WORKERS", os.getenv("DB_POOL_SIZE", DEFAULT_POOL_SIZE))
+    )
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+
+
+class AsyncRepositoryFactory:
+    def __init__(
+        self, db_file: str, pool: ConnectionPool = None, max_workers: int = None
+    ):
+        self._factory = RepositoryFactory(db_file, pool=pool)
+        self._executor = create_db_executor(max_workers)
+
+    def get_user_repository(self):
+        return AsyncRepository(self._factory.get_user_repository(), self._executor)
+
+    def get_expense_repository(self):
+        return AsyncRepository(self._factory.get_expense_repository(), self._executor)
+
+    def get_income_repository(self):
+        return AsyncRepository(self._factory.get_income_repository(), self._executor)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
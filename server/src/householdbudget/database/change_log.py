@@ -0,0 +1,112 @@
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, List
+
+from .repositories import Repository
+
+# rows re-read per query when applying change_log entries
+CHANGED_CHUNK = 500
+
+
+class ChangeFeed:
+    """A reader's place in change_log, for keeping table rows in memory.
+
+    Within ``read``, rows with an id above the last one the reader loaded
+    are new (ids only grow) and ``changed_ids`` names the older rows updated
+    or deleted since the previous read. ``read`` also says when that is not
+    enough and everything must be reloaded: the pool was closed, which may
+    mean the file was replaced, or entries not yet seen were pruned.
+    """
+
+    def __init__(self, repository: Repository):
+        self.repository = repository
+        self.seq = 0
+        self.source = None
+        self._since = 0
+
+    @contextmanager
+    def read(self):
+        """Yield a cursor on one read snapshot and whether to reload."""
+        with self.repository.transaction() as cursor:
+            cursor.execute("BEGIN")
+            last_seq, first_seq = cursor.execute(
+                "SELECT max(seq), min(seq) FROM change_log"
+            ).fetchone()
+            pool = self.repository.pool
+            source = (pool, pool.generation)
+            reload = source != self.source or (
+                first_seq is not None and first_seq > self.seq + 1
+            )
+            self._since = 0 if reload else self.seq
+            yield cursor, reload
+            self.seq = self._since if last_seq is None else last_seq
+            self.source = source
+
+    def changed_ids(self, cursor, table: str, last_id: int) -> List[int]:
+        """Ids up to ``last_id`` changed in ``table`` since the last read."""
+        return [
+            row[0]
+            for row in cursor.execute(
+                "SELECT DISTINCT row_id FROM change_log WHERE table_name = ? AND seq > ? AND row_id <= ?",
+                [table, self._since, last_id],
+            )
+        ]
+
+
+def rows_by_id(cursor, table: str, select: str, ids: List[int]) -> list:
+    """Fetch the rows of ``table`` with the given ids, in id order; deleted
+    rows are missing."""
+    rows = []
+    for start in range(0, len(ids), CHANGED_CHUNK):
+        chunk = ids[start : start + CHANGED_CHUNK]
+        rows += cursor.execute(
+            f"SELECT {select} FROM {table} WHERE id IN ({', '.join('?' * len(chunk))}) ORDER BY id",
+            chunk,
+        ).fetchall()
+    return rows
+
+
+class FeedReader(ABC):
+    """Rows of one database held in memory and kept current through a
+    ChangeFeed.
+
+    ``reset`` drops everything loaded and ``catch_up`` applies the rows
+    added or changed since the last read; ``refresh`` runs them on one read
+    snapshot.
+    """
+
+    def __init__(self, repository: Repository):
+        self.feed = ChangeFeed(repository)
+        self.lock = threading.Lock()
+
+    @abstractmethod
+    def reset(self): ...
+
+    @abstractmethod
+    def catch_up(self, cursor): ...
+
+    def refresh(self):
+        """Catch up with the database; call with ``lock`` held."""
+        with self.feed.read() as (cursor, reload):
+            if reload:
+                self.reset()
+            self.catch_up(cursor)
+
+
+class FeedRegistry:
+    """One shared FeedReader per database file."""
+
+    def __init__(self, factory: Callable[[Repository], FeedReader]):
+        self._factory = factory
+        self._readers = {}
+        self._lock = threading.Lock()
+
+    def get(self, repository: Repository) -> FeedReader:
+        with self._lock:
+            reader = self._readers.get(repository.db_file)
+            if reader is None:
+                reader = self._readers[repository.db_file] = self._factory(repository)
+            # read through the caller's pool, which may have been replaced
+            reader.feed.repository = repository
+            return reader
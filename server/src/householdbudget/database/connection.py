@@ -1,30 +1,47 @@
 import sqlite3
 
+from ..metrics.registry import timed
 from ..utils import db_utils
+from ..utils.file_lock import FileLock
 from .exceptions import (
     InvalidDatabaseFileError,
 )
+from .migrations import migrate
+from .pool import ConnectionPool
+from .pragmas import apply_pragmas, get_pragma_profile
 
 
 class DatabaseConnection:
-    def __init__(self, db_file: str):
+    def __init__(self, db_file: str, pool: ConnectionPool = None, pragmas: dict = None):
         if not db_utils.is_valid_db_file(db_file):
             raise InvalidDatabaseFileError(f"Invalid database file: {db_file}")
         else:
             self.db_file = db_file
-            self.conn = None
+            self.pool = pool
+            self.pragmas = pragmas
+            self.connection = None
 
     def __enter__(self):
-        try:
-            self.connection = sqlite3.connect(self.db_file)
-            return self
-        except sqlite3.OperationalError as e:
-            raise InvalidDatabaseFileError(f"An error occurred: {e}")
+        with timed("db_connect"):
+            if self.pool is not None:
+                self.connection = self.pool.acquire()
+                return self
+            try:
+                self.connection = sqlite3.connect(self.db_file)
+                apply_pragmas(self.connection, self.pragmas or get_pragma_profile())
+                return self
+            except sqlite3.OperationalError as e:
+                raise InvalidDatabaseFileError(f"An error occurred: {e}")
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.connection:
-            self.connection.commit()
-            self.connection.close()
+            if self.pool is not None:
+                # pooled connections stay open, so never commit a failed unit
+                self.pool.release(self.connection, commit=exc_type is None)
+            else:
+                self.connection.commit()
+                self.connection.close()
+            self.connection = None
 
     def execute(self, query, params=None):
         if params is None:
@@ -75,54 +92,13 @@ class DatabaseConnection:
         cursor.execute(create_table_sql)
 
 
-def create_tables(db_file: str):
-    with DatabaseConnection(db_file) as db_conn:
-        tables = {
-            "users": """
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT NOT NULL UNIQUE,
-                    first_name TEXT NOT NULL,
-                    last_name TEXT NOT NULL,
-                    email TEXT NOT NULL UNIQUE,
-                    disabled INTEGER NOT NULL DEFAULT 0
-                )
-            """,
-            "encryption_data": """
-                CREATE TABLE IF NOT EXISTS encryption_data (
-                    user_id INTEGER PRIMARY KEY,
-                    encrypted_password TEXT NOT NULL,
-                    private_key TEXT NOT NULL,
-                    cyphertext TEXT NOT NULL,
-                    salt TEXT NOT NULL,
-                    FOREIGN KEY (user_id) REFERENCES users (id)
-                )
-            """,
-            "expenses": """
-                CREATE TABLE IF NOT EXISTS expenses (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    estimated_date TEXT NOT NULL,
-                    name TEXT NOT NULL,
-                    estimated_amount REAL NOT NULL,
-                    actual_amount REAL,
-                    responsible TEXT NOT NULL,
-                    frequency TEXT NOT NULL,
-                    shared INTEGER NOT NULL,
-                    disabled INTEGER NOT NULL DEFAULT 0
-                )
-            """,
-            "income": """
-                CREATE TABLE IF NOT EXISTS income (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    amount REAL NOT NULL,
-                    frequency TEXT NOT NULL,
-                    bi_weekly_week INTEGER,
-                    disabled INTEGER NOT NULL DEFAULT 0
-                )
-            """,
-        }
+def create_tables(db_file: str) -> int:
+    """Bring the schema up to date; returns the resulting schema version.
 
-        for table_name, create_table_sql in tables.items():
-            if not db_conn.table_exists(table_name):
-                cursor = db_conn.connection.cursor()
-                cursor.execute(create_table_sql)
+    A lock file next to the database makes concurrent callers, e.g. server
+    workers starting together, migrate one at a time; the rest then find
+    the schema current.
+    """
+    with FileLock(f"{db_file}.lock"):
+        with DatabaseConnection(db_file) as db_conn:
+            return migrate(db_conn.connection)
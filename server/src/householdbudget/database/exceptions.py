@@ -47,6 +47,18 @@ class InvalidDataError(DatabaseError):
         super().__init__(self.message)
 
 
+class ImportAbortedError(InvalidDataError):
+    """Exception raised when a bulk import stops partway through its input.
+
+    ``result`` holds what was inserted and rejected before it stopped; those
+    chunks stay committed.
+    """
+
+    def __init__(self, message: str, result: dict):
+        self.result = result
+        super().__init__(message)
+
+
 class RecordNotFoundError(DatabaseError):
     """Exception raised when a record is not found in the database."""
 
@@ -61,3 +73,11 @@ class InvalidDatabaseFileError(DatabaseError):
     def __init__(self, message="Invalid database file."):
         self.message = message
         super().__init__(self.message)
+
+
+class PoolTimeoutError(DatabaseError):
+    """Exception raised when no pooled connection becomes available in time."""
+
+    def __init__(self, timeout: float):
+        self.message = f"Timed out after {timeout}s waiting for a database connection."
+        super().__init__(self.message)
@@ -1,15 +1,17 @@
+from .pool import ConnectionPool
 from .repositories import UserRepository, ExpenseRepository, IncomeRepository
 
 
 class RepositoryFactory:
-    def __init__(self, db_file: str):
+    def __init__(self, db_file: str, pool: ConnectionPool = None):
         self.db_file = db_file
+        self.pool = pool
 
     def get_user_repository(self):
-        return UserRepository(self.db_file)
+        return UserRepository(self.db_file, pool=self.pool)
 
     def get_expense_repository(self):
-        return ExpenseRepository(self.db_file)
+        return ExpenseRepository(self.db_file, pool=self.pool)
 
     def get_income_repository(self):
-        return IncomeRepository(self.db_file)
+        return IncomeRepository(self.db_file, pool=self.pool)
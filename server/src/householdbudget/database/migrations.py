@@ -0,0 +1,316 @@
+import sqlite3
+from typing import Callable, NamedTuple
+
+from .exceptions import DatabaseError
+
+
+class MigrationError(DatabaseError):
+    """Exception raised when a schema migration fails and is rolled back."""
+
+    def __init__(self, version: int, error: Exception):
+        self.message = f"Migration {version} failed: {error}"
+        super().__init__(self.message)
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+MIGRATIONS = []
+
+
+def migration(version: int, description: str):
+    """Register a function as the schema change for ``version``."""
+
+    def decorator(func):
+        if MIGRATIONS and MIGRATIONS[-1].version >= version:
+            raise ValueError(f"Migration {version} is out of order.")
+        MIGRATIONS.append(Migration(version, description, func))
+        return func
+
+    return decorator
+
+
+def column_exists(connection: sqlite3.Connection, table: str, column: str) -> bool:
+    rows = connection.execute(f"PRAGMA table_info({table})").fetchall()
+    return any(row[1] == column for row in rows)
+
+
+@migration(1, "create users, encryption_data, expenses and income")
+def create_base_tables(connection: sqlite3.Connection):
+    # IF NOT EXISTS keeps this a no-op for databases created before
+    # versioning, which already hold these tables at user_version 0
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL UNIQUE,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            email TEXT NOT NULL UNIQUE,
+            disabled INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS encryption_data (
+            user_id INTEGER PRIMARY KEY,
+            encrypted_password TEXT NOT NULL,
+            private_key TEXT NOT NULL,
+            cyphertext TEXT NOT NULL,
+            salt TEXT NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        """
+    )
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS expenses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            estimated_date TEXT NOT NULL,
+            name TEXT NOT NULL,
+            estimated_amount REAL NOT NULL,
+            actual_amount REAL,
+            responsible TEXT NOT NULL,
+            frequency TEXT NOT NULL,
+            shared INTEGER NOT NULL,
+            disabled INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS income (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            amount REAL NOT NULL,
+            frequency TEXT NOT NULL,
+            bi_weekly_week INTEGER,
+            disabled INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+
+
+@migration(2, "tag encryption_data rows with their password scheme")
+def add_password_scheme(connection: sqlite3.Connection):
+    # rows written before password schemes existed are all Kyber+Fernet
+    if not column_exists(connection, "encryption_data", "scheme"):
+        connection.execute(
+            "ALTER TABLE encryption_data ADD COLUMN scheme TEXT NOT NULL DEFAULT 'kyber-fernet'"
+        )
+
+
+@migration(3, "index the active rows of expenses and income")
+def add_active_indexes(connection: sqlite3.Connection):
+    # covers month / responsible / shared totals without touching the table
+    connection.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_expenses_active_date
+        ON expenses (estimated_date, responsible, shared, estimated_amount, actual_amount)
+        WHERE disabled = 0
+        """
+    )
+    connection.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_expenses_active_responsible
+        ON expenses (responsible, estimated_date)
+        WHERE disabled = 0
+        """
+    )
+    connection.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_expenses_active_frequency
+        ON expenses (frequency)
+        WHERE disabled = 0
+        """
+    )
+    connection.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_income_active_frequency
+        ON income (frequency)
+        WHERE disabled = 0
+        """
+    )
+
+
+def valid_date(column: str) -> str:
+    """SQL that is true when ``column`` holds a real ``YYYY-MM-DD`` date.
+
+    With a modifier, date() rolls days past the end of a month over, and it
+    returns NULL for anything that is not a date, so only a date that comes
+    back unchanged is valid. This is the same rule the NumPy reports apply.
+    """
+    return f"date({column}, '+0 days') = {column}"
+
+
+def create_expense_totals_triggers(connection: sqlite3.Connection):
+    # an active row adds itself to its group; updating or deleting it takes
+    # the old values back out, and groups left empty are dropped. Rows with
+    # a malformed estimated_date belong to no month and are not counted.
+    add_new = f"""
+        INSERT INTO expense_monthly_totals
+        SELECT substr(NEW.estimated_date, 1, 7), NEW.responsible, NEW.shared,
+               1, NEW.estimated_amount,
+               NEW.actual_amount IS NOT NULL, coalesce(NEW.actual_amount, 0)
+        WHERE NEW.disabled = 0 AND {valid_date("NEW.estimated_date")}
+        ON CONFLICT (month, responsible, shared) DO UPDATE SET
+            expense_count = expense_count + 1,
+            estimated_total = estimated_total + excluded.estimated_total,
+            actual_count = actual_count + excluded.actual_count,
+            actual_total = actual_total + excluded.actual_total;
+    """
+    remove_old = f"""
+        UPDATE expense_monthly_totals SET
+            expense_count = expense_count - 1,
+            estimated_total = estimated_total - OLD.estimated_amount,
+            actual_count = actual_count - (OLD.actual_amount IS NOT NULL),
+            actual_total = actual_total - coalesce(OLD.actual_amount, 0)
+        WHERE OLD.disabled = 0 AND {valid_date("OLD.estimated_date")}
+          AND month = substr(OLD.estimated_date, 1, 7)
+          AND responsible = OLD.responsible AND shared = OLD.shared;
+        DELETE FROM expense_monthly_totals
+        WHERE month = substr(OLD.estimated_date, 1, 7)
+          AND responsible = OLD.responsible AND shared = OLD.shared
+          AND expense_count = 0;
+    """
+    connection.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS expenses_totals_insert
+        AFTER INSERT ON expenses
+        BEGIN {add_new} END
+        """
+    )
+    connection.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS expenses_totals_update
+        AFTER UPDATE OF estimated_date, estimated_amount, actual_amount,
+            responsible, shared, disabled ON expenses
+        BEGIN {remove_old} {add_new} END
+        """
+    )
+    connection.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS expenses_totals_delete
+        AFTER DELETE ON expenses
+        BEGIN {remove_old} END
+        """
+    )
+
+
+def fill_expense_monthly_totals(connection: sqlite3.Connection):
+    connection.execute(
+        f"""
+        INSERT OR REPLACE INTO expense_monthly_totals
+        SELECT substr(estimated_date, 1, 7), responsible, shared,
+               count(*), total(estimated_amount),
+               count(actual_amount), total(actual_amount)
+        FROM expenses WHERE disabled = 0 AND {valid_date("estimated_date")}
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+@migration(4, "maintain monthly expense totals per responsible and shared")
+def add_expense_monthly_totals(connection: sqlite3.Connection):
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS expense_monthly_totals (
+            month TEXT NOT NULL,
+            responsible TEXT NOT NULL,
+            shared INTEGER NOT NULL,
+            expense_count INTEGER NOT NULL,
+            estimated_total REAL NOT NULL,
+            actual_count INTEGER NOT NULL,
+            actual_total REAL NOT NULL,
+            PRIMARY KEY (month, responsible, shared)
+        ) WITHOUT ROWID
+        """
+    )
+    create_expense_totals_triggers(connection)
+    fill_expense_monthly_totals(connection)
+
+
+# change_log rows kept; older ones are pruned as new ones arrive
+CHANGE_LOG_KEEP = 10000
+
+
+@migration(5, "log updates and deletes of expenses and income")
+def add_change_log(connection: sqlite3.Connection):
+    # inserts need no entry: AUTOINCREMENT ids only grow, so readers find new
+    # rows by id. A reader that fell behind the pruned entries reloads.
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL
+        )
+        """
+    )
+    for table in ("expenses", "income"):
+        for event, row in (("UPDATE", "NEW"), ("DELETE", "OLD")):
+            connection.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_log_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    INSERT INTO change_log (table_name, row_id)
+                    VALUES ('{table}', {row}.id);
+                END
+                """
+            )
+    connection.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS change_log_prune
+        AFTER INSERT ON change_log
+        WHEN NEW.seq % 1000 = 0
+        BEGIN
+            DELETE FROM change_log WHERE seq <= NEW.seq - {CHANGE_LOG_KEEP};
+        END
+        """
+    )
+
+
+@migration(6, "leave expenses with malformed dates out of the monthly totals")
+def exclude_malformed_dates_from_totals(connection: sqlite3.Connection):
+    # databases at version 4 or 5 have triggers that filed legacy rows
+    # under the first 7 characters of whatever their date held
+    for event in ("insert", "update", "delete"):
+        connection.execute(f"DROP TRIGGER IF EXISTS expenses_totals_{event}")
+    create_expense_totals_triggers(connection)
+    connection.execute("DELETE FROM expense_monthly_totals")
+    fill_expense_monthly_totals(connection)
+
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def get_version(connection: sqlite3.Connection) -> int:
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(connection: sqlite3.Connection, target: int = SCHEMA_VERSION) -> int:
+    """Apply every pending migration up to ``target``; return the new version.
+
+    Each migration runs in its own immediate transaction together with the
+    ``user_version`` bump, so a failure leaves the previous version intact.
+    """
+    version = get_version(connection)
+    if connection.in_transaction:
+        connection.commit()
+    for pending in MIGRATIONS:
+        if pending.version <= version or pending.version > target:
+            continue
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            pending.apply(connection)
+            connection.execute(f"PRAGMA user_version = {pending.version}")
+            connection.commit()
+        except sqlite3.Error as e:
+            connection.rollback()
+            raise MigrationError(pending.version, e) from e
+        version = pending.version
+    return version
@@ -0,0 +1,250 @@
+import os
+import sqlite3
+import threading
+import time
+
+from .exceptions import DatabaseError, InvalidDatabaseFileError, PoolTimeoutError
+from .pragmas import apply_pragmas, get_pragma_profile
+
+DEFAULT_POOL_SIZE = 5
+DEFAULT_POOL_TIMEOUT = 30.0
+
+
+class PooledConnection(sqlite3.Connection):
+    """A sqlite3 connection that remembers which file it was opened against."""
+
+    file_id = None
+    generation = 0
+
+
+def _file_id(db_file: str):
+    try:
+        stat = os.stat(db_file)
+    except OSError:
+        return None
+    return (stat.st_dev, stat.st_ino)
+
+
+class ConnectionPool:
+    """A bounded pool of long-lived SQLite connections to a single file.
+
+    Connections are checked out per thread: nested checkouts made by the
+    thread that already holds a connection share it, and the transaction is
+    committed (or rolled back) when the outermost checkout is released.
+    """
+
+    def __init__(
+        self,
+        db_file: str,
+        max_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_POOL_TIMEOUT,
+        pre_ping: bool = True,
+        pragmas: dict = None,
+    ):
+        if max_size < 1:
+            raise ValueError("Pool size must be at least 1.")
+        self.db_file = str(db_file)
+        self.max_size = max_size
+        self.timeout = timeout
+        self.pre_ping = pre_ping
+        self.pragmas = pragmas or {}
+
+        self._condition = threading.Condition()
+        self._generation = 0
+        self._idle = []
+        self._held = {}
+        self._open = 0
+        self._checkouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._timeouts = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+    @property
+    def generation(self) -> int:
+        """Bumped by ``close``, e.g. when the file is about to be replaced."""
+        with self._condition:
+            return self._generation
+
+    def acquire(self) -> sqlite3.Connection:
+        thread_id = threading.get_ident()
+        with self._condition:
+            held = self._held.get(thread_id)
+            if held is not None:
+                held[1] += 1
+                return held[0]
+
+        connection = self._checkout()
+        with self._condition:
+            self._held[thread_id] = [connection, 1]
+        return connection
+
+    def release(self, connection: sqlite3.Connection, commit: bool = True):
+        with self._condition:
+            for thread_id, held in self._held.items():
+                if held[0] is connection:
+                    break
+            else:
+                raise DatabaseError("Connection was not checked out of this pool.")
+            held[1] -= 1
+            if held[1] > 0:
+                return
+            del self._held[thread_id]
+
+        try:
+            if commit:
+                connection.commit()
+            else:
+                connection.rollback()
+        except sqlite3.Error:
+            self._discard(connection)
+            raise
+
+        with self._condition:
+            if connection.generation != self._generation:
+                self._open -= 1
+                connection.close()
+            else:
+                self._idle.append(connection)
+            self._condition.notify()
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "max_size": self.max_size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+                "checkouts": self._checkouts,
+                "created": self._created,
+                "discarded": self._discarded,
+                "timeouts": self._timeouts,
+                "wait_time_total": self._wait_time_total,
+                "wait_time_max": self._wait_time_max,
+            }
+
+    def close(self):
+        """Close idle connections; connections in use close on release.
+
+        The pool stays usable and opens fresh connections on the next
+        checkout.
+        """
+        with self._condition:
+            self._generation += 1
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._condition.notify_all()
+        for connection in idle:
+            connection.close()
+
+    def _checkout(self) -> sqlite3.Connection:
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        with self._condition:
+            while True:
+                if self._idle:
+                    connection = self._idle.pop()
+                    break
+                if self._open < self.max_size:
+                    self._open += 1
+                    connection = None
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(self.timeout)
+                self._condition.wait(remaining)
+
+            waited = time.perf_counter() - start
+            self._checkouts += 1
+            self._wait_time_total += waited
+            self._wait_time_max = max(self._wait_time_max, waited)
+
+        if connection is not None and not self._is_healthy(connection):
+            # keep the slot reserved and replace the stale connection in it
+            with self._condition:
+                self._discarded += 1
+            try:
+                connection.close()
+            except sqlite3.Error:
+                pass
+            connection = None
+
+        if connection is None:
+            try:
+                connection = self._connect()
+            except Exception:
+                with self._condition:
+                    self._open -= 1
+                    self._condition.notify()
+                raise
+        return connection
+
+    def _connect(self) -> sqlite3.Connection:
+        try:
+            connection = sqlite3.connect(
+                self.db_file, check_same_thread=False, factory=PooledConnection
+            )
+        except sqlite3.OperationalError as e:
+            raise InvalidDatabaseFileError(f"An error occurred: {e}")
+        try:
+            apply_pragmas(connection, self.pragmas)
+        except sqlite3.Error as e:
+            connection.close()
+            raise DatabaseError(f"An error occurred: {e}") from e
+        connection.file_id = _file_id(self.db_file)
+        with self._condition:
+            connection.generation = self._generation
+            self._created += 1
+        return connection
+
+    def _is_healthy(self, connection: sqlite3.Connection) -> bool:
+        # a connection to a file that has since been replaced or removed
+        # would silently keep reading the old inode
+        if connection.file_id != _file_id(self.db_file):
+            return False
+        if self.pre_ping:
+            try:
+                connection.execute("SELECT 1").fetchone()
+            except sqlite3.Error:
+                return False
+        return True
+
+    def _discard(self, connection: sqlite3.Connection):
+        with self._condition:
+            self._open -= 1
+            self._discarded += 1
+            self._condition.notify()
+        try:
+            connection.close()
+        except sqlite3.Error:
+            pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_file: str) -> ConnectionPool:
+    """Return the shared pool for a database file, creating it on first use."""
+    key = os.path.abspath(str(db_file))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(
+                db_file,
+                max_size=int(os.getenv("DB_POOL_SIZE", DEFAULT_POOL_SIZE)),
+                timeout=float(os.getenv("DB_POOL_TIMEOUT", DEFAULT_POOL_TIMEOUT)),
+                pragmas=get_pragma_profile(),
+            )
+            _pools[key] = pool
+        return pool
+
+
+def close_pools():
+    """Close every shared pool, e.g. on shutdown or before removing a file."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,100 @@
+import os
+import sqlite3
+
+DEFAULT_PROFILE = "balanced"
+
+PRAGMA_PROFILES = {
+    # rollback-safe on power loss: every commit is fsynced
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,
+    },
+    # WAL only needs to fsync at checkpoints to stay consistent
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # large page cache and memory-mapped reads for reporting workloads
+    "fast-read": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 10000,
+    },
+}
+
+_CHOICES = {
+    "journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+    "synchronous": {"OFF", "NORMAL", "FULL", "EXTRA"},
+    "temp_store": {"DEFAULT", "FILE", "MEMORY"},
+}
+_INTEGERS = {"cache_size", "mmap_size", "busy_timeout"}
+
+# the value names SQLite reports back for the enumerated pragmas
+_REPORTED = {
+    "synchronous": ["OFF", "NORMAL", "FULL", "EXTRA"],
+    "temp_store": ["DEFAULT", "FILE", "MEMORY"],
+}
+
+
+def _validate(name: str, value):
+    # PRAGMA values cannot be bound as parameters, so only known-safe
+    # values may be interpolated
+    if name in _CHOICES:
+        value = str(value).upper()
+        if value not in _CHOICES[name]:
+            raise ValueError(f"Invalid value for PRAGMA {name}: {value}")
+        return value
+    if name in _INTEGERS:
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"Invalid value for PRAGMA {name}: {value}") from None
+    raise ValueError(f"Unsupported PRAGMA: {name}")
+
+
+def get_pragma_profile(name: str = None) -> dict:
+    """Return the PRAGMA settings for a named profile.
+
+    The profile defaults to DB_PRAGMA_PROFILE, and each setting can be
+    overridden on its own through DB_<PRAGMA>, e.g. DB_SYNCHRONOUS=FULL.
+    """
+    name = name or os.getenv("DB_PRAGMA_PROFILE", DEFAULT_PROFILE)
+    if name not in PRAGMA_PROFILES:
+        raise ValueError(f"Unknown PRAGMA profile: {name}")
+
+    profile = dict(PRAGMA_PROFILES[name])
+    for pragma in profile:
+        override = os.getenv(f"DB_{pragma.upper()}")
+        if override:
+            profile[pragma] = override
+    return {pragma: _validate(pragma, value) for pragma, value in profile.items()}
+
+
+def apply_pragmas(connection: sqlite3.Connection, pragmas: dict):
+    for pragma, value in pragmas.items():
+        connection.execute(f"PRAGMA {pragma} = {_validate(pragma, value)}")
+
+
+def effective_pragmas(connection: sqlite3.Connection) -> dict:
+    """Read back what SQLite actually applied, which may differ from the
+    requested profile (e.g. WAL is unavailable for some file systems)."""
+    effective = {}
+    for pragma in PRAGMA_PROFILES[DEFAULT_PROFILE]:
+        value = connection.execute(f"PRAGMA {pragma}").fetchone()[0]
+        if pragma in _REPORTED:
+            value = _REPORTED[pragma][value]
+        elif isinstance(value, str):
+            value = value.upper()
+        effective[pragma] = value
+    return effective
@@ -1,221 +1,538 @@
+import os
 import sqlite3
-from typing import Any, List
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Callable, Iterable, Iterator, List
 
 from ..auth.schemas import PasswordEncryptor
+from ..metrics.registry import fingerprint, timed
+from ..utils.cache import TTLCache
+from ..utils.crypto_utils import invalidate_fernet_key
 from .connection import DatabaseConnection
 from .exceptions import (
     DatabaseError,
     DuplicateUserError,
     ExpenseNotFoundError,
+    ImportAbortedError,
     IncomeNotFoundError,
     InvalidDataError,
     RecordNotFoundError,
     UserNotFoundError,
 )
+from .pool import ConnectionPool, get_pool
+from .rows import make_rows, row_type, select_columns
 from .schemas import User
 
 
+BULK_CHUNK_SIZE = 5000
+PAGE_SIZE = 100
+USER_CACHE_SIZE = 1024
+USER_CACHE_TTL = 300.0
+MAX_PAGE_SIZE = 1000
+
+
+def parse_date(value) -> str:
+    try:
+        return date.fromisoformat(str(value)).isoformat()
+    except ValueError:
+        raise InvalidDataError(f"Invalid date: {value}") from None
+
+
+def parse_flag(value) -> int:
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value in ("1", "true", "yes", "y"):
+            return 1
+        if value in ("0", "false", "no", "n", ""):
+            return 0
+        raise InvalidDataError(f"Invalid flag: {value}")
+    return int(bool(value))
+
+
+def parse_amount(data: dict, key: str, optional: bool = False):
+    value = data[key]
+    if optional and (value is None or value == ""):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise InvalidDataError(f"'{key}' must be a number.") from None
+
+
+def require_text(data: dict, key: str) -> str:
+    value = data[key]
+    if not isinstance(value, str) or not value.strip():
+        raise InvalidDataError(f"'{key}' must be a non-empty string.")
+    return value
+
+
 class Repository:
-    def __init__(self, db_file: str):
+    # the table whose rows ``select`` describes
+    table: str = None
+
+    def __init__(self, db_file: str, pool: ConnectionPool = None):
         self.db_file = db_file
+        self.pool = pool if pool is not None else get_pool(db_file)
+
+    def select(self, columns: Iterable[str] = None, keyed: bool = False):
+        """Return the SQL column list and row type for a column selection."""
+        columns = select_columns(self.table, columns, keyed)
+        return ", ".join(columns), row_type(self.table, columns)
 
-    def execute_query(self, query: str, params: List[Any] = []):
+    def execute_query(self, query: str, params: List[Any] = [], row_type=None):
+        """Fetch every row, as ``row_type`` namedtuples when given."""
         try:
-            with DatabaseConnection(self.db_file) as db_conn:
-                cursor = db_conn.connection.cursor()
-                cursor.execute(query, params)
-                return cursor.fetchall()
+            with DatabaseConnection(self.db_file, pool=self.pool) as db_conn:
+                with timed("sql", fingerprint(query)):
+                    cursor = db_conn.connection.cursor()
+                    cursor.execute(query, params)
+                    rows = cursor.fetchall()
+            return rows if row_type is None else make_rows(row_type, rows)
         except sqlite3.Error as e:
             raise DatabaseError(f"An error occurred: {e}") from e
 
     def fetch_one(self, query: str, params: List[Any] = []):
         try:
-            with DatabaseConnection(self.db_file) as db_conn:
-                cursor = db_conn.connection.cursor()
-                cursor.execute(query, params)
-                return cursor.fetchone()
+            with DatabaseConnection(self.db_file, pool=self.pool) as db_conn:
+                with timed("sql", fingerprint(query)):
+                    cursor = db_conn.connection.cursor()
+                    cursor.execute(query, params)
+                    return cursor.fetchone()
         except sqlite3.Error as e:
             raise DatabaseError(f"An error occurred: {e}") from e
 
+    @contextmanager
+    def transaction(self):
+        """Yield a cursor whose statements are committed together.
+
+        The transaction is rolled back if the block raises. Integrity errors
+        are re-raised as-is so callers can map constraint violations.
+        """
+        try:
+            with DatabaseConnection(self.db_file, pool=self.pool) as db_conn:
+                # the statements inside are timed together, commit included
+                with timed("sql", "transaction"):
+                    yield db_conn.connection.cursor()
+        except sqlite3.IntegrityError:
+            raise
+        except sqlite3.Error as e:
+            raise DatabaseError(f"An error occurred: {e}") from e
+
+    def insert_bulk(
+        self,
+        query: str,
+        rows: Iterable[dict],
+        to_params: Callable[[dict], list],
+        chunk_size: int = BULK_CHUNK_SIZE,
+        first_row: int = 1,
+    ) -> dict:
+        """Validate and insert rows, one transaction per chunk.
+
+        Rows that fail validation or insertion are skipped and reported by
+        their position in ``rows`` (counting from ``first_row``); the rest
+        of the batch is still inserted. If ``rows`` itself raises
+        InvalidDataError, the rows read so far are inserted and
+        ImportAbortedError is raised with the result up to that point.
+        """
+        result = {"inserted": 0, "errors": []}
+        batch = []
+
+        def flush():
+            try:
+                with self.transaction() as cursor:
+                    cursor.executemany(query, [params for _, params in batch])
+                result["inserted"] += len(batch)
+            except (sqlite3.Error, DatabaseError):
+                # the chunk was rolled back; redo it row by row to find the
+                # offending rows, since a failed statement keeps the others
+                with self.transaction() as cursor:
+                    for row_number, params in batch:
+                        try:
+                            cursor.execute(query, params)
+                            result["inserted"] += 1
+                        except sqlite3.Error as e:
+                            result["errors"].append(
+                                {"row": row_number, "error": str(e)}
+                            )
+            batch.clear()
+
+        row_number = first_row - 1
+        try:
+            for row_number, row in enumerate(rows, start=first_row):
+                try:
+                    # parsers yield an exception in place of a row they could
+                    # not read, so it is reported like any other bad row
+                    if isinstance(row, Exception):
+                        raise row
+                    if not isinstance(row, dict):
+                        raise InvalidDataError("Row must be an object.")
+                    batch.append((row_number, to_params(row)))
+                except InvalidDataError as e:
+                    result["errors"].append({"row": row_number, "error": str(e)})
+                    continue
+                if len(batch) >= chunk_size:
+                    flush()
+        except InvalidDataError as e:
+            # only ``rows`` raises here: the file could not be read any
+            # further, and earlier chunks are already committed
+            if batch:
+                flush()
+            raise ImportAbortedError(
+                f"{e.message} (stopped after row {row_number})", result
+            ) from e
+        if batch:
+            flush()
+        return result
+
+    def iter_keyset(
+        self,
+        query: str,
+        params: List[Any] = [],
+        after: int = 0,
+        chunk_size: int = 1000,
+        row_type=None,
+    ) -> Iterator[tuple]:
+        """Yield rows of a keyset query a chunk at a time.
+
+        ``query`` must end in ``id > ? ORDER BY id LIMIT ?`` with the id as
+        its first column. Each chunk is a separate query, so no connection
+        is held while the caller consumes the rows.
+        """
+        last_id = after
+        while True:
+            rows = self.execute_query(query, [*params, last_id, chunk_size], row_type)
+            yield from rows
+            if len(rows) < chunk_size:
+                return
+            last_id = rows[-1][0]
+
     def execute_non_query(
         self, query: str, params: List[Any] = [], return_cursor: bool = False
     ):
         try:
-            with DatabaseConnection(self.db_file) as db_conn:
-                cursor = db_conn.connection.cursor()
-                cursor.execute(query, params)
-                if return_cursor:
-                    return cursor
-                db_conn.connection.commit()
+            with DatabaseConnection(self.db_file, pool=self.pool) as db_conn:
+                with timed("sql", fingerprint(query)):
+                    cursor = db_conn.connection.cursor()
+                    cursor.execute(query, params)
+                    if return_cursor:
+                        return cursor
+                    db_conn.connection.commit()
         except sqlite3.Error as e:
             raise DatabaseError(f"An error occurred: {e}") from e
 
 
 class UserRepository(Repository):
-    def get_users(self) -> List[User]:
-        users: List[User] = self.execute_query("SELECT * FROM users WHERE disabled = 0")
+    table = "users"
+    USER_COLUMNS = ["id", "username", "first_name", "last_name", "email"]
+    CREDENTIAL_COLUMNS = [
+        "encrypted_password",
+        "private_key",
+        "cyphertext",
+        "salt",
+        "scheme",
+    ]
+
+    def __init__(
+        self, db_file: str, pool: ConnectionPool = None, cache: TTLCache = None
+    ):
+        super().__init__(db_file, pool=pool)
+        # active users by id, with their credentials; usernames map to ids.
+        # Entries are dropped on writes through this repository, and after
+        # USER_CACHE_TTL seconds for writes made elsewhere
+        if cache is None:
+            cache = TTLCache(
+                maxsize=int(os.getenv("USER_CACHE_SIZE", USER_CACHE_SIZE)),
+                ttl=float(os.getenv("USER_CACHE_TTL", USER_CACHE_TTL)),
+            )
+        self.cache = cache
+        self._cache_generation = self.pool.generation
+
+    def _check_cache(self):
+        # closing the pool means the file may have been replaced
+        generation = self.pool.generation
+        if generation != self._cache_generation:
+            self.cache.clear()
+            self._cache_generation = generation
+
+    def _cached(self, key, loader):
+        self._check_cache()
+        return self.cache.get_or_load(key, loader)
+
+    def invalidate(self, user_id: int):
+        self.cache.invalidate(("id", user_id), ("encryption", user_id))
+        invalidate_fernet_key(user_id)
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats()
+
+    def get_users(
+        self, include_credentials: bool = True, columns: Iterable[str] = None
+    ) -> List[User]:
+        users = list(
+            self.iter_users(include_credentials=include_credentials, columns=columns)
+        )
         if not users:
             raise UserNotFoundError(0)  # Assuming 0 as a placeholder
-        return [
-            User(
-                id=user[0],
-                username=user[1],
-                first_name=user[2],
-                last_name=user[3],
-                email=user[4],
-                password=str(),
-                password_encryptor=self.get_encryption_data(user[0]),
+        return users
+
+    def iter_users(
+        self,
+        chunk_size: int = 1000,
+        include_credentials: bool = True,
+        columns: Iterable[str] = None,
+    ) -> Iterator[User]:
+        """Yield active users in id order, loading them a chunk at a time.
+
+        Credentials come from the same joined query, and each chunk is a
+        separate keyset query so no connection is held between chunks. With
+        ``columns``, UserRow namedtuples of just those users columns (id
+        first) are yielded instead of User models, without credentials.
+        """
+        if columns is not None:
+            select, row_type = self.select(columns, keyed=True)
+            yield from self.iter_keyset(
+                f"SELECT {select} FROM users WHERE disabled = 0 AND id > ? ORDER BY id LIMIT ?",
+                chunk_size=chunk_size,
+                row_type=row_type,
             )
-            for user in users
-        ]
+            return
 
-    def add_user(self, user_data: dict):
-        try:
-            required_fields = [
-                "username",
-                "first_name",
-                "last_name",
-                "email",
-                "password",
-            ]
-            if not all(key in user_data for key in required_fields):
-                raise InvalidDataError("Missing required user data fields.")
-            existing_user = self.get_user_by_username(user_data["username"])
-            if existing_user:
-                raise DuplicateUserError(user_data["username"])
-        except RecordNotFoundError:
-            user: User = User(**user_data)
-            user.set_password(user.password)
-            cursor = self.execute_non_query(
-                "INSERT INTO users (username, first_name, last_name, email, disabled) VALUES (?, ?, ?, ?, 0)",
-                [
-                    user.username,
-                    user.first_name,
-                    user.last_name,
-                    user.email,
-                ],
-                return_cursor=True,
+        columns = [f"u.{column}" for column in self.USER_COLUMNS]
+        query = "SELECT {} FROM users u"
+        if include_credentials:
+            columns += [f"e.{column}" for column in self.CREDENTIAL_COLUMNS]
+            query += " LEFT JOIN encryption_data e ON e.user_id = u.id"
+        query = (
+            query.format(", ".join(columns))
+            + " WHERE u.disabled = 0 AND u.id > ? ORDER BY u.id LIMIT ?"
+        )
+
+        for row in self.iter_keyset(query, chunk_size=chunk_size):
+            yield self._user_from_row(row)
+
+    def _user_from_row(self, row) -> User:
+        fields = dict(zip(self.USER_COLUMNS, row))
+        credentials = row[len(self.USER_COLUMNS) :]
+        if credentials and credentials[0] is not None:
+            fields["password_encryptor"] = PasswordEncryptor(
+                user_id=fields["id"], **dict(zip(self.CREDENTIAL_COLUMNS, credentials))
             )
-            user_id = cursor.lastrowid
-            self.add_encryption_data(user_id, user.password_encryptor)
-        return self.get_user_by_username(user_data["username"])
+        return User(**fields, password=str())
+
+    def add_user(
+        self, user_data: dict, password_encryptor: PasswordEncryptor = None
+    ) -> User:
+        """Insert a user and its encryption data in a single transaction.
+
+        The password is hashed once, unless the caller already did so and
+        passes ``password_encryptor``. Duplicates are detected by the UNIQUE
+        constraints rather than by reading first.
+        """
+        required_fields = ["username", "first_name", "last_name", "email"]
+        if password_encryptor is None:
+            required_fields.append("password")
+        if not all(key in user_data for key in required_fields):
+            raise InvalidDataError("Missing required user data fields.")
+
+        user: User = User(**{**user_data, "password": user_data.get("password", "")})
+        if password_encryptor is None:
+            user.set_password(user.password)
+        else:
+            user.password_encryptor = password_encryptor
+            user.password = str()
+
+        try:
+            with self.transaction() as cursor:
+                cursor.execute(
+                    "INSERT INTO users (username, first_name, last_name, email, disabled) VALUES (?, ?, ?, ?, 0) RETURNING id",
+                    [user.username, user.first_name, user.last_name, user.email],
+                )
+                user.id = cursor.fetchone()[0]
+                cursor.execute(
+                    "INSERT INTO encryption_data (user_id, encrypted_password, private_key, cyphertext, salt, scheme) VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        user.id,
+                        user.password_encryptor.encrypted_password,
+                        user.password_encryptor.private_key,
+                        user.password_encryptor.cyphertext,
+                        user.password_encryptor.salt,
+                        user.password_encryptor.scheme,
+                    ],
+                )
+        except sqlite3.IntegrityError as e:
+            if "users.email" in str(e):
+                raise DuplicateUserError(user.email) from e
+            raise DuplicateUserError(user.username) from e
+        self.invalidate(user.id)
+        return user
 
     def add_encryption_data(self, user_id: int, password_encryptor: PasswordEncryptor):
         self.execute_non_query(
-            "INSERT INTO encryption_data (user_id, encrypted_password, private_key, cyphertext, salt) VALUES (?, ?, ?, ?, ?)",
+            "INSERT INTO encryption_data (user_id, encrypted_password, private_key, cyphertext, salt, scheme) VALUES (?, ?, ?, ?, ?, ?)",
             [
                 user_id,
                 password_encryptor.encrypted_password,
                 password_encryptor.private_key,
                 password_encryptor.cyphertext,
                 password_encryptor.salt,
+                password_encryptor.scheme,
             ],
         )
+        self.invalidate(user_id)
 
-    def get_encryption_data(self, user_id: int) -> dict:
-        encryption_data = self.fetch_one(
-            "SELECT encrypted_password, private_key, cyphertext, salt FROM encryption_data WHERE user_id = ?",
-            [user_id],
+    def update_encryption_data(
+        self, user_id: int, password_encryptor: PasswordEncryptor
+    ):
+        self.execute_non_query(
+            "UPDATE encryption_data SET encrypted_password = ?, private_key = ?, cyphertext = ?, salt = ?, scheme = ? WHERE user_id = ?",
+            [
+                password_encryptor.encrypted_password,
+                password_encryptor.private_key,
+                password_encryptor.cyphertext,
+                password_encryptor.salt,
+                password_encryptor.scheme,
+                user_id,
+            ],
         )
-        if not encryption_data:
-            raise RecordNotFoundError(record_type="EncryptionData", record_id=user_id)
-        return {
-            "encrypted_password": encryption_data[0],
-            "private_key": encryption_data[1],
-            "cyphertext": encryption_data[2],
-            "salt": encryption_data[3],
-        }
+        self.invalidate(user_id)
+
+    def get_encryption_data(self, user_id: int) -> dict:
+        def load():
+            encryption_data = self.fetch_one(
+                "SELECT encrypted_password, private_key, cyphertext, salt, scheme FROM encryption_data WHERE user_id = ?",
+                [user_id],
+            )
+            if not encryption_data:
+                raise RecordNotFoundError(
+                    record_type="EncryptionData", record_id=user_id
+                )
+            return dict(zip(self.CREDENTIAL_COLUMNS, encryption_data))
+
+        return dict(self._cached(("encryption", user_id), load))
 
     def disable_user(self, user_id: int):
         self.execute_non_query("UPDATE users SET disabled = 1 WHERE id = ?", [user_id])
+        self.invalidate(user_id)
 
-    def get_user_by_id(self, user_id: int) -> User:
-        user = self.execute_query(
-            "SELECT id, username, first_name, last_name, email FROM users WHERE id = ? AND disabled = 0",
-            [user_id],
-        )
-        if not user:
-            raise RecordNotFoundError(record_type="User", record_id=user_id)
-        user_data = user[0]
-        password_encryptor = self.get_encryption_data(user_data[0])
-        return User(
-            id=user_data[0],
-            username=user_data[1],
-            first_name=user_data[2],
-            last_name=user_data[3],
-            email=user_data[4],
-            password=str(),
-            password_encryptor=password_encryptor,
+    def _load_user(self, column: str, value, record_id: int = 0) -> User:
+        """Load an active user and its credentials with one joined query."""
+        columns = [f"u.{column}" for column in self.USER_COLUMNS] + [
+            f"e.{column}" for column in self.CREDENTIAL_COLUMNS
+        ]
+        row = self.fetch_one(
+            f"SELECT {', '.join(columns)} FROM users u LEFT JOIN encryption_data e ON e.user_id = u.id WHERE u.{column} = ? AND u.disabled = 0",
+            [value],
         )
+        if not row:
+            raise RecordNotFoundError(record_type="User", record_id=record_id)
+        if row[len(self.USER_COLUMNS)] is None:
+            raise RecordNotFoundError(record_type="EncryptionData", record_id=row[0])
+        return self._user_from_row(row)
 
-    def get_user_by_name(self, name: str) -> User:
-        user = self.execute_query(
-            "SELECT id, username, first_name, last_name, email FROM users WHERE username = ? AND disabled = 0",
-            [name],
-        )
-        if not user:
-            raise RecordNotFoundError(record_type="User", record_id=0)
-        user_data = user[0]
-        password_encryptor = self.get_encryption_data(user_data[0])
-        return User(
-            id=user_data[0],
-            username=user_data[1],
-            first_name=user_data[2],
-            last_name=user_data[3],
-            email=user_data[4],
-            password=str(),
-            password_encryptor=password_encryptor,
+    def get_user_by_id(self, user_id: int) -> User:
+        user = self._cached(
+            ("id", user_id), lambda: self._load_user("id", user_id, user_id)
         )
+        # callers may modify the user, e.g. when rehashing its password
+        return user.model_copy(deep=True)
 
     def get_user_by_username(self, username: str) -> User:
-        user_data = self.fetch_one(
-            "SELECT id, username, first_name, last_name, email FROM users WHERE username = ? AND disabled = 0",
-            [username],
-        )
-        if not user_data:
-            raise RecordNotFoundError(record_type="User", record_id=0)
-
-        password_encryptor = self.get_encryption_data(user_data[0])
-        user: User = User(
-            id=user_data[0],
-            username=user_data[1],
-            first_name=user_data[2],
-            last_name=user_data[3],
-            email=user_data[4],
-            password=str(),
-            password_encryptor=password_encryptor,
-        )
+        self._check_cache()
+        user_id = self.cache.get(("username", username))
+        if user_id is not None:
+            user = self.cache.get(("id", user_id))
+            if user is not None:
+                return user.model_copy(deep=True)
 
-        return user
+        user = self._load_user("username", username)
+        self.cache.set(("id", user.id), user)
+        self.cache.set(("username", username), user.id)
+        return user.model_copy(deep=True)
+
+    def get_user_by_name(self, name: str) -> User:
+        return self.get_user_by_username(name)
 
     def get_user_credentials_by_id(self, id: int) -> User:
-        user = self.execute_query(
-            "SELECT id, username, first_name, last_name, email FROM users WHERE id = ? AND disabled = 0",
-            [id],
-        )
-        if not user:
-            raise RecordNotFoundError(record_type="User", record_id=id)
-        user_data = user[0]
-        password_encryptor = self.get_encryption_data(user_data[0])
-        return User(
-            id=user_data[0],
-            username=user_data[1],
-            first_name=user_data[2],
-            last_name=user_data[3],
-            email=user_data[4],
-            password=str(),
-            password_encryptor=password_encryptor,
-        )
+        return self.get_user_by_id(id)
 
 
 class ExpenseRepository(Repository):
-    def get_expenses(self):
-        expenses = self.execute_query("SELECT * FROM expenses WHERE disabled = 0")
+    table = "expenses"
+
+    # ``columns`` selects a subset of the table's columns by name; rows are
+    # ExpenseRow namedtuples in that order, or in table order by default
+    def get_expenses(self, columns: Iterable[str] = None) -> list:
+        select, row_type = self.select(columns)
+        expenses = self.execute_query(
+            f"SELECT {select} FROM expenses WHERE disabled = 0", row_type=row_type
+        )
         if not expenses:
             raise ExpenseNotFoundError(0)  # Assuming 0 as a placeholder
         return expenses
 
-    def add_expense(self, expense_data: dict):
+    PAGE_EXPENSES = (
+        "SELECT {} FROM expenses WHERE disabled = 0 AND id > ? ORDER BY id LIMIT ?"
+    )
+
+    def get_expenses_page(
+        self, after: int = 0, limit: int = PAGE_SIZE, columns: Iterable[str] = None
+    ) -> list:
+        """Return up to ``limit`` active expenses with an id above ``after``.
+
+        The id is always selected, first, so the next page can follow on.
+        """
+        select, row_type = self.select(columns, keyed=True)
+        return self.execute_query(
+            self.PAGE_EXPENSES.format(select), [after, limit], row_type
+        )
+
+    def iter_expenses(
+        self, after: int = 0, chunk_size: int = 1000, columns: Iterable[str] = None
+    ) -> Iterator[tuple]:
+        select, row_type = self.select(columns, keyed=True)
+        return self.iter_keyset(
+            self.PAGE_EXPENSES.format(select),
+            after=after,
+            chunk_size=chunk_size,
+            row_type=row_type,
+        )
+
+    SCHEDULE_COLUMNS = (
+        "id",
+        "estimated_date",
+        "estimated_amount",
+        "actual_amount",
+        "frequency",
+    )
+
+    def get_schedule(self) -> list:
+        """Return ``(id, estimated_date, estimated_amount, actual_amount,
+        frequency)`` for every active expense, for projections."""
+        select, row_type = self.select(self.SCHEDULE_COLUMNS)
+        return self.execute_query(
+            f"SELECT {select} FROM expenses WHERE disabled = 0", row_type=row_type
+        )
+
+    def get_monthly_totals(
+        self,
+        start_month: str = "0000-00",
+        end_month: str = "9999-99",
+        responsible: str = None,
+    ) -> list:
+        """Return ``(month, responsible, shared, expense_count,
+        estimated_total, actual_count, actual_total)`` rows for the months
+        in range, read from the trigger-maintained aggregate table."""
+        query = "SELECT month, responsible, shared, expense_count, estimated_total, actual_count, actual_total FROM expense_monthly_totals WHERE month BETWEEN ? AND ?"
+        params = [start_month, end_month]
+        if responsible is not None:
+            query += " AND responsible = ?"
+            params.append(responsible)
+        return self.execute_query(query + " ORDER BY month", params)
+
+    INSERT_EXPENSE = "INSERT INTO expenses (estimated_date, name, estimated_amount, actual_amount, responsible, frequency, shared, disabled) VALUES (?, ?, ?, ?, ?, ?, ?, 0)"
+
+    def expense_params(self, expense_data: dict) -> list:
+        """Validate an expense and return its INSERT parameters."""
         if not all(
             key in expense_data
             for key in [
@@ -229,28 +546,37 @@ class ExpenseRepository(Repository):
             ]
         ):
             raise InvalidDataError("Missing required expense data fields.")
-        self.execute_non_query(
-            """INSERT INTO expenses (estimated_date, name, estimated_amount, actual_amount, responsible, frequency, shared, disabled) 
-               VALUES (?, ?, ?, ?, ?, ?, ?, 0)""",
-            [
-                expense_data["estimated_date"],
-                expense_data["name"],
-                expense_data["estimated_amount"],
-                expense_data["actual_amount"],
-                expense_data["responsible"],
-                expense_data["frequency"],
-                expense_data["shared"],
-            ],
+        return [
+            parse_date(expense_data["estimated_date"]),
+            require_text(expense_data, "name"),
+            parse_amount(expense_data, "estimated_amount"),
+            parse_amount(expense_data, "actual_amount", optional=True),
+            require_text(expense_data, "responsible"),
+            require_text(expense_data, "frequency"),
+            parse_flag(expense_data["shared"]),
+        ]
+
+    def add_expense(self, expense_data: dict):
+        self.execute_non_query(self.INSERT_EXPENSE, self.expense_params(expense_data))
+
+    def add_expenses_bulk(
+        self, expenses: Iterable[dict], chunk_size: int = BULK_CHUNK_SIZE
+    ) -> dict:
+        return self.insert_bulk(
+            self.INSERT_EXPENSE, expenses, self.expense_params, chunk_size
         )
 
+    DISABLE_EXPENSE = "UPDATE expenses SET disabled = 1 WHERE id = ? AND disabled = 0"
+
     def disable_expense(self, expense_id: int):
-        self.execute_non_query(
-            "UPDATE expenses SET disabled = 1 WHERE id = ?", [expense_id]
-        )
+        self.execute_non_query(self.DISABLE_EXPENSE, [expense_id])
 
-    def get_expense_by_id(self, expense_id: int):
+    def get_expense_by_id(self, expense_id: int, columns: Iterable[str] = None):
+        select, row_type = self.select(columns)
         expense = self.execute_query(
-            "SELECT * FROM expenses WHERE id = ? AND disabled = 0", [expense_id]
+            f"SELECT {select} FROM expenses WHERE id = ? AND disabled = 0",
+            [expense_id],
+            row_type,
         )
         if not expense:
             raise RecordNotFoundError(record_type="Expenses", record_id=expense_id)
@@ -258,40 +584,99 @@ class ExpenseRepository(Repository):
 
 
 class IncomeRepository(Repository):
+    table = "income"
     VALID_FREQUENCIES = ["Bi-weekly", "Weekly", "Monthly", "Semi-Monthly", "Daily"]
 
     def validate_frequency(self, frequency: str):
         if frequency not in self.VALID_FREQUENCIES:
             raise InvalidDataError(f"Invalid frequency: {frequency}")
 
-    def get_income(self):
-        income = self.execute_query("SELECT * FROM income WHERE disabled = 0")
+    def get_income(self, columns: Iterable[str] = None) -> list:
+        select, row_type = self.select(columns)
+        income = self.execute_query(
+            f"SELECT {select} FROM income WHERE disabled = 0", row_type=row_type
+        )
         if not income:
             raise IncomeNotFoundError(0)  # Assuming 0 as a placeholder
         return income
 
-    def add_income(self, income_data: dict):
+    PAGE_INCOME = (
+        "SELECT {} FROM income WHERE disabled = 0 AND id > ? ORDER BY id LIMIT ?"
+    )
+
+    def get_income_page(
+        self, after: int = 0, limit: int = PAGE_SIZE, columns: Iterable[str] = None
+    ) -> list:
+        """Return up to ``limit`` active income records with an id above ``after``."""
+        select, row_type = self.select(columns, keyed=True)
+        return self.execute_query(
+            self.PAGE_INCOME.format(select), [after, limit], row_type
+        )
+
+    def iter_income(
+        self, after: int = 0, chunk_size: int = 1000, columns: Iterable[str] = None
+    ) -> Iterator[tuple]:
+        select, row_type = self.select(columns, keyed=True)
+        return self.iter_keyset(
+            self.PAGE_INCOME.format(select),
+            after=after,
+            chunk_size=chunk_size,
+            row_type=row_type,
+        )
+
+    SCHEDULE_COLUMNS = ("id", "amount", "frequency", "bi_weekly_week")
+
+    def get_schedule(self) -> list:
+        """Return ``(id, amount, frequency, bi_weekly_week)`` for every active
+        income record, for projections."""
+        select, row_type = self.select(self.SCHEDULE_COLUMNS)
+        return self.execute_query(
+            f"SELECT {select} FROM income WHERE disabled = 0", row_type=row_type
+        )
+
+    INSERT_INCOME = "INSERT INTO income (amount, frequency, bi_weekly_week, disabled) VALUES (?, ?, ?, 0)"
+
+    def income_params(self, income_data: dict) -> list:
+        """Validate an income record and return its INSERT parameters."""
         if not all(key in income_data for key in ["amount", "frequency"]):
             raise InvalidDataError("Missing required income data fields.")
         self.validate_frequency(income_data["frequency"])
         bi_weekly_week = income_data.get("bi_weekly_week", None)
+        if bi_weekly_week in ("1", "2"):
+            bi_weekly_week = int(bi_weekly_week)
+        elif bi_weekly_week == "":
+            bi_weekly_week = None
         if income_data["frequency"] == "Bi-weekly" and bi_weekly_week not in [1, 2]:
             raise InvalidDataError(
                 "Bi-weekly income must specify 'bi_weekly_week' as 1 or 2."
             )
-        self.execute_non_query(
-            "INSERT INTO income (amount, frequency, bi_weekly_week, disabled) VALUES (?, ?, ?, 0)",
-            [income_data["amount"], income_data["frequency"], bi_weekly_week],
+        return [
+            parse_amount(income_data, "amount"),
+            income_data["frequency"],
+            bi_weekly_week,
+        ]
+
+    def add_income(self, income_data: dict):
+        self.execute_non_query(self.INSERT_INCOME, self.income_params(income_data))
+
+    def add_income_bulk(
+        self, income: Iterable[dict], chunk_size: int = BULK_CHUNK_SIZE
+    ) -> dict:
+        return self.insert_bulk(
+            self.INSERT_INCOME, income, self.income_params, chunk_size
         )
 
+    DISABLE_INCOME = "UPDATE income SET disabled = 1 WHERE id = ? AND disabled = 0"
+
     def disable_income(self, income_id: int):
-        self.execute_non_query(
-            "UPDATE income SET disabled = 1 WHERE id = ?", [income_id]
-        )
+        self.execute_non_query(self.DISABLE_INCOME, [income_id])
 
-    def get_income_by_id(self, income_id: int):
+    def get_income_by_id(self, income_id: int, columns: Iterable[str] = None):
+        select, row_type = self.select(columns)
         income = self.execute_query(
-            "SELECT * FROM income WHERE id = ? AND disabled = 0", [income_id]
+            f"SELECT {select} FROM income WHERE id = ? AND disabled = 0",
+            [income_id],
+            row_type,
         )
         if not income:
             raise RecordNotFoundError(record_type="Income", record_id=income_id)
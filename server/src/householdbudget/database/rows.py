@@ -0,0 +1,70 @@
+"""Named row types for the columns the repositories select.
+
+Rows are namedtuples, so they index like the plain tuples sqlite3 returns
+(``row[0]`` is still the id) and also read as ``row.name``, while costing a
+tuple per row rather than a model. Pydantic models are built from them only
+at the API boundary.
+"""
+
+from collections import namedtuple
+from functools import lru_cache, partial
+from typing import Iterable, Optional, Tuple
+
+from .exceptions import InvalidDataError
+
+# every column, in table order, so full rows match what ``SELECT *`` gave
+TABLE_COLUMNS = {
+    "users": ("id", "username", "first_name", "last_name", "email", "disabled"),
+    "expenses": (
+        "id",
+        "estimated_date",
+        "name",
+        "estimated_amount",
+        "actual_amount",
+        "responsible",
+        "frequency",
+        "shared",
+        "disabled",
+    ),
+    "income": ("id", "amount", "frequency", "bi_weekly_week", "disabled"),
+}
+
+ROW_TYPE_NAMES = {"users": "UserRow", "expenses": "ExpenseRow", "income": "IncomeRow"}
+
+
+def select_columns(
+    table: str, columns: Optional[Iterable[str]] = None, keyed: bool = False
+) -> Tuple[str, ...]:
+    """Validate a requested subset of a table's columns; all when ``None``.
+
+    Only known names are accepted, since they end up in the SQL text. A
+    ``keyed`` selection always starts with the id, which keyset pagination
+    resumes from.
+    """
+    known = TABLE_COLUMNS[table]
+    if columns is None:
+        return known
+    columns = tuple(dict.fromkeys(columns))
+    unknown = [column for column in columns if column not in known]
+    if unknown or not columns:
+        raise InvalidDataError(
+            f"Unknown {table} columns: {', '.join(unknown) or '(none)'}"
+        )
+    if keyed:
+        columns = ("id",) + tuple(column for column in columns if column != "id")
+    return columns
+
+
+@lru_cache(maxsize=None)
+def row_type(table: str, columns: Tuple[str, ...]):
+    """The namedtuple class for a selection; one class per column list."""
+    return namedtuple(ROW_TYPE_NAMES[table], columns)
+
+
+def make_rows(cls, rows: Iterable[tuple]) -> list:
+    """Re-type fetched tuples as ``cls`` rows.
+
+    ``tuple.__new__`` skips the Python-level ``cls._make``, so no Python
+    code runs per row; it is cheaper than a cursor ``row_factory`` too.
+    """
+    return list(map(partial(tuple.__new__, cls), rows))
@@ -1,6 +1,8 @@
 from pydantic import BaseModel
 
+from ..auth.password_schemes import get_scheme
 from ..auth.schemas import PasswordEncryptor
+from ..utils.crypto_executor import CryptoExecutor
 
 
 class User(BaseModel):
@@ -12,13 +14,40 @@ class User(BaseModel):
     password: str
     password_encryptor: PasswordEncryptor = PasswordEncryptor()
 
-    def set_password(self, password: str):
-        self.password_encryptor.encrypt_password(password)
+    def set_password(self, password: str, scheme: str = None):
+        self.password_encryptor = get_scheme(scheme).hash(password)
+        self.password = str()
+
+    async def set_password_async(
+        self, password: str, executor: CryptoExecutor = None, scheme: str = None
+    ):
+        self.password_encryptor = await get_scheme(scheme).hash_async(
+            password, executor=executor
+        )
         self.password = str()
 
     def verify_password(self, password: str) -> bool:
-        decrypted = self.password_encryptor.decrypt_password()
-        return decrypted == password
+        scheme = get_scheme(self.password_encryptor.scheme)
+        return scheme.verify(password, self.password_encryptor)
+
+    async def verify_password_async(
+        self, password: str, executor: CryptoExecutor = None
+    ) -> bool:
+        scheme = get_scheme(self.password_encryptor.scheme)
+        return await scheme.verify_async(password, self.password_encryptor, executor)
+
+    def needs_rehash(self) -> bool:
+        return get_scheme().needs_rehash(self.password_encryptor)
+
+    async def rehash_password_async(
+        self, password: str, executor: CryptoExecutor = None
+    ):
+        # keep the signing key so tokens issued before the rehash stay valid
+        self.password_encryptor = await get_scheme().hash_async(
+            password,
+            signing_key=self.password_encryptor.private_key,
+            executor=executor,
+        )
 
     class ConfigDict:
         # Ensure sensitive fields are not exposed
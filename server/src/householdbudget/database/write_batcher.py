@@ -0,0 +1,177 @@
+import asyncio
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable
+
+from ..metrics.registry import metrics, timed
+from .connection import DatabaseConnection
+from .exceptions import DatabaseError
+from .pool import ConnectionPool, get_pool
+
+WRITE_BATCH_SIZE = 64
+WRITE_BATCH_DELAY_MS = 2.0
+
+_STOP = object()
+
+Operation = Callable[[sqlite3.Cursor], Any]
+
+
+def statement(query: str, params=()) -> Operation:
+    """An operation running one statement; it returns the cursor's
+    ``lastrowid`` for an INSERT and its ``rowcount`` otherwise."""
+    is_insert = query.lstrip()[:6].upper() == "INSERT"
+
+    def operation(cursor: sqlite3.Cursor):
+        cursor.execute(query, params)
+        return cursor.lastrowid if is_insert else cursor.rowcount
+
+    return operation
+
+
+class WriteBatcher:
+    """Group commit for small writes.
+
+    A single writer thread takes the operations submitted from any thread,
+    runs up to ``max_batch`` of them in one transaction and commits once.
+    Having taken an operation, it waits up to ``max_delay`` seconds for more
+    to arrive: a longer delay means larger batches (fewer commits) at the
+    cost of latency, and 0 batches only what queued during the last commit.
+
+    Each operation is a callable given a cursor and runs in a savepoint, so
+    one failing operation is rolled back alone. Futures are resolved once
+    the batch has committed.
+    """
+
+    def __init__(
+        self,
+        db_file: str,
+        pool: ConnectionPool = None,
+        max_batch: int = None,
+        max_delay: float = None,
+    ):
+        self.db_file = db_file
+        self.pool = pool if pool is not None else get_pool(db_file)
+        self.max_batch = max_batch or int(
+            os.getenv("WRITE_BATCH_SIZE", WRITE_BATCH_SIZE)
+        )
+        if max_delay is None:
+            max_delay = float(os.getenv("WRITE_BATCH_DELAY_MS", WRITE_BATCH_DELAY_MS))
+            max_delay /= 1000
+        self.max_delay = max_delay
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._batches = 0
+        self._operations = 0
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, operation: Operation) -> Future:
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The write batcher is closed.")
+            self._queue.put((future, operation))
+        return future
+
+    async def run(self, operation: Operation) -> Any:
+        """Submit an operation and wait for its batch to commit."""
+        return await asyncio.wrap_future(self.submit(operation))
+
+    def close(self, wait: bool = True):
+        """Stop taking operations; those already submitted still run."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        if wait:
+            self._thread.join()
+
+    def stats(self) -> dict:
+        return {
+            "max_batch": self.max_batch,
+            "max_delay": self.max_delay,
+            "batches": self._batches,
+            "operations": self._operations,
+        }
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+
+    def _commit(self, batch: list):
+        batch = [
+            (future, operation)
+            for future, operation in batch
+            if future.set_running_or_notify_cancel()
+        ]
+        if not batch:
+            return
+        results = []
+        try:
+            with DatabaseConnection(self.db_file, pool=self.pool) as db_conn:
+                connection = db_conn.connection
+                with timed("sql", "write batch"):
+                    connection.execute("BEGIN IMMEDIATE")
+                    cursor = connection.cursor()
+                    for future, operation in batch:
+                        results.append(self._apply(cursor, operation))
+                    connection.commit()
+        except Exception as e:
+            # nothing was committed, so every operation failed
+            for future, _ in batch:
+                future.set_exception(_as_database_error(e))
+            return
+
+        self._batches += 1
+        self._operations += len(batch)
+        metrics.observe("write_batch", (), len(batch))
+        for (future, _), (ok, value) in zip(batch, results):
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    @staticmethod
+    def _apply(cursor: sqlite3.Cursor, operation: Operation):
+        cursor.execute("SAVEPOINT operation")
+        try:
+            value = operation(cursor)
+        except Exception as e:
+            cursor.execute("ROLLBACK TO operation")
+            cursor.execute("RELEASE operation")
+            return False, _as_database_error(e)
+        cursor.execute("RELEASE operation")
+        return True, value
+
+
+def _as_database_error(error: Exception) -> Exception:
+    # as in Repository.transaction: integrity errors are left for callers to
+    # map, other SQLite errors become DatabaseError
+    if isinstance(error, sqlite3.Error) and not isinstance(
+        error, sqlite3.IntegrityError
+    ):
+        wrapped = DatabaseError(f"An error occurred: {error}")
+        wrapped.__cause__ = error
+        return wrapped
+    return error
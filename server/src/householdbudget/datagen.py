@@ -0,0 +1,241 @@
+"""Fill a database with synthetic households for load testing.
+
+Every user gets a few income sources and a set of recurring expenses with
+one row per occurrence over the requested years. The same arguments always
+produce the same rows, given the same starting database. Rows are written
+straight to the tables in bulk transactions; the password is hashed once
+and shared, so no user goes through the registration path. The aggregate
+triggers are dropped during the load and the aggregates rebuilt
+afterwards, so run it while the service is stopped.
+
+run:
+  cd Household_Budget/server
+  python -m householdbudget.datagen --users 6000 --years 4 --seed 1
+  python -m householdbudget.datagen --users 100 --dbfile data/load.sqlite
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from contextlib import ExitStack
+from datetime import date, timedelta
+
+from dotenv import load_dotenv
+
+from .auth.password_schemes import DEFAULT_SCHEME, get_scheme
+from .database.aggregates import AGGREGATES, suspended
+from .database.connection import DatabaseConnection, create_tables
+from .database.pool import ConnectionPool
+from .database.repositories import ExpenseRepository, IncomeRepository, Repository
+from .utils.db_utils import validate_db_file
+
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Okafor", "Novak", "Patel", "Silva", "Berg"]
+
+# name, amount range, frequency
+EXPENSES = [
+    ("Rent", (900, 2500), "Monthly"),
+    ("Utilities", (80, 300), "Monthly"),
+    ("Phone", (40, 120), "Monthly"),
+    ("Internet", (40, 90), "Monthly"),
+    ("Streaming", (10, 25), "Monthly"),
+    ("Car payment", (200, 600), "Semi-Monthly"),
+    ("Childcare", (200, 600), "Bi-weekly"),
+    ("Groceries", (60, 250), "Weekly"),
+    ("Fuel", (30, 90), "Weekly"),
+    ("Coffee", (3, 8), "Daily"),
+]
+
+# frequency -> (amount range, weight)
+INCOME = {
+    "Bi-weekly": ((1200, 3500), 5),
+    "Semi-Monthly": ((1300, 3800), 2),
+    "Monthly": ((2500, 7000), 2),
+    "Weekly": ((400, 1200), 1),
+    "Daily": ((50, 200), 0.2),
+}
+
+# expense rows per transaction; larger chunks sort into longer index runs
+CHUNK_SIZE = 100_000
+
+INSERT_USER = "INSERT INTO users (id, username, first_name, last_name, email, disabled) VALUES (?, ?, ?, ?, ?, 0)"
+INSERT_ENCRYPTION_DATA = "INSERT INTO encryption_data (user_id, encrypted_password, private_key, cyphertext, salt, scheme) VALUES (?, ?, ?, ?, ?, ?)"
+
+
+def occurrences(frequency: str, first: date, end: date):
+    """Yield each date on which a ``frequency`` item starting on ``first``
+    falls, up to and including ``end``."""
+    if frequency in ("Daily", "Weekly", "Bi-weekly"):
+        step = timedelta(days={"Daily": 1, "Weekly": 7, "Bi-weekly": 14}[frequency])
+        while first <= end:
+            yield first
+            first += step
+        return
+    month = first.replace(day=1)
+    while month <= end:
+        days = (
+            [first.day, first.day + 14] if frequency == "Semi-Monthly" else [first.day]
+        )
+        for day in days:
+            when = month.replace(day=day)
+            if first <= when <= end:
+                yield when
+        month = (month + timedelta(days=31)).replace(day=1)
+
+
+def income_rows(rng: random.Random, count: int):
+    frequencies = list(INCOME)
+    weights = [INCOME[frequency][1] for frequency in frequencies]
+    for frequency in rng.choices(frequencies, weights, k=count):
+        low, high = INCOME[frequency][0]
+        bi_weekly_week = rng.choice([1, 2]) if frequency == "Bi-weekly" else None
+        yield (round(rng.uniform(low, high), 2), frequency, bi_weekly_week)
+
+
+def expense_rows(rng: random.Random, responsible: str, count: int, start, end):
+    # the last month is still ahead of the household: no actual amounts yet
+    settled = end - timedelta(days=30)
+    for name, (low, high), frequency in rng.sample(EXPENSES, min(count, len(EXPENSES))):
+        estimate = round(rng.uniform(low, high), 2)
+        shared = int(rng.random() < 0.3)
+        # day 1-14 leaves room for a semi-monthly item's second date
+        first = start + timedelta(days=rng.randrange(14))
+        for when in occurrences(frequency, first, end):
+            actual = None
+            if when <= settled and rng.random() < 0.9:
+                actual = round(estimate * rng.uniform(0.85, 1.15), 2)
+            yield (
+                when.isoformat(),
+                name,
+                estimate,
+                actual,
+                responsible,
+                frequency,
+                shared,
+            )
+
+
+def generate(
+    db_file: str,
+    users: int,
+    years: int = 1,
+    seed: int = 0,
+    start_year: int = 2020,
+    expenses: int = 8,
+    income: int = 2,
+    password: str = "password",
+    chunk_size: int = CHUNK_SIZE,
+) -> dict:
+    """Write ``users`` synthetic households and return the row counts."""
+    rng = random.Random(seed)
+    start = date(start_year, 1, 1)
+    end = date(start_year + years, 1, 1) - timedelta(days=1)
+    validate_db_file(db_file)
+    create_tables(db_file)
+
+    pool = ConnectionPool(db_file, max_size=1)
+    repository = Repository(db_file, pool=pool)
+    counts = {"users": 0, "income": 0, "expenses": 0}
+    batch = {"users": [], "encryption_data": [], "income": [], "expenses": []}
+
+    def flush():
+        # in date order, so the date index is appended to in runs
+        batch["expenses"].sort(key=lambda row: row[0])
+        with repository.transaction() as cursor:
+            cursor.executemany(INSERT_USER, batch["users"])
+            cursor.executemany(INSERT_ENCRYPTION_DATA, batch["encryption_data"])
+            cursor.executemany(IncomeRepository.INSERT_INCOME, batch["income"])
+            cursor.executemany(ExpenseRepository.INSERT_EXPENSE, batch["expenses"])
+        for name, rows in [
+            ("users", batch["users"]),
+            ("income", batch["income"]),
+            ("expenses", batch["expenses"]),
+        ]:
+            counts[name] += len(rows)
+        for rows in batch.values():
+            rows.clear()
+
+    # one hash for every user; each still gets its own token signing key
+    encryptor = get_scheme(DEFAULT_SCHEME).hash(password)
+    first_id = repository.fetch_one("SELECT COALESCE(MAX(id), 0) FROM users")[0]
+    try:
+        with DatabaseConnection(db_file) as db_conn, ExitStack() as stack:
+            for name in AGGREGATES:
+                stack.enter_context(suspended(db_conn.connection, name))
+            for user_id in range(first_id + 1, first_id + users + 1):
+                first_name = rng.choice(FIRST_NAMES)
+                username = f"user{user_id}"
+                batch["users"].append(
+                    (
+                        user_id,
+                        username,
+                        first_name,
+                        rng.choice(LAST_NAMES),
+                        f"{username}@example.com",
+                    )
+                )
+                batch["encryption_data"].append(
+                    (
+                        user_id,
+                        encryptor.encrypted_password,
+                        rng.randbytes(32),
+                        encryptor.cyphertext,
+                        encryptor.salt,
+                        encryptor.scheme,
+                    )
+                )
+                batch["income"].extend(income_rows(rng, income))
+                batch["expenses"].extend(
+                    expense_rows(rng, first_name, expenses, start, end)
+                )
+                if len(batch["expenses"]) >= chunk_size:
+                    flush()
+            flush()
+    finally:
+        pool.close()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start-year", type=int, default=2020)
+    parser.add_argument(
+        "--expenses", type=int, default=8, help="recurring expenses per user"
+    )
+    parser.add_argument("--income", type=int, default=2, help="incomes per user")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--dbfile", default=None)
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    db_file = args.dbfile or os.getenv("DBFILE")
+    started = time.perf_counter()
+    counts = generate(
+        db_file,
+        users=args.users,
+        years=args.years,
+        seed=args.seed,
+        start_year=args.start_year,
+        expenses=args.expenses,
+        income=args.income,
+        password=args.password,
+        chunk_size=args.chunk_size,
+    )
+    elapsed = time.perf_counter() - started
+    rows = sum(counts.values())
+    print(
+        f"{db_file}: {counts['users']} users, {counts['income']} income, "
+        f"{counts['expenses']} expenses in {elapsed:.1f}s "
+        f"({rows / elapsed:,.0f} rows/sec)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
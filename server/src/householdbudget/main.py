@@ -1,30 +1,114 @@
+import argparse
+import logging
 import os
+from contextlib import asynccontextmanager
 
-import uvicorn
 from dotenv import load_dotenv
 from fastapi import FastAPI
 
 from householdbudget.auth.router import router as auth_router
-from householdbudget.database.connection import create_tables
+from householdbudget.budget.router import router as budget_router
+from householdbudget.database import (
+    close_repository_selector,
+    init_repository_selector,
+)
+from householdbudget.database.connection import DatabaseConnection, create_tables
+from householdbudget.database.pool import close_pools
+from householdbudget.database.pragmas import effective_pragmas
+from householdbudget.metrics.middleware import TimingMiddleware
+from householdbudget.metrics.router import router as metrics_router
+from householdbudget.utils.crypto_executor import close_crypto_executor
+from householdbudget.utils.crypto_utils import close_key_cache
 from householdbudget.utils.db_utils import validate_db_file
+from householdbudget.utils.keypair_pool import close_keypair_pool, get_keypair_pool
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # open the database once per worker, before serving
+    selector = init_repository_selector()
+    with DatabaseConnection(selector.dbfile) as db_conn:
+        settings = effective_pragmas(db_conn.connection)
+    logger.info(
+        "SQLite settings for %s: %s",
+        selector.dbfile,
+        ", ".join(f"{name}={value}" for name, value in settings.items()),
+    )
+    # start filling the keypair pool, if configured, before the first signup
+    get_keypair_pool()
+    yield
+    close_keypair_pool()
+    # finish in-flight hashing and stop the worker threads and processes
+    close_crypto_executor()
+    # zero any cached derived keys
+    close_key_cache()
+    close_repository_selector()
+    close_pools()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(TimingMiddleware)
 
 # add the auth handler to the router
 app.include_router(auth_router)
+app.include_router(budget_router)
+app.include_router(metrics_router)
+
 
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve the Household Budget API.")
+    parser.add_argument("--host", default=os.getenv("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 5000)))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WEB_WORKERS", 1)),
+        help="worker processes; each has its own connection pool and caches",
+    )
+    parser.add_argument(
+        "--backlog",
+        type=int,
+        default=int(os.getenv("WEB_BACKLOG", 2048)),
+        help="maximum number of pending connections",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    # only the server entry point needs uvicorn, not importers of the app
+    import uvicorn
 
-def main():
     load_dotenv()
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    # migrate once before any worker starts; workers then find the schema
+    # current (and would wait on the migration lock if they raced it)
     db_file = os.getenv("DBFILE")
     validate_db_file(db_file)
     create_tables(db_file)
+    if args.workers > 1:
+        with DatabaseConnection(db_file) as db_conn:
+            journal_mode = effective_pragmas(db_conn.connection)["journal_mode"]
+        if journal_mode != "WAL":
+            # without WAL, readers in one worker block writers in the others
+            logger.warning(
+                "%s is in %s journal mode; %d workers will contend for it",
+                db_file,
+                journal_mode,
+                args.workers,
+            )
 
-    port = 5000
-    host = "127.0.0.1"
-
-    # start the ASGI service
-    uvicorn.run(app=app, host=host, port=port)
+    # start the ASGI service; workers import the app by name
+    uvicorn.run(
+        "householdbudget.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        backlog=args.backlog,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,52 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+
+from .registry import metrics, request_timings, server_timing
+
+
+class TimingMiddleware:
+    """Collect per-request timings, report them in a Server-Timing header
+    and record the request duration by route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = {}
+        token = request_timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # streamed bodies are still being produced at this point, so
+                # their header covers the time until the first byte
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    server_timing(timings, time.perf_counter() - start),
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_timings.reset(token)
+            # label by route template, not raw path, to bound cardinality
+            route = scope.get("route")
+            metrics.observe(
+                "http",
+                (
+                    scope["method"],
+                    getattr(route, "path", "unmatched"),
+                    str(status),
+                ),
+                time.perf_counter() - start,
+            )
@@ -0,0 +1,197 @@
+import functools
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# upper bounds, in seconds, shared by every histogram
+BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# upper bounds for histograms that count rather than time
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+# category -> (metric name, help text, label names); all but those listed in
+# _SIZED are timings
+FAMILIES = {
+    "http": (
+        "householdbudget_http_request_duration_seconds",
+        "Time spent handling HTTP requests.",
+        ("method", "route", "status"),
+    ),
+    "sql": (
+        "householdbudget_sql_duration_seconds",
+        "Time spent executing SQL, by statement fingerprint.",
+        ("statement",),
+    ),
+    "db_connect": (
+        "householdbudget_db_connect_duration_seconds",
+        "Time spent opening or checking out a database connection.",
+        (),
+    ),
+    "crypto": (
+        "householdbudget_crypto_duration_seconds",
+        "Time spent in password and key cryptography, by operation.",
+        ("operation",),
+    ),
+    "write_batch": (
+        "householdbudget_write_batch_size",
+        "Mutations committed together by the write batcher.",
+        (),
+    ),
+    "keypair_pool": (
+        "householdbudget_keypair_pool_depth",
+        "Pre-generated Kyber keypairs available when one is taken.",
+        (),
+    ),
+}
+_SIZED = {"write_batch", "keypair_pool"}
+
+# Server-Timing shows these categories per name; the others are summed
+_DETAILED = {"crypto"}
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += 1
+            series[2] += value
+
+    def samples(self):
+        with self._lock:
+            return [
+                (labels, list(counts), count, total)
+                for labels, (counts, count, total) in sorted(self._series.items())
+            ]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.reset()
+
+    def observe(self, category: str, labels: tuple, seconds: float):
+        self.histograms[category].observe(labels, seconds)
+
+    def reset(self):
+        self.histograms = {
+            category: Histogram(SIZE_BUCKETS if category in _SIZED else BUCKETS)
+            for category in FAMILIES
+        }
+
+    def render(self) -> str:
+        """Render every family in the Prometheus text exposition format."""
+        lines = []
+        for category, (name, help_text, label_names) in FAMILIES.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            histogram = self.histograms[category]
+            for labels, counts, count, total in histogram.samples():
+                pairs = [
+                    f'{label}="{_escape(value)}"'
+                    for label, value in zip(label_names, labels)
+                ]
+                for bound, bucket_count in zip(histogram.buckets, counts):
+                    bucket = ",".join(pairs + [f'le="{bound}"'])
+                    lines.append(f"{name}_bucket{{{bucket}}} {bucket_count}")
+                bucket = ",".join(pairs + ['le="+Inf"'])
+                lines.append(f"{name}_bucket{{{bucket}}} {count}")
+                suffix = "{" + ",".join(pairs) + "}" if pairs else ""
+                lines.append(f"{name}_sum{suffix} {total}")
+                lines.append(f"{name}_count{suffix} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = MetricsRegistry()
+
+# (category, name) -> [seconds, calls] for the request being handled
+request_timings: ContextVar[dict] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def timed(category: str, name: str = None):
+    """Time a block into the process-wide histograms and, while a request
+    is being handled, into that request's Server-Timing totals."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.observe(category, (name,) if name is not None else (), elapsed)
+        timings = request_timings.get()
+        if timings is not None:
+            entry = timings.setdefault((category, name), [0.0, 0])
+            entry[0] += elapsed
+            entry[1] += 1
+
+
+def timed_call(category: str, name: str):
+    """Decorator form of ``timed``."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(category, name):
+                return func(*args, **kwargs)
+
+        # lets a process pool time the call from the submitting side
+        wrapper.metric_name = name
+        return wrapper
+
+    return decorator
+
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=512)
+def fingerprint(query: str) -> str:
+    """Normalize a statement so its executions share one label."""
+    query = _LITERALS.sub("?", query)
+    return _WHITESPACE.sub(" ", query).strip()
+
+
+def server_timing(timings: dict, total: float) -> str:
+    """Format a request's timings as a Server-Timing header value."""
+    summed = {}
+    for (category, name), (seconds, calls) in timings.items():
+        key = f"{category}-{name}" if category in _DETAILED else category
+        entry = summed.setdefault(key, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += calls
+    parts = [
+        f'{key.replace("_", "-")};dur={seconds * 1000:.2f};desc="{calls}x"'
+        for key, (seconds, calls) in summed.items()
+    ]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
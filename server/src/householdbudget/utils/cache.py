@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+_MISSING = object()
+
+
+class TTLCache:
+    """A thread-safe, size-bounded LRU cache whose entries expire after ``ttl``
+    seconds.
+
+    A ``maxsize`` of 0 disables caching: every lookup is a miss and nothing
+    is stored. ``on_remove`` is called with each value that leaves the
+    cache, whether evicted, expired, replaced, invalidated or cleared.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+        on_remove: Callable[[Any], None] = None,
+    ):
+        if maxsize < 0:
+            raise ValueError("Cache size cannot be negative.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._on_remove = on_remove
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(
+        self, key: Hashable, default: Any = None, copy: Callable[[Any], Any] = None
+    ) -> Any:
+        """Return the cached value, passed through ``copy`` under the lock
+        when given, so a mutable value is read before ``on_remove`` can
+        touch it."""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires = entry
+                if expires > self._clock():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value if copy is None else copy(value)
+                del self._entries[key]
+                self._expirations += 1
+                self._removed(value)
+            self._misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any):
+        if not self.maxsize:
+            return
+        with self._lock:
+            previous = self._entries.get(key)
+            self._entries[key] = (value, self._clock() + self.ttl)
+            self._entries.move_to_end(key)
+            if previous is not None and previous[0] is not value:
+                self._removed(previous[0])
+            while len(self._entries) > self.maxsize:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._evictions += 1
+                self._removed(evicted)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value, or call ``loader`` and cache its result.
+
+        Exceptions from ``loader`` propagate and nothing is cached.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, *keys: Hashable):
+        with self._lock:
+            for key in keys:
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self._removed(entry[0])
+
+    def expire(self):
+        """Drop every expired entry now rather than when it is next read."""
+        with self._lock:
+            now = self._clock()
+            expired = [
+                key for key, (_, expires) in self._entries.items() if expires <= now
+            ]
+            for key in expired:
+                value, _ = self._entries.pop(key)
+                self._expirations += 1
+                self._removed(value)
+
+    def clear(self):
+        with self._lock:
+            values = [value for value, _ in self._entries.values()]
+            self._entries.clear()
+            for value in values:
+                self._removed(value)
+
+    def _removed(self, value: Any):
+        # called with the lock held
+        if self._on_remove is not None:
+            self._on_remove(value)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "size": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
@@ -0,0 +1,204 @@
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from cryptography.fernet import Fernet
+
+from ..metrics.registry import timed
+from .crypto_utils import (
+    cache_fernet_key,
+    decapsulate,
+    decrypt_cached,
+    derive_fernet_key,
+    encapsulate,
+    generate_keys,
+)
+
+
+class CryptoExecutorBusyError(Exception):
+    """Exception raised when the crypto queue is full and work is rejected."""
+
+    def __init__(self, pool: str, depth: int):
+        self.message = f"The {pool} crypto queue is full ({depth} pending)."
+        super().__init__(self.message)
+
+
+class _BoundedPool:
+    """Book-keeping for one executor: in-flight work and queue depth."""
+
+    def __init__(
+        self, name: str, workers: int, max_queue: int, factory, remote: bool = False
+    ):
+        self.name = name
+        self.remote = remote
+        self.workers = workers
+        self.max_queue = max_queue
+        self._factory = factory
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._max_depth = 0
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._factory(self.workers)
+            return self._executor
+
+    async def run(self, func, *args):
+        with self._lock:
+            depth = max(self._in_flight - self.workers, 0)
+            if self.max_queue and depth >= self.max_queue:
+                self._rejected += 1
+                raise CryptoExecutorBusyError(self.name, depth)
+            self._in_flight += 1
+            self._submitted += 1
+            self._max_depth = max(self._max_depth, depth + 1)
+
+        try:
+            loop = asyncio.get_running_loop()
+            if self.remote:
+                # timings taken in a child process never reach this one
+                name = getattr(func, "metric_name", func.__name__)
+                with timed("crypto", name):
+                    return await loop.run_in_executor(self.executor, func, *args)
+            # run in a copy of the caller's context so timings reach its request
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(self.executor, context.run, func, *args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queue_depth": max(self._in_flight - self.workers, 0),
+                "max_queue_depth": self._max_depth,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+def _thread_pool(workers: int):
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crypto")
+
+
+def _process_pool(workers: int):
+    # spawn avoids forking a process that already runs uvicorn threads
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+class CryptoExecutor:
+    """Runs the auth-path crypto away from the event loop.
+
+    PBKDF2 releases the GIL, so key derivation runs on a thread pool. The
+    Kyber operations are pure Python and run on a process pool instead; with
+    ``process_workers=0`` they share the thread pool. Each pool accepts at
+    most ``max_queue`` waiting jobs (0 for no limit) before rejecting work.
+    """
+
+    def __init__(
+        self, thread_workers: int = 4, process_workers: int = 2, max_queue: int = 0
+    ):
+        self.threads = _BoundedPool("thread", thread_workers, max_queue, _thread_pool)
+        if process_workers > 0:
+            self.processes = _BoundedPool(
+                "process", process_workers, max_queue, _process_pool, remote=True
+            )
+        else:
+            self.processes = self.threads
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            thread_workers=int(os.getenv("CRYPTO_THREAD_WORKERS", 4)),
+            process_workers=int(os.getenv("CRYPTO_PROCESS_WORKERS", 2)),
+            max_queue=int(os.getenv("CRYPTO_MAX_QUEUE", 0)),
+        )
+
+    async def run_thread(self, func, *args):
+        return await self.threads.run(func, *args)
+
+    async def run_process(self, func, *args):
+        return await self.processes.run(func, *args)
+
+    async def generate_keys(self):
+        # a pre-generated pair when there is one; imported here, as
+        # keypair_pool imports this module
+        from .keypair_pool import get_keypair_pool
+
+        pool = get_keypair_pool()
+        keys = pool.take_nowait() if pool is not None else None
+        if keys is not None:
+            return keys
+        return await self.run_process(generate_keys)
+
+    async def encrypt(self, plaintext, pk):
+        key, c = await self.run_process(encapsulate, pk)
+        salt = os.urandom(16)
+        fernet_key = await self.run_thread(derive_fernet_key, key, salt)
+        encrypted_text = Fernet(fernet_key).encrypt(plaintext.encode())
+        return c, salt, encrypted_text
+
+    async def decrypt(
+        self, ciphertext, salt, encrypted_text, private_key, user_id: int = None
+    ):
+        decrypted_text = decrypt_cached(user_id, salt, encrypted_text)
+        if decrypted_text is not None:
+            return decrypted_text
+        key = await self.run_process(decapsulate, private_key, ciphertext)
+        fernet_key = await self.run_thread(derive_fernet_key, key, salt)
+        decrypted_text = Fernet(fernet_key).decrypt(encrypted_text).decode()
+        cache_fernet_key(user_id, salt, fernet_key)
+        return decrypted_text
+
+    def stats(self) -> dict:
+        stats = {"thread": self.threads.stats()}
+        if self.processes is not self.threads:
+            stats["process"] = self.processes.stats()
+        return stats
+
+    def shutdown(self):
+        self.threads.shutdown()
+        self.processes.shutdown()
+
+
+_crypto_executor = None
+_crypto_executor_lock = threading.Lock()
+
+
+def get_crypto_executor() -> CryptoExecutor:
+    """Return the process-wide crypto executor, configured from the env."""
+    global _crypto_executor
+    with _crypto_executor_lock:
+        if _crypto_executor is None:
+            _crypto_executor = CryptoExecutor.from_env()
+        return _crypto_executor
+
+
+def close_crypto_executor():
+    global _crypto_executor
+    with _crypto_executor_lock:
+        executor, _crypto_executor = _crypto_executor, None
+    if executor is not None:
+        executor.shutdown()
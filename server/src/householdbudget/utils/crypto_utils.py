@@ -1,29 +1,135 @@
 import base64
 import hashlib
+import hmac
 import os
+import threading
+from typing import Optional
 
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken
 from kyber_py.kyber import Kyber1024
 
+from ..metrics.registry import timed_call
+from .cache import TTLCache
+
 JWT_ALGORITHM = "HS256"
+PBKDF2_ITERATIONS = 100000
+DERIVED_KEY_CACHE_TTL = 60
 
 
+@timed_call("crypto", "kyber_keygen")
 def generate_keys():
     """Generate a public/private key pair."""
     pk, sk = Kyber1024.keygen()
     return pk, sk
 
 
-def encrypt(plaintext, pk):
+def generate_keypairs(count: int):
+    """Generate ``count`` key pairs, e.g. in a worker process."""
+    return [generate_keys() for _ in range(count)]
+
+
+@timed_call("crypto", "kyber_encaps")
+def encapsulate(pk):
+    """Create a shared key and its Kyber ciphertext for a public key."""
     key, c = Kyber1024.encaps(pk)
+    return key, c
+
+
+@timed_call("crypto", "kyber_decaps")
+def decapsulate(private_key, ciphertext):
+    """Recover the shared key from a Kyber ciphertext."""
+    return Kyber1024.decaps(private_key, ciphertext)
+
+
+@timed_call("crypto", "derive_fernet_key")
+def derive_fernet_key(key, salt):
+    """Derive a Fernet-compatible key from a Kyber shared key."""
+    return base64.urlsafe_b64encode(
+        hashlib.pbkdf2_hmac("sha256", key, salt, PBKDF2_ITERATIONS)
+    )
+
+
+def _zero(entry):
+    # bytes handed to Fernet are copies that cannot be wiped; the cached
+    # bytearray can
+    key = entry[1]
+    key[:] = bytes(len(key))
+
+
+_key_cache = None
+_key_cache_lock = threading.Lock()
+
+
+def get_key_cache() -> Optional[TTLCache]:
+    """Return the cache of derived Fernet keys by user id, or ``None`` when
+    DERIVED_KEY_CACHE_SIZE is 0 (the default).
+
+    Each entry holds the salt it was derived with, so a key is only reused
+    for the same (user, salt); entries are zeroed when they leave.
+    """
+    global _key_cache
+    with _key_cache_lock:
+        if _key_cache is None:
+            size = int(os.getenv("DERIVED_KEY_CACHE_SIZE", 0))
+            if size <= 0:
+                return None
+            _key_cache = TTLCache(
+                maxsize=size,
+                ttl=float(os.getenv("DERIVED_KEY_CACHE_TTL", DERIVED_KEY_CACHE_TTL)),
+                on_remove=_zero,
+            )
+        return _key_cache
+
+
+def close_key_cache():
+    global _key_cache
+    with _key_cache_lock:
+        cache, _key_cache = _key_cache, None
+    if cache is not None:
+        cache.clear()
+
+
+def invalidate_fernet_key(user_id: int):
+    cache = get_key_cache()
+    if cache is not None:
+        cache.invalidate(user_id)
+
+
+def cache_fernet_key(user_id: int, salt: bytes, fernet_key: bytes):
+    cache = get_key_cache()
+    if cache is None or user_id is None:
+        return
+    # a miss has just paid for PBKDF2, so sweeping expired keys is cheap here
+    cache.expire()
+    cache.set(user_id, (bytes(salt), bytearray(fernet_key)))
+
+
+def decrypt_cached(user_id: int, salt: bytes, encrypted_text) -> Optional[str]:
+    """Decrypt with the cached key for (user_id, salt), or return ``None``."""
+    cache = get_key_cache()
+    if cache is None or user_id is None:
+        return None
+    # copied under the cache lock: a concurrent eviction zeroes the entry
+    entry = cache.get(user_id, copy=lambda entry: (entry[0], bytes(entry[1])))
+    if entry is None or not hmac.compare_digest(entry[0], salt):
+        return None
+    try:
+        return Fernet(entry[1]).decrypt(encrypted_text).decode()
+    except InvalidToken:
+        # re-encrypted under the same salt: derive the key again
+        cache.invalidate(user_id)
+        return None
+
+
+@timed_call("crypto", "encrypt")
+def encrypt(plaintext, pk):
+    key, c = encapsulate(pk)
 
     # Generate a random salt
     salt = os.urandom(16)
 
     # Derive a Fernet-compatible key from the Kyber shared key
-    fernet_key = base64.urlsafe_b64encode(
-        hashlib.pbkdf2_hmac("sha256", key, salt, 100000)
-    )
+    fernet_key = derive_fernet_key(key, salt)
 
     # Use the derived key to encrypt the plaintext
     fernet = Fernet(fernet_key)
@@ -32,17 +138,22 @@ def encrypt(plaintext, pk):
     return c, salt, encrypted_text
 
 
-def decrypt(ciphertext, salt, encrypted_text, private_key):
+@timed_call("crypto", "decrypt")
+def decrypt(ciphertext, salt, encrypted_text, private_key, user_id: int = None):
+    # Reuse the key derived for this user and salt, if it is cached
+    decrypted_text = decrypt_cached(user_id, salt, encrypted_text)
+    if decrypted_text is not None:
+        return decrypted_text
+
     # Decrypt the ciphertext to retrieve the key
-    key = Kyber1024.decaps(private_key, ciphertext)
+    key = decapsulate(private_key, ciphertext)
 
-    # Derive the Fernet-compatible key from the Kyber shared keypy
-    fernet_key = base64.urlsafe_b64encode(
-        hashlib.pbkdf2_hmac("sha256", key, salt, 100000)
-    )
+    # Derive the Fernet-compatible key from the Kyber shared key
+    fernet_key = derive_fernet_key(key, salt)
 
     # Use the derived key to decrypt the encrypted text
     fernet = Fernet(fernet_key)
     decrypted_text = fernet.decrypt(encrypted_text).decode()
+    cache_fernet_key(user_id, salt, fernet_key)
 
     return decrypted_text
@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional, Tuple
+
+from ..metrics.registry import metrics
+from .crypto_executor import _process_pool
+from .crypto_utils import generate_keypairs, generate_keys
+
+# keypairs generated per job, so a refill delivers keys as it goes
+REFILL_BATCH = 4
+
+
+class KeypairPool:
+    """Kyber1024 keypairs generated ahead of registration.
+
+    A worker process fills the pool up to ``high_water`` keypairs, and
+    starts again whenever taking one leaves ``low_water`` or fewer (half the
+    high-water mark by default). ``take`` falls back to generating inline
+    when the pool is empty; ``take_nowait`` returns ``None`` instead.
+    """
+
+    def __init__(
+        self,
+        high_water: int,
+        low_water: int = None,
+        batch: int = REFILL_BATCH,
+        factory=_process_pool,
+    ):
+        if high_water < 1:
+            raise ValueError("The keypair pool needs a high-water mark of 1 or more.")
+        self.high_water = high_water
+        self.low_water = high_water // 2 if low_water is None else low_water
+        self.batch = batch
+        self._factory = factory
+        self._executor = None
+        self._keys = deque()
+        # re-entrant: a refill that is already done runs its callback inline
+        self._lock = threading.RLock()
+        self._full = threading.Condition(self._lock)
+        self._refilling = False
+        self._closed = False
+        self._taken = 0
+        self._inline = 0
+        self._generated = 0
+        self._refill_seconds = 0.0
+
+    def start(self):
+        with self._lock:
+            self._refill()
+
+    def take_nowait(self) -> Optional[Tuple[bytes, bytes]]:
+        with self._lock:
+            depth = len(self._keys)
+            metrics.observe("keypair_pool", (), depth)
+            if not depth:
+                self._inline += 1
+                self._refill()
+                return None
+            keys = self._keys.popleft()
+            self._taken += 1
+            if depth - 1 <= self.low_water:
+                self._refill()
+            return keys
+
+    def take(self) -> Tuple[bytes, bytes]:
+        keys = self.take_nowait()
+        return keys if keys is not None else generate_keys()
+
+    def wait_full(self, timeout: float = None) -> bool:
+        """Block until the pool reaches its high-water mark."""
+        with self._full:
+            return self._full.wait_for(
+                lambda: len(self._keys) >= self.high_water, timeout
+            )
+
+    def _refill(self):
+        # called with the lock held
+        missing = self.high_water - len(self._keys)
+        if self._refilling or self._closed or missing <= 0:
+            return
+        if self._executor is None:
+            self._executor = self._factory(1)
+        self._refilling = True
+        started = time.perf_counter()
+        future = self._executor.submit(generate_keypairs, min(missing, self.batch))
+        future.add_done_callback(lambda future: self._refilled(future, started))
+
+    def _refilled(self, future, started: float):
+        with self._lock:
+            self._refilling = False
+            if future.cancelled() or future.exception() is not None:
+                # takers generate inline until the next refill succeeds
+                return
+            keys = future.result()
+            self._refill_seconds += time.perf_counter() - started
+            self._generated += len(keys)
+            self._keys.extend(keys[: self.high_water - len(self._keys)])
+            self._full.notify_all()
+            self._refill()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "depth": len(self._keys),
+                "high_water": self.high_water,
+                "low_water": self.low_water,
+                "refilling": self._refilling,
+                "taken": self._taken,
+                "inline": self._inline,
+                "generated": self._generated,
+                "refill_rate": (
+                    self._generated / self._refill_seconds
+                    if self._refill_seconds
+                    else 0.0
+                ),
+            }
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+            self._keys.clear()
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+_keypair_pool = None
+_keypair_pool_lock = threading.Lock()
+
+
+def get_keypair_pool() -> Optional[KeypairPool]:
+    """Return the process-wide keypair pool, started on first use, or
+    ``None`` when KEYPAIR_POOL_SIZE is 0."""
+    global _keypair_pool
+    with _keypair_pool_lock:
+        if _keypair_pool is None:
+            size = int(os.getenv("KEYPAIR_POOL_SIZE", 0))
+            if size <= 0:
+                return None
+            _keypair_pool = KeypairPool(size)
+            _keypair_pool.start()
+        return _keypair_pool
+
+
+def close_keypair_pool():
+    global _keypair_pool
+    with _keypair_pool_lock:
+        pool, _keypair_pool = _keypair_pool, None
+    if pool is not None:
+        pool.close()
@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+
+from householdbudget.auth.dependencies import verified_tokens
+from householdbudget.auth.tokens import create_access_token
+from householdbudget.database.factory import RepositoryFactory
+from householdbudget.main import app
+from householdbudget.utils.crypto_utils import JWT_ALGORITHM
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def user(db_file):
+    return (
+        RepositoryFactory(db_file)
+        .get_user_repository()
+        .add_user(
+            {
+                "username": "testuser",
+                "first_name": "Test",
+                "last_name": "User",
+                "email": "test_me@testemail.com",
+                "password": "cleanpassword",
+            }
+        )
+    )
+
+
+def get_me(token: str):
+    return client.get("/users/me", headers={"Authorization": f"Bearer {token}"})
+
+
+def test_current_user(user):
+    token = create_access_token(user).access_token
+    response = get_me(token)
+    assert response.status_code == 200
+    assert response.json() == {
+        "id": user.id,
+        "username": "testuser",
+        "email": "test_me@testemail.com",
+        "first_name": "Test",
+        "last_name": "User",
+    }
+
+    hits = verified_tokens.stats()["hits"]
+    assert get_me(token).status_code == 200
+    assert verified_tokens.stats()["hits"] == hits + 1
+
+
+def test_expired_token(user):
+    token = create_access_token(user, timedelta(seconds=-1)).access_token
+    assert get_me(token).status_code == 401
+
+
+def test_token_signed_with_another_key(user):
+    token = jwt.encode(
+        {"sub": user.username, "exp": 2**40}, b"x" * 32, algorithm=JWT_ALGORITHM
+    )
+    assert get_me(token).status_code == 401
+
+
+def test_token_without_expiry(user):
+    token = jwt.encode(
+        {"sub": user.username},
+        user.password_encryptor.private_key,
+        algorithm=JWT_ALGORITHM,
+    )
+    assert get_me(token).status_code == 401
+
+
+def test_missing_token(user):
+    response = client.get("/users/me")
+    assert response.status_code == 401
+    assert get_me("not-a-token").status_code == 401
+
+
+def test_login_token_is_accepted(user):
+    response = client.post(
+        "/token", data={"username": "testuser", "password": "cleanpassword"}
+    )
+    token = response.json()["access_token"]
+    claims = jwt.decode(token, options={"verify_signature": False})
+    assert claims["exp"] > claims["iat"]
+    assert get_me(token).json()["username"] == "testuser"
@@ -0,0 +1,74 @@
+import pytest
+
+from householdbudget.auth.password_schemes import (
+    DigestScheme,
+    KyberFernetScheme,
+    Pbkdf2Scheme,
+    PasswordScheme,
+    ScryptScheme,
+    get_scheme,
+)
+from householdbudget.utils.crypto_executor import CryptoExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = CryptoExecutor(thread_workers=1, process_workers=0)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.parametrize(
+    "scheme", [KyberFernetScheme(), Pbkdf2Scheme(1000), ScryptScheme(1024)]
+)
+def test_hash_and_verify(scheme):
+    password_encryptor = scheme.hash("securepassword123")
+
+    assert password_encryptor.scheme == scheme.name
+    assert password_encryptor.private_key
+    assert scheme.verify("securepassword123", password_encryptor)
+    assert not scheme.verify("wrongpassword", password_encryptor)
+
+
+@pytest.mark.asyncio
+async def test_verify_async(executor):
+    scheme = Pbkdf2Scheme(1000)
+    password_encryptor = await scheme.hash_async("pw", executor=executor)
+
+    assert await scheme.verify_async("pw", password_encryptor, executor)
+    assert not await scheme.verify_async("nope", password_encryptor, executor)
+
+
+def test_signing_key_is_kept():
+    password_encryptor = Pbkdf2Scheme(1000).hash("pw", signing_key=b"k" * 32)
+    assert password_encryptor.private_key == b"k" * 32
+
+
+def test_needs_rehash():
+    legacy = KyberFernetScheme().hash("pw")
+    weak = Pbkdf2Scheme(1000).hash("pw")
+
+    assert Pbkdf2Scheme(1000).needs_rehash(legacy)
+    assert not Pbkdf2Scheme(1000).needs_rehash(weak)
+    assert Pbkdf2Scheme(2000).needs_rehash(weak)
+
+
+def test_incomplete_schemes_cannot_be_created():
+    class NoDigest(DigestScheme):
+        name = "no-digest"
+
+        def params(self) -> str:
+            return ""
+
+    with pytest.raises(TypeError):
+        PasswordScheme()
+    with pytest.raises(TypeError):
+        NoDigest()
+
+
+def test_get_scheme(monkeypatch):
+    monkeypatch.setenv("PASSWORD_SCHEME", "scrypt")
+    assert get_scheme().name == "scrypt"
+    assert get_scheme("kyber-fernet").name == "kyber-fernet"
+    with pytest.raises(ValueError):
+        get_scheme("plaintext")
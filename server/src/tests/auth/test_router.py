@@ -64,3 +64,40 @@ def test_login_user(db_file, user_data):
         token, user.password_encryptor.private_key, algorithms=[JWT_ALGORITHM]
     )
     assert decoded_token["sub"] == user_data["username"]
+
+
+@pytest.mark.usefixtures("db_file")
+def test_login_rehashes_legacy_password(db_file, user_data, monkeypatch):
+    rf = RepositoryFactory(db_file).get_user_repository()
+    monkeypatch.setenv("PASSWORD_SCHEME", "kyber-fernet")
+    legacy: User = rf.add_user(user_data)
+    monkeypatch.delenv("PASSWORD_SCHEME")
+
+    response = client.post("/login", data=user_data)
+    assert response.status_code == 200
+
+    user: User = rf.get_user_by_username(user_data["username"])
+    assert user.password_encryptor.scheme == "pbkdf2-sha256"
+    assert user.password_encryptor.private_key == legacy.password_encryptor.private_key
+
+    # the migrated row still verifies on the next login
+    response = client.post("/token", data=user_data)
+    assert response.status_code == 200
+
+
+@pytest.mark.usefixtures("db_file")
+def test_register_then_login(db_file, user_data):
+    response = client.post("/register", json=user_data)
+    assert response.status_code == 201
+
+    response = client.post("/token", data=user_data)
+    assert response.status_code == 200
+
+
+@pytest.mark.usefixtures("db_file")
+def test_register_duplicate_user(db_file, user_data):
+    assert client.post("/register", json=user_data).status_code == 201
+
+    duplicate = {**user_data, "email": "other@testemail.com"}
+    response = client.post("/register", json=duplicate)
+    assert response.status_code == 409
@@ -23,7 +23,7 @@ class TestUserSchema(unittest.TestCase):
 
     def test_decrypt_password(self):
         user = User(**self.user_data)
-        user.set_password(self.user_data["password"])
+        user.set_password(self.user_data["password"], scheme="kyber-fernet")
         decrypted_password = user.password_encryptor.decrypt_password()
         self.assertEqual(decrypted_password, self.user_data["password"])
 
@@ -0,0 +1,37 @@
+import io
+
+import pytest
+
+from householdbudget.budget.importers import detect_format, iter_records
+from householdbudget.database.exceptions import InvalidDataError
+
+
+def test_detect_format():
+    assert detect_format("expenses.csv") == "csv"
+    assert detect_format("expenses.jsonl") == "ndjson"
+    assert detect_format("upload", "application/json; charset=utf-8") == "json"
+    with pytest.raises(InvalidDataError):
+        detect_format("expenses.xlsx", "application/octet-stream")
+
+
+def test_csv_records():
+    data = io.BytesIO(b"\xef\xbb\xbfname,amount\nRent,1200\nPower,80\n")
+    records = list(iter_records(data, "csv"))
+    assert records == [
+        {"name": "Rent", "amount": "1200"},
+        {"name": "Power", "amount": "80"},
+    ]
+    assert not data.closed
+
+
+def test_ndjson_reports_bad_lines():
+    data = io.BytesIO(b'{"amount": 1}\n\nnot json\n{"amount": 2}\n')
+    records = list(iter_records(data, "ndjson"))
+    assert records[0] == {"amount": 1}
+    assert isinstance(records[1], InvalidDataError)
+    assert records[2] == {"amount": 2}
+
+
+def test_json_must_be_an_array():
+    with pytest.raises(InvalidDataError):
+        list(iter_records(io.BytesIO(b'{"amount": 1}'), "json"))
@@ -0,0 +1,155 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from householdbudget.budget.projection import project
+
+
+def occurrences(projection, field):
+    active = projection.active()
+    values = getattr(active, field)
+    return {
+        str(day): amount for day, amount in zip(active.dates, values.tolist()) if amount
+    }
+
+
+def test_monthly_expense_clips_to_month_end():
+    projection = project(
+        [(1, "2024-01-31", 100.0, 120.0, "Monthly")],
+        [],
+        date(2024, 1, 1),
+        date(2024, 4, 30),
+    )
+    assert occurrences(projection, "expenses") == {
+        "2024-01-31": 120.0,
+        "2024-02-29": 100.0,
+        "2024-03-31": 100.0,
+        "2024-04-30": 100.0,
+    }
+
+
+def test_expenses_start_on_their_estimated_date():
+    projection = project(
+        [
+            (1, "2024-01-10", 5.0, None, "Weekly"),
+            (2, "2024-01-03", 50.0, None, "One-time"),
+            (3, "2023-11-15", 30.0, None, "Quarterly"),
+        ],
+        [],
+        date(2024, 1, 1),
+        date(2024, 2, 29),
+    )
+    assert occurrences(projection, "expenses") == {
+        "2024-01-03": 50.0,
+        "2024-01-10": 5.0,
+        "2024-01-17": 5.0,
+        "2024-01-24": 5.0,
+        "2024-01-31": 5.0,
+        "2024-02-07": 5.0,
+        "2024-02-14": 5.0,
+        "2024-02-15": 30.0,
+        "2024-02-21": 5.0,
+        "2024-02-28": 5.0,
+    }
+
+
+def test_income_paydays():
+    projection = project(
+        [],
+        [
+            (1, 1000.0, "Bi-weekly", 1),
+            (2, 700.0, "Bi-weekly", 2),
+            (3, 300.0, "Semi-Monthly", None),
+            (4, 50.0, "Weekly", None),
+        ],
+        date(2024, 1, 1),
+        date(2024, 1, 21),
+    )
+    assert occurrences(projection, "income") == {
+        "2024-01-01": 300.0,
+        "2024-01-05": 1050.0,
+        "2024-01-12": 750.0,
+        "2024-01-15": 300.0,
+        "2024-01-19": 1050.0,
+    }
+
+
+def test_running_balance():
+    projection = project(
+        [(1, "2024-01-02", 40.0, None, "Daily")],
+        [(1, 100.0, "Monthly", None)],
+        date(2024, 1, 1),
+        date(2024, 1, 3),
+        opening_balance=10.0,
+    )
+    assert projection.dates.tolist() == [
+        date(2024, 1, 1),
+        date(2024, 1, 2),
+        date(2024, 1, 3),
+    ]
+    assert projection.balance.tolist() == [110.0, 70.0, 30.0]
+
+
+def test_matches_day_by_day_expansion():
+    rng = np.random.default_rng(7)
+    frequencies = ["Daily", "Weekly", "Bi-weekly", "Monthly", "Yearly", "Once"]
+    # anchors stay within the 28th so no month clips them
+    expenses = [
+        (
+            i,
+            date(
+                int(rng.integers(2020, 2026)),
+                int(rng.integers(1, 13)),
+                int(rng.integers(1, 29)),
+            ).isoformat(),
+            float(rng.integers(1, 100)),
+            None,
+            frequencies[i % len(frequencies)],
+        )
+        for i in range(300)
+    ]
+    start, end = date(2022, 1, 1), date(2025, 12, 31)
+    projection = project(expenses, [], start, end)
+
+    expected = np.zeros(len(projection.dates))
+    for _, anchor, amount, _, frequency in expenses:
+        anchor = date.fromisoformat(anchor)
+        day = max(start, anchor)
+        while day <= end:
+            elapsed = (day - anchor).days
+            due = {
+                "Daily": True,
+                "Weekly": elapsed % 7 == 0,
+                "Bi-weekly": elapsed % 14 == 0,
+                "Monthly": day.day == anchor.day,
+                "Yearly": (day.month, day.day) == (anchor.month, anchor.day),
+                "Once": elapsed == 0,
+            }[frequency]
+            if due:
+                expected[(day - start).days] += amount
+            day += timedelta(days=1)
+    assert np.allclose(projection.expenses, expected)
+
+
+def test_malformed_dates_never_occur():
+    projection = project(
+        [
+            (1, "2024-01-10", 5.0, None, "Monthly"),
+            (2, "10/01/2023", 50.0, None, "Monthly"),
+            (3, "2024-02-30", 30.0, None, "Semi-Monthly"),
+            (4, None, 20.0, None, "One-time"),
+        ],
+        [],
+        date(2024, 1, 1),
+        date(2024, 2, 29),
+    )
+    assert occurrences(projection, "expenses") == {
+        "2024-01-10": 5.0,
+        "2024-02-10": 5.0,
+    }
+
+
+def test_rejects_inverted_range():
+    with pytest.raises(ValueError):
+        project([], [], date(2024, 2, 1), date(2024, 1, 1))
@@ -0,0 +1,130 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from householdbudget.budget.projection import project
+from householdbudget.budget.projection_cache import ProjectionCache
+from householdbudget.database.repositories import ExpenseRepository, IncomeRepository
+
+START = date(2024, 1, 1)
+END = date(2024, 6, 30)
+
+
+@pytest.fixture
+def expenses(pool):
+    return ExpenseRepository(pool.db_file, pool=pool)
+
+
+@pytest.fixture
+def income(pool):
+    repository = IncomeRepository(pool.db_file, pool=pool)
+    repository.add_income(
+        {"amount": 1500, "frequency": "Bi-weekly", "bi_weekly_week": 1}
+    )
+    return repository
+
+
+@pytest.fixture
+def cache(expenses, income):
+    for when, name, amount, frequency in [
+        ("2024-01-01", "Rent", 1200, "Monthly"),
+        ("2024-01-03", "Groceries", 90.5, "Weekly"),
+        ("2024-02-14", "Gift", 40, "One-time"),
+    ]:
+        add_expense(expenses, when, name, amount, frequency)
+    return ProjectionCache(expenses)
+
+
+def add_expense(repository, when, name, amount, frequency):
+    repository.add_expense(
+        {
+            "estimated_date": when,
+            "name": name,
+            "estimated_amount": amount,
+            "actual_amount": None,
+            "responsible": "Alex",
+            "frequency": frequency,
+            "shared": 0,
+        }
+    )
+
+
+def assert_matches_full_rebuild(cache, expenses, income, start=START, end=END):
+    cached = cache.project(start, end, 100.0)
+    expected = project(
+        expenses.get_schedule(), income.get_schedule(), start, end, 100.0
+    )
+    assert np.array_equal(cached.dates, expected.dates)
+    for field in ("income", "expenses", "balance"):
+        np.testing.assert_allclose(getattr(cached, field), getattr(expected, field))
+    # emptied days are exactly zero again, so they are not reported
+    assert np.array_equal(cached.active().dates, expected.active().dates)
+
+
+def test_matches_a_full_rebuild(cache, expenses, income):
+    assert_matches_full_rebuild(cache, expenses, income)
+    assert cache.builds == 1
+
+
+def test_changes_patch_the_cached_range(cache, expenses, income):
+    cache.project(START, END)
+
+    add_expense(expenses, "2024-03-10", "Insurance", 300, "Quarterly")
+    assert_matches_full_rebuild(cache, expenses, income)
+    assert cache.patched == 1
+
+    expenses.disable_expense(2)
+    income.disable_income(1)
+    assert_matches_full_rebuild(cache, expenses, income)
+    assert cache.patched == 3
+
+    expenses.execute_non_query(
+        "UPDATE expenses SET estimated_amount = 1300 WHERE id = 1", []
+    )
+    expenses.execute_non_query("DELETE FROM expenses WHERE id = 3", [])
+    assert_matches_full_rebuild(cache, expenses, income)
+    # the updated item is removed and added back
+    assert cache.patched == 6
+    assert cache.builds == 1
+
+
+def test_malformed_legacy_dates_are_skipped(cache, expenses, income):
+    cache.project(START, END)
+    # legacy rows were stored without validating the date
+    with expenses.transaction() as cursor:
+        cursor.execute(
+            ExpenseRepository.INSERT_EXPENSE,
+            ("10/01/2023", "Legacy", 75, None, "Sam", "Monthly", 0),
+        )
+    assert_matches_full_rebuild(cache, expenses, income)
+    assert 4 not in cache._items["expenses"]
+
+    expenses.execute_non_query(
+        "UPDATE expenses SET estimated_date = '2024-01-10' WHERE id = 4", []
+    )
+    assert_matches_full_rebuild(cache, expenses, income)
+    assert cache.builds == 1
+
+
+def test_ranges_are_kept_separately(cache, expenses, income):
+    cache.max_ranges = 1
+    other = (date(2024, 3, 1), date(2024, 3, 31))
+    assert_matches_full_rebuild(cache, expenses, income)
+    assert_matches_full_rebuild(cache, expenses, income, *other)
+    assert_matches_full_rebuild(cache, expenses, income, *other)
+    assert cache.builds == 2
+    assert_matches_full_rebuild(cache, expenses, income)
+    assert cache.builds == 3
+
+
+def test_reload_when_the_pool_is_closed(cache, expenses, income):
+    cache.project(START, END)
+    expenses.pool.close()
+    assert_matches_full_rebuild(cache, expenses, income)
+    assert cache.builds == 2
+
+
+def test_end_before_start(cache):
+    with pytest.raises(ValueError):
+        cache.project(END, START)
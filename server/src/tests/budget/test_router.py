@@ -0,0 +1,421 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from householdbudget.database.factory import RepositoryFactory
+from householdbudget.database.repositories import ExpenseRepository
+from householdbudget.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def authenticated(db_file):
+    user = {
+        "username": "budgeter",
+        "first_name": "Budget",
+        "last_name": "User",
+        "email": "budgeter@testemail.com",
+        "password": "cleanpassword",
+    }
+    token = client.post("/register", json=user).json()["access_token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+    yield
+    del client.headers["Authorization"]
+
+
+@pytest.mark.usefixtures("db_file")
+def test_import_expenses_csv(db_file):
+    csv_data = (
+        "estimated_date,name,estimated_amount,actual_amount,responsible,frequency,shared\n"
+        "2024-01-01,Rent,1200,1200,Alex,Monthly,1\n"
+        "2024-01-05,Power,80,,Sam,Monthly,0\n"
+        "not-a-date,Water,30,,Sam,Monthly,0\n"
+    )
+    response = client.post(
+        "/expenses/import", files={"file": ("expenses.csv", csv_data, "text/csv")}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["inserted"] == 2
+    assert data["errors"] == [{"row": 3, "error": "Invalid date: not-a-date"}]
+
+    expenses = RepositoryFactory(db_file).get_expense_repository().get_expenses()
+    assert len(expenses) == 2
+
+
+@pytest.mark.usefixtures("db_file")
+def test_import_income_ndjson(db_file):
+    lines = [
+        {"amount": 2000, "frequency": "Monthly"},
+        {"amount": 900, "frequency": "Bi-weekly", "bi_weekly_week": 1},
+        {"amount": 900, "frequency": "Bi-weekly"},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines)
+    response = client.post(
+        "/income/import",
+        files={"file": ("income.ndjson", body, "application/x-ndjson")},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["inserted"] == 2
+    assert [error["row"] for error in data["errors"]] == [3]
+
+
+EXPENSE_HEADER = (
+    "estimated_date,name,estimated_amount,actual_amount,responsible,frequency,shared\n"
+)
+
+
+@pytest.mark.usefixtures("db_file")
+def test_import_reports_rows_committed_before_bad_encoding(db_file):
+    # enough rows that the decoder reaches the bad byte a few blocks in
+    rows = "".join(f"2024-01-01,Expense {i},10,,Alex,Monthly,1\n" for i in range(1000))
+    body = (EXPENSE_HEADER + rows).encode() + b"2024-01-01,Caf\xe9,5,,Sam,Monthly,0\n"
+    response = client.post(
+        "/expenses/import", files={"file": ("expenses.csv", body, "text/csv")}
+    )
+
+    assert response.status_code == 400
+    detail = response.json()["detail"]
+    assert detail["message"].startswith("Import files must be UTF-8 encoded")
+    assert detail["inserted"] > 0
+    assert detail["errors"] == []
+    expenses = RepositoryFactory(db_file).get_expense_repository().get_expenses()
+    assert len(expenses) == detail["inserted"]
+
+
+@pytest.mark.usefixtures("db_file")
+def test_import_rejects_malformed_csv(db_file):
+    body = (
+        EXPENSE_HEADER
+        + "2024-01-01,Rent,1200,1200,Alex,Monthly,1\n"
+        + "2024-01-05,"
+        + "x" * 200_000
+        + ",80,,Sam,Monthly,0\n"
+    )
+    response = client.post(
+        "/expenses/import", files={"file": ("expenses.csv", body, "text/csv")}
+    )
+
+    assert response.status_code == 400
+    detail = response.json()["detail"]
+    assert detail["message"] == (
+        "Invalid CSV: field larger than field limit (131072) (stopped after row 1)"
+    )
+    assert detail["inserted"] == 1
+
+
+@pytest.mark.usefixtures("db_file")
+def test_import_rejects_unknown_format(db_file):
+    response = client.post(
+        "/expenses/import",
+        files={"file": ("expenses.xlsx", b"PK", "application/octet-stream")},
+    )
+    assert response.status_code == 415
+
+
+@pytest.mark.usefixtures("db_file")
+def test_list_expenses_pages(db_file):
+    repository = RepositoryFactory(db_file).get_expense_repository()
+    repository.add_expenses_bulk(
+        {
+            "estimated_date": "2024-01-01",
+            "name": f"Expense {i}",
+            "estimated_amount": 10,
+            "actual_amount": "",
+            "responsible": "Alex",
+            "frequency": "Monthly",
+            "shared": 1,
+        }
+        for i in range(3)
+    )
+
+    response = client.get("/expenses", params={"limit": 2})
+    assert response.status_code == 200
+    page = response.json()
+    assert [item["name"] for item in page["items"]] == ["Expense 0", "Expense 1"]
+    assert page["items"][0]["shared"] is True
+    assert page["next_after"] == 2
+
+    page = client.get(
+        "/expenses", params={"after": page["next_after"], "limit": 2}
+    ).json()
+    assert [item["id"] for item in page["items"]] == [3]
+    assert page["next_after"] is None
+
+
+@pytest.mark.usefixtures("db_file")
+def test_list_income_ndjson(db_file):
+    repository = RepositoryFactory(db_file).get_income_repository()
+    for amount in (100, 200):
+        repository.add_income({"amount": amount, "frequency": "Monthly"})
+
+    response = client.get("/income", params={"format": "ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["amount"] for line in lines] == [100.0, 200.0]
+
+
+@pytest.mark.usefixtures("db_file")
+def test_list_empty_and_invalid(db_file):
+    response = client.get("/income")
+    assert response.status_code == 200
+    assert response.json() == {"items": [], "next_after": None}
+    assert client.get("/expenses", params={"limit": 0}).status_code == 422
+
+
+@pytest.mark.usefixtures("db_file")
+def test_projection(db_file):
+    factory = RepositoryFactory(db_file)
+    factory.get_income_repository().add_income({"amount": 1000, "frequency": "Monthly"})
+    factory.get_expense_repository().add_expense(
+        {
+            "estimated_date": "2024-01-10",
+            "name": "Rent",
+            "estimated_amount": 600,
+            "actual_amount": None,
+            "responsible": "Alex",
+            "frequency": "Monthly",
+            "shared": 1,
+        }
+    )
+
+    response = client.get(
+        "/projection",
+        params={"start": "2024-01-01", "end": "2024-02-29", "opening_balance": 50},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["closing_balance"] == 850.0
+    assert [(point["date"], point["balance"]) for point in data["points"]] == [
+        ("2024-01-01", 1050.0),
+        ("2024-01-10", 450.0),
+        ("2024-02-01", 1450.0),
+        ("2024-02-10", 850.0),
+    ]
+
+    response = client.get(
+        "/projection", params={"start": "2024-01-01", "end": "2023-12-31"}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.usefixtures("db_file")
+def test_projection_skips_malformed_legacy_dates(db_file):
+    repository = RepositoryFactory(db_file).get_expense_repository()
+    # legacy rows were stored without validating the date
+    with repository.transaction() as cursor:
+        cursor.executemany(
+            ExpenseRepository.INSERT_EXPENSE,
+            [
+                ("2024-01-10", "Rent", 600, None, "Alex", "Monthly", 1),
+                ("10/01/2023", "Legacy", 75, None, "Sam", "Monthly", 0),
+            ],
+        )
+
+    response = client.get(
+        "/projection", params={"start": "2024-01-01", "end": "2024-01-31"}
+    )
+    assert response.status_code == 200
+    assert response.json()["closing_balance"] == -600.0
+
+
+@pytest.mark.usefixtures("db_file")
+def test_expense_summary(db_file):
+    repository = RepositoryFactory(db_file).get_expense_repository()
+    for estimated_date, actual_amount in [
+        ("2024-01-05", 80),
+        ("2024-01-20", None),
+        ("2024-02-01", None),
+    ]:
+        repository.add_expense(
+            {
+                "estimated_date": estimated_date,
+                "name": "Groceries",
+                "estimated_amount": 100,
+                "actual_amount": actual_amount,
+                "responsible": "Alex",
+                "frequency": "Weekly",
+                "shared": 0,
+            }
+        )
+
+    response = client.get("/expenses/summary", params={"end": "2024-01"})
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "month": "2024-01",
+            "responsible": "Alex",
+            "shared": False,
+            "expense_count": 2,
+            "estimated_total": 200.0,
+            "actual_count": 1,
+            "actual_total": 80.0,
+        }
+    ]
+    assert client.get("/expenses/summary", params={"start": "2024"}).status_code == 422
+
+
+@pytest.mark.usefixtures("db_file")
+def test_expense_summary_agrees_with_reports_on_malformed_dates(db_file):
+    repository = RepositoryFactory(db_file).get_expense_repository()
+    # legacy rows were stored without validating the date
+    with repository.transaction() as cursor:
+        cursor.executemany(
+            ExpenseRepository.INSERT_EXPENSE,
+            [
+                ("2024-01-05", "Groceries", 100, 80, "Alex", "Weekly", 0),
+                ("10/01/2023", "Legacy", 50, None, "Alex", "Weekly", 0),
+                ("2024-01-99", "Legacy", 25, 25, "Alex", "Weekly", 0),
+                ("2024-02-30", "Legacy", 10, None, "Sam", "Monthly", 1),
+            ],
+        )
+        cursor.execute("UPDATE expenses SET estimated_amount = 60 WHERE id = 2")
+        cursor.execute("DELETE FROM expenses WHERE id = 3")
+
+    summary = client.get("/expenses/summary").json()
+    totals = client.get(
+        "/reports/expenses/totals",
+        params={"group_by": ["month", "responsible", "shared"]},
+    ).json()
+    assert summary == totals
+    assert [row["month"] for row in summary] == ["2024-01"]
+
+
+@pytest.mark.usefixtures("db_file")
+def test_requires_authentication(db_file):
+    del client.headers["Authorization"]
+    try:
+        assert client.get("/expenses").status_code == 401
+        assert client.get("/projection").status_code == 401
+    finally:
+        client.headers["Authorization"] = "Bearer invalid"
+
+
+@pytest.mark.usefixtures("db_file")
+def test_create_and_delete_expense(db_file):
+    expense = {
+        "estimated_date": "2024-03-01",
+        "name": "Rent",
+        "estimated_amount": 1200,
+        "responsible": "Alex",
+        "frequency": "Monthly",
+        "shared": True,
+    }
+    response = client.post("/expenses", json=expense)
+    assert response.status_code == 201
+    created = response.json()
+    assert created == {**expense, "id": created["id"], "actual_amount": None}
+    assert [item["id"] for item in client.get("/expenses").json()["items"]] == [
+        created["id"]
+    ]
+
+    bad_date = client.post("/expenses", json={**expense, "estimated_date": "soon"})
+    assert bad_date.status_code == 422
+
+    assert client.delete(f"/expenses/{created['id']}").status_code == 204
+    assert client.delete(f"/expenses/{created['id']}").status_code == 404
+    assert client.get("/expenses").json()["items"] == []
+
+
+@pytest.mark.usefixtures("db_file")
+def test_create_and_delete_income(db_file):
+    response = client.post(
+        "/income", json={"amount": 900, "frequency": "Bi-weekly", "bi_weekly_week": 2}
+    )
+    assert response.status_code == 201
+    income_id = response.json()["id"]
+    assert client.get("/income").json()["items"] == [
+        {
+            "id": income_id,
+            "amount": 900.0,
+            "frequency": "Bi-weekly",
+            "bi_weekly_week": 2,
+        }
+    ]
+
+    missing_week = client.post(
+        "/income", json={"amount": 900, "frequency": "Bi-weekly"}
+    )
+    assert missing_week.status_code == 422
+    assert "bi_weekly_week" in missing_week.json()["detail"]
+
+    assert client.delete(f"/income/{income_id}").status_code == 204
+    assert client.delete("/income/999").status_code == 404
+
+
+@pytest.mark.usefixtures("db_file")
+def test_reports(db_file):
+    for expense in [
+        ("2024-01-01", "Rent", 1000, 1100, "Alex", "Monthly", 1),
+        ("2024-02-01", "Rent", 1000, None, "Alex", "Monthly", 1),
+        ("2024-02-03", "Power", 100, 90, "Sam", "Monthly", 1),
+    ]:
+        RepositoryFactory(db_file).get_expense_repository().add_expense(
+            dict(
+                zip(
+                    [
+                        "estimated_date",
+                        "name",
+                        "estimated_amount",
+                        "actual_amount",
+                        "responsible",
+                        "frequency",
+                        "shared",
+                    ],
+                    expense,
+                )
+            )
+        )
+    client.post("/income", json={"amount": 500, "frequency": "Weekly"})
+
+    totals = client.get(
+        "/reports/expenses/totals", params={"group_by": ["month", "responsible"]}
+    )
+    assert totals.status_code == 200
+    assert [
+        (row["month"], row["responsible"], row["expense_count"])
+        for row in totals.json()
+    ] == [("2024-01", "Alex", 1), ("2024-02", "Alex", 1), ("2024-02", "Sam", 1)]
+    assert "shared" not in totals.json()[0]
+
+    assert (
+        client.get(
+            "/reports/expenses/variance", params={"group_by": "name"}
+        ).status_code
+        == 422
+    )
+
+    (settled,) = client.get(
+        "/reports/expenses/variance", params={"group_by": "responsible"}
+    ).json()[:1]
+    assert settled["difference"] == 100.0
+
+    shared = client.get("/reports/expenses/shared", params={"end": "2024-01"}).json()
+    assert shared == [
+        {
+            "responsible": "Alex",
+            "paid": 1100.0,
+            "personal": 0.0,
+            "shared_paid": 1100.0,
+            "shared_share": 1100.0,
+            "balance": 0.0,
+        }
+    ]
+
+    monthly = client.get("/reports/expenses/monthly").json()
+    assert [row["delta"] for row in monthly] == [None, -10.0]
+
+    assert client.get("/reports/income/totals").json() == [
+        {
+            "frequency": "Weekly",
+            "income_count": 1,
+            "total": 500.0,
+            "monthly_equivalent": pytest.approx(500 * 52 / 12),
+        }
+    ]
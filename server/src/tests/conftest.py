@@ -3,6 +3,7 @@ import os
 import pytest
 
 from householdbudget.database.connection import create_tables
+from householdbudget.database.pool import ConnectionPool, close_pools
 from householdbudget.utils.db_utils import validate_db_file
 
 
@@ -16,10 +17,28 @@ def db_file():
     yield str(file)
 
     # Cleanup code
+    close_pools()
     try:
-        if os.path.exists(file):
-            os.remove(file)
+        for path in (file, f"{file}-wal", f"{file}-shm", f"{file}.lock"):
+            if os.path.exists(path):
+                os.remove(path)
     except PermissionError as e:
         print(f"Permission error: {e}")
     except Exception as e:
         print(f"Error removing the file: {e}")
+
+
+@pytest.fixture
+def tmp_db_file(tmp_path):
+    """A migrated database file of the test's own."""
+    file = str(tmp_path / "data" / "budget.sqlite")
+    validate_db_file(file)
+    create_tables(file)
+    return file
+
+
+@pytest.fixture
+def pool(tmp_db_file):
+    pool = ConnectionPool(tmp_db_file)
+    yield pool
+    pool.close()
@@ -0,0 +1,111 @@
+import pytest
+
+from householdbudget.database.aggregates import check, main, rebuild, suspended
+from householdbudget.database.connection import DatabaseConnection
+from householdbudget.database.repositories import ExpenseRepository
+
+TOTALS = "expense_monthly_totals"
+
+
+def expense(date="2024-01-05", amount=100.0, actual=None, responsible="Alex"):
+    return {
+        "estimated_date": date,
+        "name": "Expense",
+        "estimated_amount": amount,
+        "actual_amount": actual,
+        "responsible": responsible,
+        "frequency": "Monthly",
+        "shared": 1,
+    }
+
+
+@pytest.fixture
+def repository(pool):
+    return ExpenseRepository(pool.db_file, pool=pool)
+
+
+def totals(repository):
+    return [row[:1] + row[3:] for row in repository.get_monthly_totals()]
+
+
+def test_triggers_keep_totals_current(repository):
+    repository.add_expense(expense(amount=100.0, actual=90.0))
+    repository.add_expense(expense(date="2024-01-20", amount=50.0))
+    repository.add_expense(expense(date="2024-02-01", amount=20.0))
+    assert totals(repository) == [
+        ("2024-01", 2, 150.0, 1, 90.0),
+        ("2024-02", 1, 20.0, 0, 0.0),
+    ]
+
+    repository.disable_expense(3)
+    assert totals(repository) == [("2024-01", 2, 150.0, 1, 90.0)]
+
+    repository.execute_non_query(
+        "UPDATE expenses SET estimated_date = '2024-03-01', actual_amount = 45 WHERE id = 2"
+    )
+    repository.execute_non_query("DELETE FROM expenses WHERE id = 1")
+    assert totals(repository) == [("2024-03", 1, 50.0, 1, 45.0)]
+
+
+def test_bulk_insert_and_filters(repository):
+    repository.add_expenses_bulk(
+        [expense(responsible=name) for name in ["Alex", "Sam", "Sam"]]
+    )
+    rows = repository.get_monthly_totals("2024-01", "2024-01", responsible="Sam")
+    assert rows == [("2024-01", "Sam", 1, 2, 200.0, 0, 0.0)]
+    assert repository.get_monthly_totals("2024-02", "2024-12") == []
+
+
+def test_check_and_rebuild(repository):
+    repository.add_expenses_bulk([expense(), expense(date="2024-02-01")])
+    with DatabaseConnection(repository.db_file) as db_conn:
+        connection = db_conn.connection
+        assert check(connection, TOTALS) == []
+
+        connection.execute(f"UPDATE {TOTALS} SET estimated_total = 1")
+        connection.execute(f"DELETE FROM {TOTALS} WHERE month = '2024-02'")
+        connection.commit()
+        mismatches = check(connection, TOTALS)
+        assert [key for key, _, _ in mismatches] == [
+            ("2024-01", "Alex", 1),
+            ("2024-02", "Alex", 1),
+        ]
+        assert mismatches[1][1] is None
+
+        assert rebuild(connection, TOTALS) == 2
+        assert check(connection, TOTALS) == []
+        with pytest.raises(ValueError):
+            check(connection, "unknown")
+
+
+def test_suspended_rebuilds_afterwards(repository):
+    repository.add_expense(expense())
+    with DatabaseConnection(repository.db_file) as db_conn:
+        connection = db_conn.connection
+
+        def triggers():
+            return connection.execute(
+                "SELECT count(*) FROM sqlite_master WHERE name LIKE 'expenses_totals_%'"
+            ).fetchone()[0]
+
+        with suspended(connection, TOTALS):
+            assert triggers() == 0
+            repository.add_expenses_bulk([expense(date="2024-02-01")] * 2)
+            assert len(check(connection, TOTALS)) == 1
+        assert triggers() == 3
+        assert check(connection, TOTALS) == []
+
+    repository.add_expense(expense(date="2024-03-01"))
+    assert [row[0] for row in totals(repository)] == ["2024-01", "2024-02", "2024-03"]
+
+
+def test_command_line(repository, capsys):
+    repository.add_expense(expense())
+    repository.pool.close()
+    with DatabaseConnection(repository.db_file) as db_conn:
+        db_conn.connection.execute(f"DELETE FROM {TOTALS}")
+
+    assert main(["check", "--dbfile", repository.db_file]) == 1
+    assert main(["rebuild", "--dbfile", repository.db_file]) == 0
+    assert main(["check", "--dbfile", repository.db_file]) == 0
+    assert "rebuilt 1 rows" in capsys.readouterr().out
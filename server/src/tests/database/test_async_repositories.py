@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+
+from householdbudget.database.async_repositories import AsyncRepositoryFactory
+from householdbudget.database.exceptions import RecordNotFoundError
+
+
+@pytest.fixture
+def factory(tmp_db_file):
+    factory = AsyncRepositoryFactory(tmp_db_file, max_workers=2)
+    yield factory
+    factory.shutdown()
+
+
+@pytest.fixture
+def user_data():
+    return {
+        "username": "testuser",
+        "first_name": "Test",
+        "last_name": "User",
+        "email": "test_me@testemail.com",
+        "password": "securepassword123",
+    }
+
+
+@pytest.mark.asyncio
+async def test_user_methods_are_awaitable(factory, user_data):
+    repository = factory.get_user_repository()
+    user = await repository.add_user(user_data)
+
+    fetched = await repository.get_user_by_username(user.username)
+    assert fetched.id == user.id
+
+    await repository.disable_user(user.id)
+    with pytest.raises(RecordNotFoundError):
+        await repository.get_user_by_username(user.username)
+
+
+@pytest.mark.asyncio
+async def test_calls_run_on_db_threads(factory):
+    repository = factory.get_income_repository()
+    await repository.add_income({"amount": 2000.0, "frequency": "Monthly"})
+
+    seen = []
+    original = repository.repository.get_income
+
+    def get_income():
+        seen.append(threading.current_thread().name)
+        return original()
+
+    repository.repository.get_income = get_income
+    income = await repository.get_income()
+
+    assert len(income) == 1
+    assert seen[0].startswith("db")
+
+
+@pytest.mark.asyncio
+async def test_iterate_generator_method(factory, user_data):
+    repository = factory.get_user_repository()
+    await repository.add_user(user_data)
+    await repository.add_user(
+        {**user_data, "username": "testuser2", "email": "test_me2@testemail.com"}
+    )
+
+    usernames = [
+        user.username async for user in repository.iterate("iter_users", chunk_size=1)
+    ]
+    assert usernames == ["testuser", "testuser2"]
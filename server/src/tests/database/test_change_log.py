@@ -0,0 +1,53 @@
+from householdbudget.database.change_log import FeedReader, FeedRegistry
+from householdbudget.database.pool import ConnectionPool
+from householdbudget.database.repositories import IncomeRepository
+
+
+class IncomeIds(FeedReader):
+    def reset(self):
+        self.ids = set()
+        self.resets = getattr(self, "resets", 0) + 1
+
+    def catch_up(self, cursor):
+        last_id = max(self.ids, default=0)
+        self.ids.update(
+            row[0]
+            for row in cursor.execute("SELECT id FROM income WHERE id > ?", [last_id])
+        )
+        for row_id in self.feed.changed_ids(cursor, "income", last_id):
+            exists = cursor.execute("SELECT 1 FROM income WHERE id = ?", [row_id])
+            if exists.fetchone() is None:
+                self.ids.discard(row_id)
+
+
+def test_refresh_catches_up_and_reloads(pool):
+    repository = IncomeRepository(pool.db_file, pool=pool)
+    reader = IncomeIds(repository)
+    repository.add_income({"amount": 100, "frequency": "Monthly"})
+    repository.add_income({"amount": 200, "frequency": "Monthly"})
+    reader.refresh()
+    assert reader.ids == {1, 2}
+
+    repository.execute_non_query("DELETE FROM income WHERE id = 1", [])
+    reader.refresh()
+    assert reader.ids == {2}
+    assert reader.resets == 1
+
+    pool.close()
+    reader.refresh()
+    assert reader.ids == {2}
+    assert reader.resets == 2
+
+
+def test_registry_shares_one_reader_per_file(pool):
+    registry = FeedRegistry(IncomeIds)
+    first = IncomeRepository(pool.db_file, pool=pool)
+    reader = registry.get(first)
+
+    other_pool = ConnectionPool(pool.db_file)
+    try:
+        second = IncomeRepository(pool.db_file, pool=other_pool)
+        assert registry.get(second) is reader
+        assert reader.feed.repository is second
+    finally:
+        other_pool.close()
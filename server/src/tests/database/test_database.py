@@ -1,5 +1,6 @@
 import pytest
 
+from householdbudget.database.exceptions import DuplicateUserError
 from householdbudget.database.factory import RepositoryFactory
 from householdbudget.database.schemas import User
 
@@ -36,3 +37,11 @@ def test_get_user_by_name(db_file, user_data):
     assert user.email == user_data["email"]
     assert user.password_encryptor.encrypted_password is not None
     assert user.password_encryptor.private_key is not None
+
+
+@pytest.mark.usefixtures("db_file")
+def test_create_duplicate_user(db_file, user_data):
+    rf = RepositoryFactory(db_file).get_user_repository()
+    rf.add_user(user_data)
+    with pytest.raises(DuplicateUserError):
+        rf.add_user({**user_data, "username": "someone_else"})
@@ -0,0 +1,135 @@
+import sqlite3
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from householdbudget.database.connection import DatabaseConnection, create_tables
+from householdbudget.database.migrations import (
+    CHANGE_LOG_KEEP,
+    SCHEMA_VERSION,
+    MigrationError,
+    column_exists,
+    get_version,
+    migrate,
+)
+from householdbudget.utils.db_utils import validate_db_file
+
+
+class TestMigrations(unittest.TestCase):
+    @pytest.fixture(autouse=True)
+    def assign_test_db(self, tmpdir_factory):
+        self.test_db = str(tmpdir_factory.mktemp("data").join("test_db.sqlite"))
+        validate_db_file(self.test_db)
+
+    def test_fresh_database_reaches_latest_version(self):
+        self.assertEqual(create_tables(self.test_db), SCHEMA_VERSION)
+        with DatabaseConnection(self.test_db) as db_conn:
+            self.assertEqual(get_version(db_conn.connection), SCHEMA_VERSION)
+            self.assertTrue(db_conn.table_exists("encryption_data"))
+            self.assertTrue(
+                column_exists(db_conn.connection, "encryption_data", "scheme")
+            )
+
+    def test_concurrent_processes_migrate_once(self):
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            versions = list(executor.map(create_tables, [self.test_db] * 4))
+        self.assertEqual(versions, [SCHEMA_VERSION] * 4)
+        with DatabaseConnection(self.test_db) as db_conn:
+            self.assertEqual(get_version(db_conn.connection), SCHEMA_VERSION)
+
+    def test_migrate_is_idempotent(self):
+        create_tables(self.test_db)
+        self.assertEqual(create_tables(self.test_db), SCHEMA_VERSION)
+
+    def test_unversioned_database_is_upgraded(self):
+        with DatabaseConnection(self.test_db) as db_conn:
+            db_conn.connection.execute(
+                """
+                CREATE TABLE encryption_data (
+                    user_id INTEGER PRIMARY KEY,
+                    encrypted_password TEXT NOT NULL,
+                    private_key TEXT NOT NULL,
+                    cyphertext TEXT NOT NULL,
+                    salt TEXT NOT NULL
+                )
+                """
+            )
+            db_conn.connection.execute(
+                "INSERT INTO encryption_data VALUES (1, 'p', 'k', 'c', 's')"
+            )
+
+        create_tables(self.test_db)
+
+        with DatabaseConnection(self.test_db) as db_conn:
+            scheme = db_conn.connection.execute(
+                "SELECT scheme FROM encryption_data WHERE user_id = 1"
+            ).fetchone()[0]
+            self.assertEqual(scheme, "kyber-fernet")
+
+    def test_partial_migration(self):
+        with DatabaseConnection(self.test_db) as db_conn:
+            self.assertEqual(migrate(db_conn.connection, target=1), 1)
+            self.assertFalse(
+                column_exists(db_conn.connection, "encryption_data", "scheme")
+            )
+
+    def test_failed_migration_rolls_back(self):
+        with DatabaseConnection(self.test_db) as db_conn:
+            db_conn.connection.execute("CREATE TABLE income (id INTEGER)")
+
+        with self.assertRaises(MigrationError):
+            create_tables(self.test_db)
+
+        connection = sqlite3.connect(self.test_db)
+        try:
+            # migration 1 succeeded; 3 failed on the malformed income table
+            self.assertEqual(get_version(connection), 2)
+        finally:
+            connection.close()
+
+    def test_change_log_records_updates_and_deletes(self):
+        create_tables(self.test_db)
+        connection = sqlite3.connect(self.test_db)
+        try:
+            connection.execute(
+                "INSERT INTO income (amount, frequency, disabled) VALUES (100, 'Monthly', 0)"
+            )
+            connection.execute("UPDATE income SET disabled = 1")
+            connection.execute("DELETE FROM income")
+            log = connection.execute(
+                "SELECT table_name, row_id FROM change_log ORDER BY seq"
+            ).fetchall()
+            self.assertEqual(log, [("income", 1), ("income", 1)])
+
+            connection.executemany(
+                "INSERT INTO change_log (table_name, row_id) VALUES ('income', ?)",
+                [(i,) for i in range(2 * CHANGE_LOG_KEEP)],
+            )
+            # pruned every 1000 entries
+            self.assertLess(
+                connection.execute("SELECT count(*) FROM change_log").fetchone()[0],
+                CHANGE_LOG_KEEP + 1000,
+            )
+        finally:
+            connection.close()
+
+    def test_totals_are_rebuilt_without_malformed_dates(self):
+        with DatabaseConnection(self.test_db) as db_conn:
+            connection = db_conn.connection
+            migrate(connection, target=5)
+            connection.executemany(
+                "INSERT INTO expenses (estimated_date, name, estimated_amount,"
+                " responsible, frequency, shared) VALUES (?, 'x', 10, 'Alex', 'Monthly', 0)",
+                [("2024-01-05",), ("10/01/2023",)],
+            )
+            connection.commit()
+            migrate(connection)
+            months = connection.execute(
+                "SELECT month, expense_count FROM expense_monthly_totals"
+            ).fetchall()
+        self.assertEqual(months, [("2024-01", 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
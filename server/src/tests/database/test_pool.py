@@ -0,0 +1,111 @@
+import os
+import threading
+import unittest
+
+import pytest
+
+from householdbudget.database.connection import DatabaseConnection
+from householdbudget.database.exceptions import PoolTimeoutError
+from householdbudget.database.pool import ConnectionPool, get_pool
+from householdbudget.utils.db_utils import validate_db_file
+
+
+class TestConnectionPool(unittest.TestCase):
+    @pytest.fixture(autouse=True)
+    def assign_test_db(self, tmpdir_factory):
+        self.test_db = str(tmpdir_factory.mktemp("data").join("test_db.sqlite"))
+        validate_db_file(self.test_db)
+
+    def setUp(self):
+        self.pool = ConnectionPool(self.test_db, max_size=2, timeout=0.1)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_connection_is_reused(self):
+        first = self.pool.acquire()
+        self.pool.release(first)
+        second = self.pool.acquire()
+        self.pool.release(second)
+
+        self.assertIs(first, second)
+        stats = self.pool.stats()
+        self.assertEqual(stats["checkouts"], 2)
+        self.assertEqual(stats["created"], 1)
+        self.assertEqual(stats["open"], 1)
+        self.assertEqual(stats["idle"], 1)
+
+    def test_nested_checkout_shares_connection(self):
+        outer = self.pool.acquire()
+        inner = self.pool.acquire()
+        self.assertIs(outer, inner)
+        self.pool.release(inner)
+        self.assertEqual(self.pool.stats()["in_use"], 1)
+        self.pool.release(outer)
+        self.assertEqual(self.pool.stats()["in_use"], 0)
+
+    def test_timeout_when_exhausted(self):
+        # the holders stay alive so their thread ids cannot be reused
+        acquired = threading.Barrier(3)
+        done = threading.Event()
+
+        def hold():
+            connection = self.pool.acquire()
+            acquired.wait()
+            done.wait()
+            self.pool.release(connection)
+
+        threads = [threading.Thread(target=hold) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        acquired.wait()
+
+        with self.assertRaises(PoolTimeoutError):
+            self.pool.acquire()
+        self.assertEqual(self.pool.stats()["timeouts"], 1)
+
+        done.set()
+        for thread in threads:
+            thread.join()
+
+    def test_rollback_on_error(self):
+        with DatabaseConnection(self.test_db, pool=self.pool) as db_conn:
+            db_conn.connection.execute("CREATE TABLE items (name TEXT)")
+
+        with self.assertRaises(RuntimeError):
+            with DatabaseConnection(self.test_db, pool=self.pool) as db_conn:
+                db_conn.connection.execute("INSERT INTO items VALUES ('a')")
+                raise RuntimeError("boom")
+
+        with DatabaseConnection(self.test_db, pool=self.pool) as db_conn:
+            count = db_conn.connection.execute("SELECT COUNT(*) FROM items")
+            self.assertEqual(count.fetchone()[0], 0)
+
+    def test_replaced_file_is_detected(self):
+        connection = self.pool.acquire()
+        self.pool.release(connection)
+
+        os.replace(self.test_db, self.test_db + ".old")
+        validate_db_file(self.test_db)
+
+        fresh = self.pool.acquire()
+        self.pool.release(fresh)
+        self.assertIsNot(connection, fresh)
+        self.assertEqual(self.pool.stats()["discarded"], 1)
+
+    def test_close_keeps_pool_usable(self):
+        connection = self.pool.acquire()
+        self.pool.release(connection)
+        self.pool.close()
+        self.assertEqual(self.pool.stats()["open"], 0)
+
+        fresh = self.pool.acquire()
+        self.pool.release(fresh)
+        self.assertIsNot(connection, fresh)
+
+    def test_get_pool_is_shared(self):
+        self.assertIs(get_pool(self.test_db), get_pool(self.test_db))
+
+
+if __name__ == "__main__":
+    unittest.main()
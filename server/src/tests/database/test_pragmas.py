@@ -0,0 +1,62 @@
+import unittest
+
+import pytest
+
+from householdbudget.database.connection import DatabaseConnection
+from householdbudget.database.pool import ConnectionPool
+from householdbudget.database.pragmas import (
+    PRAGMA_PROFILES,
+    effective_pragmas,
+    get_pragma_profile,
+)
+from householdbudget.utils.db_utils import validate_db_file
+
+
+class TestPragmaProfiles(unittest.TestCase):
+    @pytest.fixture(autouse=True)
+    def assign_test_db(self, tmpdir_factory, monkeypatch):
+        self.test_db = str(tmpdir_factory.mktemp("data").join("test_db.sqlite"))
+        validate_db_file(self.test_db)
+        self.monkeypatch = monkeypatch
+
+    def test_named_profiles(self):
+        for name, settings in PRAGMA_PROFILES.items():
+            profile = get_pragma_profile(name)
+            self.assertEqual(profile["journal_mode"], settings["journal_mode"])
+
+    def test_env_selects_profile_and_overrides(self):
+        self.monkeypatch.setenv("DB_PRAGMA_PROFILE", "durable")
+        self.monkeypatch.setenv("DB_CACHE_SIZE", "-4000")
+        profile = get_pragma_profile()
+        self.assertEqual(profile["synchronous"], "FULL")
+        self.assertEqual(profile["cache_size"], -4000)
+
+    def test_invalid_values_are_rejected(self):
+        with self.assertRaises(ValueError):
+            get_pragma_profile("turbo")
+        self.monkeypatch.setenv("DB_SYNCHRONOUS", "NORMAL; DROP TABLE users")
+        with self.assertRaises(ValueError):
+            get_pragma_profile("balanced")
+
+    def test_profile_is_applied_to_pooled_connections(self):
+        pool = ConnectionPool(self.test_db, pragmas=get_pragma_profile("fast-read"))
+        try:
+            with DatabaseConnection(self.test_db, pool=pool) as db_conn:
+                settings = effective_pragmas(db_conn.connection)
+        finally:
+            pool.close()
+        self.assertEqual(settings["journal_mode"], "WAL")
+        self.assertEqual(settings["synchronous"], "NORMAL")
+        self.assertEqual(settings["temp_store"], "MEMORY")
+        self.assertEqual(settings["busy_timeout"], 10000)
+
+    def test_profile_is_applied_to_direct_connections(self):
+        pragmas = get_pragma_profile("durable")
+        with DatabaseConnection(self.test_db, pragmas=pragmas) as db_conn:
+            settings = effective_pragmas(db_conn.connection)
+        self.assertEqual(settings["synchronous"], "FULL")
+        self.assertEqual(settings["cache_size"], -2000)
+
+
+if __name__ == "__main__":
+    unittest.main()
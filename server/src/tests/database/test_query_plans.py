@@ -0,0 +1,122 @@
+import re
+
+import pytest
+
+from householdbudget.database.pool import ConnectionPool
+from householdbudget.database.repositories import (
+    ExpenseRepository,
+    IncomeRepository,
+    UserRepository,
+)
+
+# a bare "SCAN <table>" is a full table scan; scanning an index is fine
+FULL_SCAN = re.compile(r"^SCAN \S+$")
+PLANNED_STATEMENTS = ("SELECT", "UPDATE", "DELETE")
+
+
+@pytest.fixture
+def traced(tmp_db_file):
+    """Repositories sharing one connection that records every statement."""
+    pool = ConnectionPool(tmp_db_file, max_size=1)
+    statements = []
+    connection = pool.acquire()
+    connection.set_trace_callback(statements.append)
+    pool.release(connection)
+
+    yield pool, statements
+    pool.close()
+
+
+def assert_no_full_scans(pool, statements):
+    connection = pool.acquire()
+    try:
+        checked = 0
+        for statement in set(statements):
+            if not statement.lstrip().upper().startswith(PLANNED_STATEMENTS):
+                continue
+            if statement.strip() == "SELECT 1":
+                continue
+            plan = connection.execute(f"EXPLAIN QUERY PLAN {statement}").fetchall()
+            scans = [row[3] for row in plan if FULL_SCAN.match(row[3])]
+            assert not scans, f"{statement!r} falls back to {scans}"
+            checked += 1
+        assert checked, "no statements were captured"
+    finally:
+        pool.release(connection)
+
+
+def test_user_queries(traced):
+    pool, statements = traced
+    repository = UserRepository(pool.db_file, pool=pool)
+    user = repository.add_user(
+        {
+            "username": "testuser",
+            "first_name": "Test",
+            "last_name": "User",
+            "email": "test_me@testemail.com",
+            "password": "securepassword123",
+        }
+    )
+
+    repository.get_users()
+    repository.get_users(include_credentials=False)
+    repository.get_user_by_id(user.id)
+    repository.get_user_by_name(user.username)
+    repository.get_user_by_username(user.username)
+    repository.get_user_credentials_by_id(user.id)
+    repository.get_encryption_data(user.id)
+    repository.update_encryption_data(user.id, user.password_encryptor)
+    repository.disable_user(user.id)
+
+    assert_no_full_scans(pool, statements)
+
+
+def test_expense_queries(traced):
+    pool, statements = traced
+    repository = ExpenseRepository(pool.db_file, pool=pool)
+    repository.add_expense(
+        {
+            "estimated_date": "2023-10-01",
+            "name": "Groceries",
+            "estimated_amount": 100.0,
+            "actual_amount": 90.0,
+            "responsible": "John",
+            "frequency": "Monthly",
+            "shared": 1,
+        }
+    )
+
+    expense = repository.get_expenses()[0]
+    repository.get_expense_by_id(expense[0])
+    repository.get_expenses_page(after=0, limit=10)
+    repository.get_schedule()
+    repository.get_monthly_totals()
+    repository.get_monthly_totals("2023-01", "2023-12", responsible="John")
+    list(repository.iter_expenses())
+    repository.disable_expense(expense[0])
+
+    assert_no_full_scans(pool, statements)
+
+
+def test_income_queries(traced):
+    pool, statements = traced
+    repository = IncomeRepository(pool.db_file, pool=pool)
+    repository.add_income({"amount": 2000.0, "frequency": "Monthly"})
+
+    income = repository.get_income()[0]
+    repository.get_income_by_id(income[0])
+    repository.get_income_page(after=0, limit=10)
+    repository.get_schedule()
+    list(repository.iter_income())
+    repository.disable_income(income[0])
+
+    assert_no_full_scans(pool, statements)
+
+
+def test_detects_full_scan(traced):
+    pool, statements = traced
+    ExpenseRepository(pool.db_file, pool=pool).execute_query(
+        "SELECT * FROM expenses WHERE name = ?", ["Groceries"]
+    )
+    with pytest.raises(AssertionError):
+        assert_no_full_scans(pool, statements)
@@ -1,15 +1,22 @@
+import os
 import unittest
+from unittest import mock
 
 import pytest
 
 from householdbudget.database import connection as conn
-from householdbudget.database.exceptions import RecordNotFoundError
+from householdbudget.database.exceptions import (
+    ImportAbortedError,
+    InvalidDataError,
+    RecordNotFoundError,
+)
 from householdbudget.database.repositories import (
     ExpenseRepository,
     IncomeRepository,
     UserRepository,
 )
 from householdbudget.database.schemas import User
+from householdbudget.utils.crypto_utils import close_key_cache, get_key_cache
 from householdbudget.utils.db_utils import validate_db_file
 
 
@@ -54,6 +61,7 @@ class TestUserRepository(unittest.TestCase):
                     private_key TEXT NOT NULL,
                     cyphertext TEXT NOT NULL,
                     salt TEXT NOT NULL,
+                    scheme TEXT NOT NULL DEFAULT 'kyber-fernet',
                     FOREIGN KEY (user_id) REFERENCES users (id)
                 )
             """
@@ -74,6 +82,34 @@ class TestUserRepository(unittest.TestCase):
         users = self.user_repo.get_users()
         self.assertEqual(len(users), 2)
 
+    def test_iter_users_in_chunks(self):
+        for i in range(3):
+            user_data = self.user_data.copy()
+            user_data["username"] = f"testuser{i}"
+            user_data["email"] = f"test_me{i}@testemail.com"
+            self.user_repo.add_user(user_data)
+
+        users = list(self.user_repo.iter_users(chunk_size=2))
+        self.assertEqual(
+            [user.username for user in users],
+            ["testuser0", "testuser1", "testuser2"],
+        )
+        self.assertTrue(users[2].verify_password("securepassword123"))
+
+    def test_get_user_columns(self):
+        self.user_repo.add_user(self.user_data)
+        users = self.user_repo.get_users(columns=["username", "email"])
+        self.assertEqual(users, [(1, "testuser", "test_me@testemail.com")])
+        self.assertEqual(users[0].email, "test_me@testemail.com")
+        with self.assertRaises(InvalidDataError):
+            self.user_repo.get_users(columns=["password"])
+
+    def test_get_users_without_credentials(self):
+        self.user_repo.add_user(self.user_data)
+        users = self.user_repo.get_users(include_credentials=False)
+        self.assertEqual(len(users), 1)
+        self.assertIsNone(users[0].password_encryptor.private_key)
+
     def test_disable_user(self):
         user: User = self.user_repo.add_user(self.user_data)
         self.user_repo.disable_user(user.id)
@@ -81,6 +117,83 @@ class TestUserRepository(unittest.TestCase):
         with self.assertRaises(RecordNotFoundError):
             self.user_repo.get_user_by_username(user.username)
 
+    def test_disable_user_invalidates_cache(self):
+        user: User = self.user_repo.add_user(self.user_data)
+        self.user_repo.get_user_by_username(user.username)
+        self.user_repo.get_user_by_id(user.id)
+        self.user_repo.disable_user(user.id)
+
+        with self.assertRaises(RecordNotFoundError):
+            self.user_repo.get_user_by_username(user.username)
+        with self.assertRaises(RecordNotFoundError):
+            self.user_repo.get_user_by_id(user.id)
+
+    def test_user_lookups_are_cached(self):
+        user: User = self.user_repo.add_user(self.user_data)
+        statements = []
+
+        def trace(statement):
+            # ignore the pool's health check and transaction control
+            if statement.startswith("SELECT") and statement != "SELECT 1":
+                statements.append(statement)
+
+        connection = self.user_repo.pool.acquire()
+        connection.set_trace_callback(trace)
+        self.user_repo.pool.release(connection)
+
+        first = self.user_repo.get_user_by_username(user.username)
+        self.assertEqual(len(statements), 1)
+        first.password_encryptor.private_key = b"changed"
+
+        for _ in range(3):
+            cached = self.user_repo.get_user_by_username(user.username)
+            self.user_repo.get_user_by_id(user.id)
+            self.user_repo.get_encryption_data(user.id)
+        self.assertEqual(
+            cached.password_encryptor.private_key, user.password_encryptor.private_key
+        )
+        # only the first encryption_data lookup reads from disk
+        self.assertEqual(len(statements), 2)
+        self.assertEqual(self.user_repo.cache_stats()["misses"], 2)
+
+        connection = self.user_repo.pool.acquire()
+        connection.set_trace_callback(None)
+        self.user_repo.pool.release(connection)
+
+    def test_update_encryption_data_invalidates_cache(self):
+        user: User = self.user_repo.add_user(self.user_data)
+        self.user_repo.get_encryption_data(user.id)
+        user.set_password("newpassword", scheme="pbkdf2-sha256")
+        self.user_repo.update_encryption_data(user.id, user.password_encryptor)
+
+        retrieved = self.user_repo.get_user_by_username(user.username)
+        self.assertTrue(retrieved.verify_password("newpassword"))
+        self.assertEqual(
+            self.user_repo.get_encryption_data(user.id)["scheme"], "pbkdf2-sha256"
+        )
+
+    def test_encryption_data_changes_drop_the_derived_key(self):
+        with mock.patch.dict(os.environ, {"DERIVED_KEY_CACHE_SIZE": "4"}):
+            self.addCleanup(close_key_cache)
+            close_key_cache()
+            user: User = self.user_repo.add_user(self.user_data)
+            user.set_password("kyberpassword", scheme="kyber-fernet")
+            self.user_repo.update_encryption_data(user.id, user.password_encryptor)
+
+            retrieved = self.user_repo.get_user_by_username(user.username)
+            self.assertTrue(retrieved.verify_password("kyberpassword"))
+            self.assertIsNotNone(get_key_cache().get(user.id))
+
+            self.user_repo.update_encryption_data(user.id, user.password_encryptor)
+            self.assertIsNone(get_key_cache().get(user.id))
+
+    def test_closing_the_pool_clears_cache(self):
+        user: User = self.user_repo.add_user(self.user_data)
+        self.user_repo.get_user_by_id(user.id)
+        self.user_repo.pool.close()
+        self.user_repo.get_user_by_id(user.id)
+        self.assertEqual(self.user_repo.cache_stats()["hits"], 0)
+
 
 class TestExpenseRepository(unittest.TestCase):
     @pytest.fixture(autouse=True)
@@ -124,6 +237,109 @@ class TestExpenseRepository(unittest.TestCase):
         expenses = self.expense_repo.get_expenses()
         self.assertEqual(len(expenses), 1)
 
+    def test_expense_pages(self):
+        self.assertEqual(self.expense_repo.get_expenses_page(), [])
+        rows = [
+            {
+                "estimated_date": "2023-10-01",
+                "name": f"Expense {i}",
+                "estimated_amount": i,
+                "actual_amount": None,
+                "responsible": "John",
+                "frequency": "Monthly",
+                "shared": 0,
+            }
+            for i in range(5)
+        ]
+        self.expense_repo.add_expenses_bulk(rows)
+        self.expense_repo.disable_expense(2)
+
+        first = self.expense_repo.get_expenses_page(limit=2)
+        self.assertEqual([row[0] for row in first], [1, 3])
+        rest = self.expense_repo.get_expenses_page(after=first[-1][0], limit=2)
+        self.assertEqual([row[0] for row in rest], [4, 5])
+        self.assertEqual(
+            [row[0] for row in self.expense_repo.iter_expenses(chunk_size=2)],
+            [1, 3, 4, 5],
+        )
+        self.assertEqual(
+            [row[0] for row in self.expense_repo.iter_expenses(after=3)], [4, 5]
+        )
+
+    def test_expense_columns(self):
+        self.expense_repo.add_expense(
+            {
+                "estimated_date": "2023-10-01",
+                "name": "Groceries",
+                "estimated_amount": 100.0,
+                "actual_amount": None,
+                "responsible": "John",
+                "frequency": "Monthly",
+                "shared": 1,
+            }
+        )
+        expense = self.expense_repo.get_expenses()[0]
+        self.assertEqual(
+            (expense.id, expense.name, expense.disabled), (1, "Groceries", 0)
+        )
+        self.assertEqual(
+            self.expense_repo.get_expenses(columns=["name", "estimated_amount"]),
+            [("Groceries", 100.0)],
+        )
+        page = self.expense_repo.get_expenses_page(columns=["name"])
+        self.assertEqual(page[0]._fields, ("id", "name"))
+        by_id = self.expense_repo.get_expense_by_id(1, columns=["responsible"])
+        self.assertEqual(by_id[0].responsible, "John")
+        with self.assertRaises(InvalidDataError):
+            self.expense_repo.get_expenses(columns=["name; DROP TABLE expenses"])
+
+    def test_add_expenses_bulk(self):
+        expense_data = {
+            "estimated_date": "2023-10-01",
+            "name": "Groceries",
+            "estimated_amount": "100.0",
+            "actual_amount": "",
+            "responsible": "John",
+            "frequency": "Monthly",
+            "shared": "true",
+        }
+        rows = [expense_data] * 5 + [{"name": "Incomplete"}] + [expense_data] * 4
+        result = self.expense_repo.add_expenses_bulk(rows, chunk_size=3)
+        self.assertEqual(result["inserted"], 9)
+        self.assertEqual(
+            result["errors"],
+            [{"row": 6, "error": "Missing required expense data fields."}],
+        )
+        expense = self.expense_repo.get_expenses()[0]
+        self.assertEqual(expense[3], 100.0)
+        self.assertIsNone(expense[4])
+        self.assertEqual(expense[7], 1)
+
+    def test_add_expenses_bulk_reports_how_far_an_aborted_import_got(self):
+        expense_data = {
+            "estimated_date": "2023-10-01",
+            "name": "Groceries",
+            "estimated_amount": "100.0",
+            "actual_amount": "",
+            "responsible": "John",
+            "frequency": "Monthly",
+            "shared": "true",
+        }
+
+        def rows():
+            yield from [expense_data] * 4 + [{"name": "Incomplete"}]
+            raise InvalidDataError("Unreadable")
+
+        with self.assertRaises(ImportAbortedError) as raised:
+            self.expense_repo.add_expenses_bulk(rows(), chunk_size=3)
+        self.assertEqual(raised.exception.message, "Unreadable (stopped after row 5)")
+        self.assertEqual(raised.exception.result["inserted"], 4)
+        self.assertEqual(
+            raised.exception.result["errors"],
+            [{"row": 5, "error": "Missing required expense data fields."}],
+        )
+        self.assertEqual(len(self.expense_repo.get_expenses()), 4)
+
     def test_disable_expense(self):
         expense_data = {
             "estimated_date": "2023-10-01",
@@ -171,6 +387,33 @@ class TestIncomeRepository(unittest.TestCase):
         income = self.income_repo.get_income()
         self.assertEqual(len(income), 1)
 
+    def test_add_income_bulk(self):
+        rows = [
+            {"amount": "2000", "frequency": "Monthly"},
+            {"amount": "900", "frequency": "Bi-weekly", "bi_weekly_week": "2"},
+            {"amount": "10", "frequency": "Yearly"},
+        ]
+        result = self.income_repo.add_income_bulk(rows)
+        self.assertEqual(result["inserted"], 2)
+        self.assertEqual(result["errors"][0]["row"], 3)
+        self.assertEqual(self.income_repo.get_income()[1][3], 2)
+
+    def test_income_pages(self):
+        self.assertEqual(list(self.income_repo.iter_income()), [])
+        for amount in (100, 200, 300):
+            self.income_repo.add_income({"amount": amount, "frequency": "Monthly"})
+
+        page = self.income_repo.get_income_page(after=1, limit=1)
+        self.assertEqual([row[1] for row in page], [200.0])
+        self.assertEqual(
+            list(self.income_repo.iter_income(after=2, columns=["amount"])),
+            [(3, 300.0)],
+        )
+        self.assertEqual(
+            [row[1] for row in self.income_repo.iter_income(chunk_size=1)],
+            [100.0, 200.0, 300.0],
+        )
+
     def test_disable_income(self):
         income_data = {"amount": 2000.0, "frequency": "Monthly"}
         self.income_repo.add_income(income_data)
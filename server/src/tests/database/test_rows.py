@@ -0,0 +1,34 @@
+import pytest
+
+from householdbudget.database.exceptions import InvalidDataError
+from householdbudget.database.rows import (
+    TABLE_COLUMNS,
+    make_rows,
+    row_type,
+    select_columns,
+)
+
+
+def test_select_columns():
+    assert select_columns("income") == TABLE_COLUMNS["income"]
+    assert select_columns("income", ["amount", "id"]) == ("amount", "id")
+    assert select_columns("income", ["amount", "amount"]) == ("amount",)
+    assert select_columns("income", ["amount"], keyed=True) == ("id", "amount")
+    assert select_columns("income", ["amount", "id"], keyed=True) == ("id", "amount")
+
+
+@pytest.mark.parametrize("columns", [[], ["salary"], ["amount", "1; --"]])
+def test_select_columns_rejects_unknown(columns):
+    with pytest.raises(InvalidDataError):
+        select_columns("income", columns)
+
+
+def test_row_type():
+    cls = row_type("expenses", ("id", "name"))
+    assert cls is row_type("expenses", ("id", "name"))
+    assert cls.__name__ == "ExpenseRow"
+
+    [row] = make_rows(cls, [(1, "Rent")])
+    assert row == (1, "Rent")
+    assert type(row) is cls
+    assert (row[0], row.name) == (1, "Rent")
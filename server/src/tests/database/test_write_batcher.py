@@ -0,0 +1,109 @@
+import sqlite3
+import threading
+
+import pytest
+
+from householdbudget.database.exceptions import DatabaseError
+from householdbudget.database.repositories import IncomeRepository
+from householdbudget.database.write_batcher import WriteBatcher, statement
+from householdbudget.metrics.registry import metrics
+
+
+def add_income(amount):
+    return statement(IncomeRepository.INSERT_INCOME, [amount, "Monthly", None])
+
+
+def amounts(pool):
+    return [row[1] for row in IncomeRepository(pool.db_file, pool=pool).get_income()]
+
+
+def test_operations_share_a_commit(pool):
+    writer = WriteBatcher(pool.db_file, pool=pool, max_batch=10, max_delay=0.5)
+    metrics.reset()
+    try:
+        futures = [writer.submit(add_income(amount)) for amount in range(25)]
+        ids = [future.result(timeout=10) for future in futures]
+    finally:
+        writer.close()
+
+    assert ids == list(range(1, 26))
+    assert amounts(pool) == list(range(25))
+    # a full batch is committed without waiting out the delay
+    assert writer.stats()["batches"] == 3
+    [(_, counts, count, total)] = metrics.histograms["write_batch"].samples()
+    assert (count, total) == (3, 25)
+    assert 'householdbudget_write_batch_size_bucket{le="8"} 1' in metrics.render()
+
+
+def test_failed_operation_is_rolled_back_alone(pool):
+    writer = WriteBatcher(pool.db_file, pool=pool, max_delay=0.2)
+
+    def half_done(cursor):
+        add_income(1)(cursor)
+        raise ValueError("changed my mind")
+
+    try:
+        first = writer.submit(add_income(10))
+        failed = writer.submit(half_done)
+        invalid = writer.submit(statement("INSERT INTO income (amount) VALUES (1)"))
+        broken = writer.submit(statement("SELECT * FROM nowhere"))
+        last = writer.submit(add_income(20))
+
+        assert last.result(timeout=10) == 2
+        assert first.result() == 1
+        with pytest.raises(ValueError):
+            failed.result()
+        with pytest.raises(sqlite3.IntegrityError):
+            invalid.result()
+        with pytest.raises(DatabaseError):
+            broken.result()
+    finally:
+        writer.close()
+    assert amounts(pool) == [10, 20]
+    assert writer.stats()["operations"] == 5
+
+
+def test_statement_returns_rowcount(pool):
+    writer = WriteBatcher(pool.db_file, pool=pool, max_delay=0)
+    try:
+        writer.submit(add_income(10)).result(timeout=10)
+        disable = statement(IncomeRepository.DISABLE_INCOME, [1])
+        assert writer.submit(disable).result(timeout=10) == 1
+        assert writer.submit(disable).result(timeout=10) == 0
+    finally:
+        writer.close()
+
+
+def test_concurrent_submitters(pool):
+    writer = WriteBatcher(pool.db_file, pool=pool, max_batch=64, max_delay=0.05)
+    barrier = threading.Barrier(8)
+    errors = []
+
+    def client(n):
+        barrier.wait()
+        try:
+            for i in range(10):
+                writer.submit(add_income(n * 10 + i)).result(timeout=10)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.close()
+
+    assert not errors
+    assert sorted(amounts(pool)) == list(range(80))
+    assert writer.stats()["batches"] < 80
+
+
+def test_close_drains_and_rejects(pool):
+    writer = WriteBatcher(pool.db_file, pool=pool, max_delay=0.5)
+    future = writer.submit(add_income(10))
+    writer.close()
+    assert future.result(timeout=0) == 1
+    with pytest.raises(RuntimeError):
+        writer.submit(add_income(20))
+    writer.close()
@@ -0,0 +1,41 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from householdbudget.main import app
+
+client = TestClient(app)
+
+
+@pytest.mark.usefixtures("db_file")
+def test_login_reports_timings(db_file):
+    user = {
+        "username": "timed",
+        "first_name": "Timed",
+        "last_name": "User",
+        "email": "timed@testemail.com",
+        "password": "cleanpassword",
+    }
+    response = client.post("/register", json=user)
+    assert response.status_code == 201
+    client.post("/token", data=user)
+    response = client.post("/token", data={**user, "username": "nobody"})
+    assert response.status_code == 401
+
+    # repository calls run on the DB threads, yet count towards the request
+    header = response.headers["Server-Timing"]
+    assert "sql;dur=" in header
+    assert "db-connect;dur=" in header
+    assert "total;dur=" in header
+
+    text = client.get("/metrics").text
+    assert (
+        'householdbudget_http_request_duration_seconds_count{method="POST",'
+        'route="/token",status="401"}'
+    ) in text
+    assert 'householdbudget_crypto_duration_seconds_count{operation="' in text
+    assert 'householdbudget_sql_duration_seconds_count{statement="SELECT u.id' in text
+
+
+def test_unmatched_routes_share_a_label():
+    assert client.get("/no/such/path").status_code == 404
+    assert 'route="unmatched",status="404"' in client.get("/metrics").text
@@ -0,0 +1,60 @@
+import pytest
+
+from householdbudget.metrics.registry import (
+    MetricsRegistry,
+    fingerprint,
+    request_timings,
+    server_timing,
+    timed,
+    timed_call,
+)
+
+
+def test_fingerprint():
+    assert (
+        fingerprint("SELECT *\n  FROM expenses WHERE id = 42 AND name = 'it''s'")
+        == "SELECT * FROM expenses WHERE id = ? AND name = ?"
+    )
+    assert fingerprint("SELECT v2 FROM t") == "SELECT v2 FROM t"
+
+
+def test_render():
+    registry = MetricsRegistry()
+    registry.observe("sql", ('SELECT "x"',), 0.003)
+    registry.observe("sql", ('SELECT "x"',), 2.0)
+    registry.observe("db_connect", (), 0.0001)
+    text = registry.render()
+
+    name = "householdbudget_sql_duration_seconds"
+    assert f"# TYPE {name} histogram" in text
+    assert f'{name}_bucket{{statement="SELECT \\"x\\"",le="0.005"}} 1' in text
+    assert f'{name}_bucket{{statement="SELECT \\"x\\"",le="+Inf"}} 2' in text
+    assert f'{name}_count{{statement="SELECT \\"x\\""}} 2' in text
+    assert "householdbudget_db_connect_duration_seconds_count 1" in text
+
+
+def test_timed_collects_request_timings():
+    timings = {}
+    token = request_timings.set(timings)
+    try:
+
+        @timed_call("crypto", "work")
+        def work():
+            return 1
+
+        assert work() == 1
+        assert work.metric_name == "work"
+        with timed("sql", "SELECT ?"):
+            pass
+        with pytest.raises(ValueError):
+            with timed("sql", "SELECT ?"):
+                raise ValueError
+    finally:
+        request_timings.reset(token)
+
+    assert timings[("crypto", "work")][1] == 1
+    assert timings[("sql", "SELECT ?")][1] == 2
+    header = server_timing(timings, 0.01)
+    assert "crypto-work;dur=" in header
+    assert "sql;dur=" in header and 'desc="2x"' in header
+    assert header.endswith("total;dur=10.00")
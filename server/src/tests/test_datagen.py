@@ -0,0 +1,119 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+from householdbudget.database.aggregates import check
+from householdbudget.database.pool import ConnectionPool
+from householdbudget.database.repositories import IncomeRepository, UserRepository
+from householdbudget.datagen import generate, main, occurrences
+
+
+def dump(db_file):
+    connection = sqlite3.connect(db_file)
+    try:
+        return {
+            table: connection.execute(f"SELECT * FROM {table} ORDER BY 1").fetchall()
+            for table in ["users", "income", "expenses"]
+        }
+    finally:
+        connection.close()
+
+
+@pytest.fixture
+def datagen_db(tmp_path):
+    db_file = str(tmp_path / "data" / "budget.sqlite")
+    generate(db_file, users=5, years=1, seed=7, chunk_size=500)
+    return db_file
+
+
+def test_same_seed_same_data(datagen_db, tmp_path):
+    other = str(tmp_path / "other" / "budget.sqlite")
+    generate(other, users=5, years=1, seed=7, chunk_size=500)
+    assert dump(other) == dump(datagen_db)
+
+    different = str(tmp_path / "different" / "budget.sqlite")
+    generate(different, users=5, years=1, seed=8)
+    assert dump(different)["expenses"] != dump(datagen_db)["expenses"]
+
+
+def test_counts(tmp_path):
+    counts = generate(str(tmp_path / "budget.sqlite"), users=3, years=2, income=4)
+    assert counts["users"] == 3
+    assert counts["income"] == 12
+    assert counts["expenses"] > 3 * 2 * 12
+
+
+def test_income_follows_the_validation_rules(datagen_db):
+    repository = IncomeRepository(datagen_db)
+    for _, amount, frequency, bi_weekly_week, _ in dump(datagen_db)["income"]:
+        row = {
+            "amount": amount,
+            "frequency": frequency,
+            "bi_weekly_week": bi_weekly_week,
+        }
+        assert repository.income_params(row) == [amount, frequency, bi_weekly_week]
+        if frequency != "Bi-weekly":
+            assert bi_weekly_week is None
+
+
+def test_expenses_stay_in_range(datagen_db):
+    expenses = dump(datagen_db)["expenses"]
+    assert {row[6] for row in expenses} <= set(IncomeRepository.VALID_FREQUENCIES)
+    assert all("2020-01-01" <= row[1] <= "2020-12-31" for row in expenses)
+
+
+def test_aggregates_and_triggers_are_restored(datagen_db):
+    connection = sqlite3.connect(datagen_db)
+    try:
+        assert check(connection, "expense_monthly_totals") == []
+        triggers = connection.execute(
+            "SELECT count(*) FROM sqlite_master WHERE name LIKE 'expenses_totals_%'"
+        ).fetchone()[0]
+    finally:
+        connection.close()
+    assert triggers == 3
+
+
+def test_users_can_log_in(datagen_db):
+    pool = ConnectionPool(datagen_db)
+    try:
+        repository = UserRepository(datagen_db, pool=pool)
+        first = repository.get_user_by_username("user1")
+        second = repository.get_user_by_username("user2")
+    finally:
+        pool.close()
+    assert first.verify_password("password")
+    assert not first.verify_password("wrong")
+    assert first.password_encryptor.private_key != second.password_encryptor.private_key
+
+
+def test_appends_after_existing_users(datagen_db):
+    counts = generate(datagen_db, users=2, seed=7)
+    assert counts["users"] == 2
+    assert [row[1] for row in dump(datagen_db)["users"]][-2:] == ["user6", "user7"]
+
+
+@pytest.mark.parametrize(
+    "frequency, first, expected",
+    [
+        (
+            "Bi-weekly",
+            "2024-01-03",
+            ["2024-01-03", "2024-01-17", "2024-01-31", "2024-02-14"],
+        ),
+        ("Monthly", "2024-01-10", ["2024-01-10", "2024-02-10"]),
+        ("Semi-Monthly", "2024-01-10", ["2024-01-10", "2024-01-24", "2024-02-10"]),
+    ],
+)
+def test_occurrences(frequency, first, expected):
+    found = occurrences(
+        frequency, date.fromisoformat(first), date.fromisoformat("2024-02-20")
+    )
+    assert [when.isoformat() for when in found] == expected
+
+
+def test_main(tmp_path, capsys):
+    db_file = tmp_path / "budget.sqlite"
+    assert main(["--users", "2", "--dbfile", str(db_file)]) == 0
+    assert "2 users" in capsys.readouterr().out
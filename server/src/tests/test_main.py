@@ -0,0 +1,91 @@
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+import householdbudget
+from householdbudget import database
+from householdbudget.main import app, parse_args
+
+
+def test_import_does_not_touch_the_database(tmp_path):
+    db_file = tmp_path / "data" / "budget.sqlite"
+    src = os.path.dirname(os.path.dirname(householdbudget.__file__))
+    env = {**os.environ, "DBFILE": str(db_file), "PYTHONPATH": src}
+    subprocess.run(
+        [sys.executable, "-c", "import householdbudget.main"],
+        check=True,
+        env=env,
+        cwd=tmp_path,
+    )
+    assert not db_file.exists()
+
+
+def test_import_does_not_load_numpy(tmp_path):
+    src = os.path.dirname(os.path.dirname(householdbudget.__file__))
+    env = {**os.environ, "DBFILE": str(tmp_path / "budget.sqlite"), "PYTHONPATH": src}
+    loaded = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, householdbudget.main; print('numpy' in sys.modules)",
+        ],
+        check=True,
+        env=env,
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+    ).stdout
+    assert loaded.strip() == "False"
+
+
+def test_lifespan_initializes_and_closes(tmp_path, monkeypatch):
+    db_file = tmp_path / "budget.sqlite"
+    monkeypatch.setenv("DBFILE", str(db_file))
+    database.close_repository_selector()
+    try:
+        with TestClient(app) as client:
+            assert db_file.exists()
+            selector = database.get_repository_selector()
+            assert selector.dbfile == str(db_file)
+            response = client.post(
+                "/token", data={"username": "nobody", "password": "secret"}
+            )
+            assert response.status_code == 401
+        assert database.get_repository_selector() is not selector
+    finally:
+        database.close_repository_selector()
+
+
+def test_repositories_can_be_overridden():
+    class FakeUserRepository:
+        async def get_user_by_username(self, username):
+            raise AssertionError("should not be reached")
+
+    calls = []
+
+    def fake():
+        calls.append(1)
+        return FakeUserRepository()
+
+    app.dependency_overrides[database.get_user_repository] = fake
+    try:
+        response = TestClient(app).get(
+            "/users/me", headers={"Authorization": "Bearer not-a-token"}
+        )
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 401
+    assert calls
+
+
+def test_serve_arguments(monkeypatch):
+    monkeypatch.setenv("WEB_WORKERS", "4")
+    args = parse_args(["--port", "8000", "--backlog", "128"])
+    assert (args.host, args.port, args.workers, args.backlog) == (
+        "127.0.0.1",
+        8000,
+        4,
+        128,
+    )
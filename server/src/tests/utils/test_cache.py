@@ -0,0 +1,91 @@
+import pytest
+
+from householdbudget.utils.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("a", 1)
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5.0
+    assert cache.get("a", "gone") == "gone"
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"]) == (1, 1, 1)
+    assert stats["size"] == 0
+
+
+def test_get_or_load_and_invalidate():
+    cache = TTLCache(maxsize=10, ttl=60)
+    calls = []
+
+    def load():
+        calls.append(1)
+        return "value"
+
+    assert cache.get_or_load("a", load) == "value"
+    assert cache.get_or_load("a", load) == "value"
+    assert len(calls) == 1
+
+    cache.invalidate("a", "missing")
+    assert cache.get_or_load("a", load) == "value"
+    assert len(calls) == 2
+
+    with pytest.raises(KeyError):
+        cache.get_or_load("b", lambda: {}["b"])
+    assert cache.get("b") is None
+
+
+def test_zero_size_disables_caching():
+    cache = TTLCache(maxsize=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_on_remove_sees_every_value_that_leaves():
+    clock = FakeClock()
+    removed = []
+    cache = TTLCache(maxsize=2, ttl=5, clock=clock, on_remove=removed.append)
+    cache.set("a", 1)
+    cache.set("a", 2)
+    cache.set("b", 3)
+    cache.set("c", 4)
+    assert removed == [1, 2]
+
+    cache.invalidate("b", "missing")
+    assert removed == [1, 2, 3]
+
+    cache.set("d", 5)
+    clock.now = 5.0
+    assert cache.get("c") is None
+    cache.expire()
+    assert removed == [1, 2, 3, 4, 5]
+    assert len(cache) == 0
+
+    cache.set("e", 6)
+    cache.clear()
+    assert removed[-1] == 6
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+
+import pytest
+
+from householdbudget.utils.crypto_executor import (
+    CryptoExecutor,
+    CryptoExecutorBusyError,
+    close_crypto_executor,
+    get_crypto_executor,
+)
+from householdbudget.utils.crypto_utils import decrypt, encrypt, generate_keys
+
+
+@pytest.fixture
+def executor():
+    executor = CryptoExecutor(thread_workers=2, process_workers=0)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_decrypt_matches_sync(executor):
+    public_key, private_key = generate_keys()
+    ciphertext, salt, encrypted_text = encrypt("a phrase", public_key)
+
+    decrypted = await executor.decrypt(ciphertext, salt, encrypted_text, private_key)
+
+    assert decrypted == "a phrase"
+    assert executor.stats()["thread"]["completed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_encrypt_round_trip(executor):
+    public_key, private_key = await executor.generate_keys()
+    ciphertext, salt, encrypted_text = await executor.encrypt("a phrase", public_key)
+
+    assert decrypt(ciphertext, salt, encrypted_text, private_key) == "a phrase"
+
+
+@pytest.mark.asyncio
+async def test_process_pool_round_trip():
+    executor = CryptoExecutor(thread_workers=1, process_workers=1)
+    try:
+        public_key, private_key = await executor.generate_keys()
+        ciphertext, salt, encrypted_text = encrypt("a phrase", public_key)
+        decrypted = await executor.decrypt(
+            ciphertext, salt, encrypted_text, private_key
+        )
+        assert decrypted == "a phrase"
+        assert executor.stats()["process"]["completed"] == 2
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_is_full():
+    executor = CryptoExecutor(thread_workers=1, process_workers=0, max_queue=1)
+    release = threading.Event()
+    try:
+        running = asyncio.ensure_future(executor.run_thread(release.wait))
+        queued = asyncio.ensure_future(executor.run_thread(release.wait))
+        await asyncio.sleep(0)
+
+        with pytest.raises(CryptoExecutorBusyError):
+            await executor.run_thread(release.wait)
+
+        stats = executor.stats()["thread"]
+        assert stats["queue_depth"] == 1
+        assert stats["rejected"] == 1
+
+        release.set()
+        await asyncio.gather(running, queued)
+        assert executor.stats()["thread"]["in_flight"] == 0
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_close_crypto_executor_shuts_down_the_global():
+    executor = get_crypto_executor()
+    executor.threads.executor.submit(sum, [1, 2]).result()
+
+    close_crypto_executor()
+
+    assert executor.threads._executor is None
+    assert get_crypto_executor() is not executor
+    close_crypto_executor()
@@ -1,6 +1,18 @@
+import os
 import unittest
+from unittest import mock
 
-from householdbudget.utils.crypto_utils import decrypt, encrypt, generate_keys
+from cryptography.fernet import InvalidToken
+
+from householdbudget.utils import crypto_utils
+from householdbudget.utils.crypto_utils import (
+    close_key_cache,
+    decrypt,
+    encrypt,
+    generate_keys,
+    get_key_cache,
+    invalidate_fernet_key,
+)
 
 
 class TestCryptoUtils(unittest.TestCase):
@@ -21,5 +33,78 @@ class TestCryptoUtils(unittest.TestCase):
         self.assertEqual(phrase, decrypted_phrase)
 
 
+class TestDerivedKeyCache(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, {"DERIVED_KEY_CACHE_SIZE": "2"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(close_key_cache)
+        close_key_cache()
+        public_key, self.private_key = generate_keys()
+        self.encrypted = encrypt("a phrase", public_key)
+
+    def decrypt(self, user_id=7, encrypted=None):
+        ciphertext, salt, encrypted_text = encrypted or self.encrypted
+        with mock.patch.object(
+            crypto_utils,
+            "derive_fernet_key",
+            wraps=crypto_utils.derive_fernet_key,
+        ) as derive:
+            decrypted = decrypt(
+                ciphertext, salt, encrypted_text, self.private_key, user_id
+            )
+        self.assertEqual(decrypted, "a phrase")
+        return derive.call_count
+
+    def test_repeat_decrypts_reuse_the_key(self):
+        self.assertEqual(self.decrypt(), 1)
+        self.assertEqual(self.decrypt(), 0)
+        # without a user id nothing is cached
+        self.assertEqual(self.decrypt(user_id=None), 1)
+
+    def test_a_new_salt_derives_again(self):
+        self.decrypt()
+        ciphertext, _, encrypted_text = self.encrypted
+        with self.assertRaises(InvalidToken):
+            # the cached key is not used for a different salt
+            decrypt(ciphertext, b"0" * 16, encrypted_text, self.private_key, 7)
+
+    def test_invalidate_zeroes_the_key(self):
+        self.decrypt()
+        _, key = get_key_cache().get(7)
+        invalidate_fernet_key(7)
+        self.assertEqual(key, bytearray(len(key)))
+        self.assertEqual(self.decrypt(), 1)
+
+    def test_evicted_keys_are_zeroed(self):
+        self.decrypt(user_id=1)
+        _, key = get_key_cache().get(1)
+        self.decrypt(user_id=2)
+        self.decrypt(user_id=3)
+        self.assertIsNone(get_key_cache().get(1))
+        self.assertEqual(key, bytearray(len(key)))
+
+    def test_eviction_during_a_lookup_is_a_hit_on_the_copy(self):
+        self.decrypt()
+        cache = get_key_cache()
+        get = cache.get
+
+        def get_then_evict(*args, **kwargs):
+            entry = get(*args, **kwargs)
+            # another thread replaces the entry, zeroing the stored key
+            cache.set(7, (b"other salt", bytearray(b"x" * 44)))
+            return entry
+
+        with mock.patch.object(cache, "get", get_then_evict):
+            self.assertEqual(self.decrypt(), 0)
+
+    def test_off_by_default(self):
+        close_key_cache()
+        with mock.patch.dict(os.environ, {"DERIVED_KEY_CACHE_SIZE": "0"}):
+            self.assertIsNone(get_key_cache())
+            self.assertEqual(self.decrypt(), 1)
+            self.assertEqual(self.decrypt(), 1)
+
+
 if __name__ == "__main__":
     unittest.main()
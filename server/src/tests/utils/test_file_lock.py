@@ -0,0 +1,21 @@
+import pytest
+
+from householdbudget.utils.file_lock import FileLock
+
+
+def test_lock_is_exclusive(tmp_path):
+    path = str(tmp_path / "db.lock")
+    with FileLock(path):
+        with pytest.raises(TimeoutError):
+            FileLock(path, timeout=0.1).acquire()
+
+    # released on exit, so it can be taken again
+    with FileLock(path, timeout=0.1):
+        pass
+
+
+def test_release_is_idempotent(tmp_path):
+    lock = FileLock(str(tmp_path / "db.lock"))
+    lock.acquire()
+    lock.release()
+    lock.release()
@@ -0,0 +1,105 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from householdbudget.auth.schemas import PasswordEncryptor
+from householdbudget.utils import keypair_pool
+from householdbudget.utils.crypto_executor import CryptoExecutor
+from householdbudget.utils.crypto_utils import decrypt, encrypt
+from householdbudget.utils.keypair_pool import (
+    KeypairPool,
+    close_keypair_pool,
+    get_keypair_pool,
+)
+
+
+def thread_pool(workers):
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+@pytest.fixture
+def pool():
+    pool = KeypairPool(3, batch=2, factory=thread_pool)
+    pool.start()
+    assert pool.wait_full(timeout=30)
+    yield pool
+    pool.close()
+
+
+def test_fills_to_the_high_water_mark(pool):
+    stats = pool.stats()
+    assert stats["depth"] == 3
+    assert stats["generated"] >= 3
+    assert stats["refill_rate"] > 0
+
+
+def test_keys_work(pool):
+    public_key, private_key = pool.take()
+    ciphertext, salt, encrypted_text = encrypt("a phrase", public_key)
+    assert decrypt(ciphertext, salt, encrypted_text, private_key) == "a phrase"
+
+
+def test_refills_after_the_low_water_mark(pool):
+    taken = [pool.take() for _ in range(2)]
+    assert len({keys[1] for keys in taken}) == 2
+    assert pool.wait_full(timeout=30)
+    assert pool.stats()["taken"] == 2
+
+
+def test_falls_back_to_inline_generation():
+    pool = KeypairPool(1, factory=thread_pool)
+    try:
+        # never started: empty
+        assert pool.take_nowait() is None
+        assert len(pool.take()) == 2
+        assert pool.stats()["inline"] == 2
+    finally:
+        pool.close()
+
+
+def test_failed_refill_leaves_inline_generation(monkeypatch):
+    def broken(count):
+        raise RuntimeError("no entropy")
+
+    monkeypatch.setattr(keypair_pool, "generate_keypairs", broken)
+    pool = KeypairPool(2, factory=thread_pool)
+    try:
+        pool.start()
+        assert not pool.wait_full(timeout=0.2)
+        assert len(pool.take()) == 2
+        assert pool.stats()["generated"] == 0
+    finally:
+        pool.close()
+
+
+def test_invalid_high_water_mark():
+    with pytest.raises(ValueError):
+        KeypairPool(0)
+
+
+def test_configured_from_the_environment(monkeypatch):
+    monkeypatch.setenv("KEYPAIR_POOL_SIZE", "0")
+    assert get_keypair_pool() is None
+
+    monkeypatch.setenv("KEYPAIR_POOL_SIZE", "2")
+    monkeypatch.setattr(KeypairPool, "start", lambda self: None)
+    try:
+        pool = get_keypair_pool()
+        assert pool.high_water == 2
+        assert get_keypair_pool() is pool
+    finally:
+        close_keypair_pool()
+
+
+def test_registration_takes_pooled_keys(pool, monkeypatch):
+    monkeypatch.setattr(keypair_pool, "_keypair_pool", pool)
+    PasswordEncryptor().encrypt_password("secret")
+    executor = CryptoExecutor(thread_workers=1, process_workers=0)
+    try:
+        encryptor = PasswordEncryptor()
+        asyncio.run(encryptor.encrypt_password_async("secret", executor))
+    finally:
+        executor.shutdown()
+    assert encryptor.decrypt_password() == "secret"
+    assert pool.stats()["taken"] == 2